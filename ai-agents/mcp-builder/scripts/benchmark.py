@@ -0,0 +1,282 @@
+"""MCP Tool Micro-Benchmark
+
+Replays a file of tool calls directly against an MCP server, bypassing the LLM,
+to profile the server's hot paths.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from connections import create_connection, parse_env_vars, parse_headers
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def load_calls(file_path: Path) -> list[tuple[str, dict[str, Any]]]:
+    """Load tool calls from a JSON array or JSON-lines file.
+
+    Each call is either an object with "tool" (or "tool_name") and "arguments"
+    keys, or a two-element `[tool_name, arguments]` array.
+    """
+    text = file_path.read_text()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        entries = json.loads(stripped)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    calls = []
+    for i, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            tool_name = entry.get("tool") or entry.get("tool_name")
+            arguments = entry.get("arguments") or {}
+        elif isinstance(entry, list) and len(entry) == 2:
+            tool_name, arguments = entry
+        else:
+            raise ValueError(f"Call {i + 1}: expected an object or [tool_name, arguments] pair")
+        if not tool_name:
+            raise ValueError(f"Call {i + 1}: missing tool name")
+        calls.append((tool_name, arguments))
+    return calls
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class ToolStats:
+    """Latency, error and payload accounting for a single tool."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latencies_ms = []
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def record(self, latency_ms: float, error: bool, request_bytes: int, response_bytes: int):
+        self.count += 1
+        self.errors += int(error)
+        self.latencies_ms.append(latency_ms)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        bucket = next(
+            (i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if latency_ms <= bound),
+            len(HISTOGRAM_BUCKETS_MS),
+        )
+        self.histogram[bucket] += 1
+
+    def summary(self, elapsed_s: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / count,
+            "throughput_per_s": self.count / elapsed_s if elapsed_s else 0.0,
+            "latency_ms": {
+                "min": latencies[0] if latencies else 0.0,
+                "mean": sum(latencies) / count,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "histogram_ms": {
+                **{f"<={bound}": n for bound, n in zip(HISTOGRAM_BUCKETS_MS, self.histogram)},
+                f">{HISTOGRAM_BUCKETS_MS[-1]}": self.histogram[-1],
+            },
+            "avg_request_bytes": self.request_bytes / count,
+            "avg_response_bytes": self.response_bytes / count,
+        }
+
+
+async def timed_call(connection: Any, tool_name: str, arguments: dict[str, Any]) -> tuple[float, bool, int]:
+    """Call a tool once, returning (latency_ms, is_error, response_bytes)."""
+    start = time.perf_counter()
+    try:
+        result = await connection.session.call_tool(tool_name, arguments=arguments)
+        latency_ms = (time.perf_counter() - start) * 1000
+        response_bytes = sum(len(block.model_dump_json()) for block in result.content)
+        return latency_ms, bool(result.isError), response_bytes
+    except Exception:
+        return (time.perf_counter() - start) * 1000, True, 0
+
+
+async def run_benchmark(
+    connection: Any,
+    calls: list[tuple[str, dict[str, Any]]],
+    concurrency: int = 1,
+    warmup: float = 2.0,
+    duration: float = 10.0,
+) -> dict[str, Any]:
+    """Replay `calls` round-robin from `concurrency` workers and collect per-tool stats.
+
+    Calls made during the `warmup` seconds are executed but not recorded.
+    """
+    call_cycle = itertools.cycle(
+        (tool_name, arguments, len(json.dumps(arguments))) for tool_name, arguments in calls
+    )
+    stats: dict[str, ToolStats] = {}
+
+    async def worker(deadline: float, record: bool):
+        while time.perf_counter() < deadline:
+            tool_name, arguments, request_bytes = next(call_cycle)
+            latency_ms, error, response_bytes = await timed_call(connection, tool_name, arguments)
+            if record:
+                stats.setdefault(tool_name, ToolStats()).record(latency_ms, error, request_bytes, response_bytes)
+
+    if warmup > 0:
+        print(f"🔥 Warming up for {warmup:.1f}s...", file=sys.stderr)
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline, False) for _ in range(concurrency)))
+
+    print(f"⏱️  Measuring for {duration:.1f}s with concurrency {concurrency}...", file=sys.stderr)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(start + duration, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total_calls = sum(s.count for s in stats.values())
+    total_errors = sum(s.errors for s in stats.values())
+    return {
+        "concurrency": concurrency,
+        "warmup_s": warmup,
+        "elapsed_s": elapsed,
+        "total_calls": total_calls,
+        "total_errors": total_errors,
+        "throughput_per_s": total_calls / elapsed if elapsed else 0.0,
+        "tools": {name: s.summary(elapsed) for name, s in sorted(stats.items())},
+    }
+
+
+REPORT_HEADER = """
+# Benchmark Report
+
+- **Transport**: {transport}
+- **Concurrency**: {concurrency}
+- **Measured Duration**: {elapsed_s:.2f}s (after {warmup_s:.1f}s warmup)
+- **Total Calls**: {total_calls} ({throughput_per_s:.1f}/s)
+- **Errors**: {total_errors}
+
+| Tool | Calls | Calls/s | Error % | p50 ms | p90 ms | p99 ms | Max ms | Avg req B | Avg resp B |
+|------|-------|---------|---------|--------|--------|--------|--------|-----------|------------|
+"""
+
+
+def format_report(results: dict[str, Any], transport: str) -> str:
+    """Render benchmark results as a markdown report."""
+    report = REPORT_HEADER.format(transport=transport, **results)
+    for name, tool in results["tools"].items():
+        latency = tool["latency_ms"]
+        report += (
+            f"| {name} | {tool['count']} | {tool['throughput_per_s']:.1f} | {tool['error_rate'] * 100:.1f} "
+            f"| {latency['p50']:.2f} | {latency['p90']:.2f} | {latency['p99']:.2f} | {latency['max']:.2f} "
+            f"| {tool['avg_request_bytes']:.0f} | {tool['avg_response_bytes']:.0f} |\n"
+        )
+
+    for name, tool in results["tools"].items():
+        report += f"\n### {name} latency histogram\n\n```\n"
+        peak = max(tool["histogram_ms"].values()) or 1
+        for bucket, n in tool["histogram_ms"].items():
+            if n:
+                report += f"{bucket:>8} ms | {'█' * max(round(40 * n / peak), 1)} {n}\n"
+        report += "```\n"
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark MCP server tools without an LLM in the loop",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Benchmark the bundled echo server over stdio
+  python benchmark.py -t stdio -c python -a echo_server.py example_benchmark.jsonl
+
+  # Benchmark an HTTP MCP server with 16 concurrent callers for 30 seconds
+  python benchmark.py -t http -u http://localhost:8000/mcp -n 16 -d 30 calls.jsonl
+        """,
+    )
+
+    parser.add_argument("calls_file", type=Path, help="JSON or JSON-lines file of tool calls to replay")
+    parser.add_argument("-t", "--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type (default: stdio)")
+    parser.add_argument("-n", "--concurrency", type=int, default=1, help="Number of concurrent callers (default: 1)")
+    parser.add_argument("-w", "--warmup", type=float, default=2.0, help="Warmup seconds excluded from results (default: 2)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Measured seconds (default: 10)")
+
+    stdio_group = parser.add_argument_group("stdio options")
+    stdio_group.add_argument("-c", "--command", help="Command to run MCP server (stdio only)")
+    stdio_group.add_argument("-a", "--args", nargs="+", help="Arguments for the command (stdio only)")
+    stdio_group.add_argument("-e", "--env", nargs="+", help="Environment variables in KEY=VALUE format (stdio only)")
+
+    remote_group = parser.add_argument_group("sse/http options")
+    remote_group.add_argument("-u", "--url", help="MCP server URL (sse/http only)")
+    remote_group.add_argument("-H", "--header", nargs="+", dest="headers", help="HTTP headers in 'Key: Value' format (sse/http only)")
+
+    parser.add_argument("-o", "--output", type=Path, help="Output file for benchmark report (default: stdout)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON instead of markdown")
+
+    args = parser.parse_args()
+
+    if not args.calls_file.exists():
+        print(f"Error: Calls file not found: {args.calls_file}")
+        sys.exit(1)
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1")
+        sys.exit(1)
+
+    try:
+        calls = load_calls(args.calls_file)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"Error: Invalid calls file: {e}")
+        sys.exit(1)
+    if not calls:
+        print("Error: Calls file contains no calls")
+        sys.exit(1)
+
+    headers = parse_headers(args.headers) if args.headers else None
+    env_vars = parse_env_vars(args.env) if args.env else None
+
+    try:
+        connection = create_connection(
+            transport=args.transport,
+            command=args.command,
+            args=args.args,
+            env=env_vars,
+            url=args.url,
+            headers=headers,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"🔗 Connecting to MCP server via {args.transport}...", file=sys.stderr)
+
+    async with connection:
+        print(f"✅ Connected, replaying {len(calls)} calls", file=sys.stderr)
+        results = await run_benchmark(connection, calls, args.concurrency, args.warmup, args.duration)
+
+    report = json.dumps(results, indent=2) if args.json else format_report(results, args.transport)
+
+    if args.output:
+        args.output.write_text(report)
+        print(f"\n✅ Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""Local echo MCP server for offline benchmarking.
+
+Exposes a handful of deterministic tools so `benchmark.py` can be exercised
+without network access or API keys, over any of the supported transports.
+"""
+
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+
+def build_server(host: str = "127.0.0.1", port: int = 8000) -> FastMCP:
+    """Create the echo server with its benchmark tools registered."""
+    mcp = FastMCP("echo", host=host, port=port, log_level="WARNING")
+
+    @mcp.tool()
+    def echo(message: str) -> str:
+        """Return the given message unchanged."""
+        return message
+
+    @mcp.tool()
+    def payload(size: int = 1024) -> str:
+        """Return a string of exactly `size` characters."""
+        return "x" * max(size, 0)
+
+    @mcp.tool()
+    async def sleep(ms: int = 10) -> str:
+        """Wait for `ms` milliseconds before answering."""
+        await asyncio.sleep(max(ms, 0) / 1000)
+        return f"slept {ms}ms"
+
+    @mcp.tool()
+    def fail(message: str = "intentional failure") -> str:
+        """Always raise an error, to exercise error-rate reporting."""
+        raise RuntimeError(message)
+
+    return mcp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local echo MCP server")
+    parser.add_argument("-t", "--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type (default: stdio)")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for sse/http (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="Port for sse/http (default: 8000)")
+    args = parser.parse_args()
+
+    transport = "streamable-http" if args.transport == "http" else args.transport
+    build_server(args.host, args.port).run(transport=transport)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,12 @@ import time
 import traceback
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from anthropic import Anthropic
 
-from connections import create_connection
+from connections import create_connection, parse_env_vars, parse_headers
+from scoring import DEFAULT_SCORERS, SCORERS, Scorer, build_scorers, model_grade_results, score_answer
 
 EVALUATION_PROMPT = """You are an AI assistant with access to tools.
 
@@ -53,27 +54,62 @@ Response Requirements:
 - Your response should go last"""
 
 
-def parse_evaluation_file(file_path: Path) -> list[dict[str, Any]]:
-    """Parse XML evaluation file with qa_pair elements."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        evaluations = []
+def iter_evaluation_file(file_path: Path) -> Iterator[dict[str, Any]]:
+    """Lazily yield QA pairs from an XML or JSON-lines evaluation file.
+
+    XML files are read incrementally with iterparse and each qa_pair element is
+    removed from its parent once yielded, so memory stays constant regardless of
+    file size, wherever the pairs are nested. JSON-lines files (.jsonl/.ndjson)
+    hold one {"question", "answer"} object per line.
 
-        for qa_pair in root.findall(".//qa_pair"):
-            question_elem = qa_pair.find("question")
-            answer_elem = qa_pair.find("answer")
+    Raises ValueError if the file can't be parsed, even after some pairs were
+    yielded, so a broken file never passes for a shorter task list.
+    """
+    try:
+        if file_path.suffix.lower() in (".jsonl", ".ndjson"):
+            with file_path.open() as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if not isinstance(entry, dict):
+                        raise ValueError(f"Error parsing evaluation file {file_path}: expected a JSON object per line, got {line.strip()[:80]}")
+                    if entry.get("question") is not None and entry.get("answer") is not None:
+                        yield {
+                            "question": str(entry["question"]).strip(),
+                            "answer": str(entry["answer"]).strip(),
+                        }
+            return
+
+        # Open elements, so each qa_pair can be detached from its parent
+        open_elements = []
+        for event, elem in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                open_elements.append(elem)
+                continue
+            open_elements.pop()
+            if elem.tag != "qa_pair":
+                continue
+
+            question_elem = elem.find("question")
+            answer_elem = elem.find("answer")
 
             if question_elem is not None and answer_elem is not None:
-                evaluations.append({
+                yield {
                     "question": (question_elem.text or "").strip(),
                     "answer": (answer_elem.text or "").strip(),
-                })
+                }
+
+            if open_elements:
+                open_elements[-1].remove(elem)
+            elem.clear()
+    except (ET.ParseError, json.JSONDecodeError) as e:
+        raise ValueError(f"Error parsing evaluation file {file_path}: {e}") from e
+
 
-        return evaluations
-    except Exception as e:
-        print(f"Error parsing evaluation file {file_path}: {e}")
-        return []
+def parse_evaluation_file(file_path: Path) -> list[dict[str, Any]]:
+    """Parse an evaluation file with qa_pair elements into a list."""
+    return list(iter_evaluation_file(file_path))
 
 
 def extract_xml_content(text: str, tag: str) -> str | None:
@@ -158,9 +194,11 @@ async def evaluate_single_task(
     tools: list[dict[str, Any]],
     connection: Any,
     task_index: int,
+    scorers: list[tuple[str, Scorer]] | None = None,
 ) -> dict[str, Any]:
     """Evaluate a single QA pair with the given tools."""
     start_time = time.time()
+    scorers = scorers or build_scorers(DEFAULT_SCORERS)
 
     print(f"Task {task_index + 1}: Running task with question: {qa_pair['question']}")
     response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, connection)
@@ -170,12 +208,14 @@ async def evaluate_single_task(
     feedback = extract_xml_content(response, "feedback")
 
     duration_seconds = time.time() - start_time
+    score, scorer = score_answer(qa_pair["answer"], response_value, scorers)
 
     return {
         "question": qa_pair["question"],
         "expected": qa_pair["answer"],
         "actual": response_value,
-        "score": int(response_value == qa_pair["answer"]) if response_value else 0,
+        "score": score,
+        "scorer": scorer,
         "total_duration": duration_seconds,
         "tool_calls": tool_metrics,
         "num_tool_calls": sum(len(metrics["durations"]) for metrics in tool_metrics.values()),
@@ -193,7 +233,7 @@ REPORT_HEADER = """
 - **Average Task Duration**: {average_duration_s:.2f}s
 - **Average Tool Calls per Task**: {average_tool_calls:.2f}
 - **Total Tool Calls**: {total_tool_calls}
-
+{grader_summary}
 ---
 """
 
@@ -204,6 +244,7 @@ TASK_TEMPLATE = """
 **Ground Truth Answer**: `{expected_answer}`
 **Actual Answer**: `{actual_answer}`
 **Correct**: {correct_indicator}
+**Scorer**: {scorer}
 **Duration**: {total_duration:.2f}s
 **Tool Calls**: {tool_calls}
 
@@ -221,6 +262,10 @@ async def run_evaluation(
     eval_path: Path,
     connection: Any,
     model: str = "claude-3-7-sonnet-20250219",
+    concurrency: int = 1,
+    scorers: list[tuple[str, Scorer]] | None = None,
+    grader_model: str | None = None,
+    grade_batch_size: int = 20,
 ) -> str:
     """Run evaluation with MCP server tools."""
     print("🚀 Starting Evaluation")
@@ -230,14 +275,29 @@ async def run_evaluation(
     tools = await connection.list_tools()
     print(f"📋 Loaded {len(tools)} tools from MCP server")
 
-    qa_pairs = parse_evaluation_file(eval_path)
-    print(f"📋 Loaded {len(qa_pairs)} evaluation tasks")
-
-    results = []
-    for i, qa_pair in enumerate(qa_pairs):
-        print(f"Processing task {i + 1}/{len(qa_pairs)}")
-        result = await evaluate_single_task(client, model, qa_pair, tools, connection, i)
-        results.append(result)
+    # Tasks are pulled from the streaming parser as workers free up, so work
+    # starts immediately instead of waiting for the whole file to be read.
+    pending = enumerate(iter_evaluation_file(eval_path))
+    indexed_results = []
+
+    async def worker():
+        for i, qa_pair in pending:
+            print(f"Processing task {i + 1}")
+            result = await evaluate_single_task(client, model, qa_pair, tools, connection, i, scorers)
+            indexed_results.append((i, result))
+
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    results = [result for _, result in sorted(indexed_results, key=lambda item: item[0])]
+    print(f"📋 Completed {len(results)} evaluation tasks")
+
+    grader_summary = ""
+    if grader_model:
+        upgraded = await model_grade_results(client, grader_model, results, grade_batch_size)
+        print(f"🧑‍⚖️ Model grader accepted {upgraded} additional answers")
+        ungraded = [r for r in results if r.get("grader_error")]
+        grader_summary = f"- **Model Grader**: {upgraded} additional answers accepted\n"
+        if ungraded:
+            grader_summary += f"- **Model Grader Errors**: {len(ungraded)} answers not graded ({ungraded[0]['grader_error']})\n"
 
     correct = sum(r["score"] for r in results)
     accuracy = (correct / len(results)) * 100 if results else 0
@@ -252,56 +312,28 @@ async def run_evaluation(
         average_duration_s=average_duration_s,
         average_tool_calls=average_tool_calls,
         total_tool_calls=total_tool_calls,
+        grader_summary=grader_summary,
     )
 
     report += "".join([
         TASK_TEMPLATE.format(
             task_num=i + 1,
-            question=qa_pair["question"],
-            expected_answer=qa_pair["answer"],
+            question=result["question"],
+            expected_answer=result["expected"],
             actual_answer=result["actual"] or "N/A",
             correct_indicator="✅" if result["score"] else "❌",
+            scorer=result["scorer"] or (f"N/A (model grader failed: {result['grader_error']})" if result.get("grader_error") else "N/A"),
             total_duration=result["total_duration"],
             tool_calls=json.dumps(result["tool_calls"], indent=2),
             summary=result["summary"] or "N/A",
             feedback=result["feedback"] or "N/A",
         )
-        for i, (qa_pair, result) in enumerate(zip(qa_pairs, results))
+        for i, result in enumerate(results)
     ])
 
     return report
 
 
-def parse_headers(header_list: list[str]) -> dict[str, str]:
-    """Parse header strings in format 'Key: Value' into a dictionary."""
-    headers = {}
-    if not header_list:
-        return headers
-
-    for header in header_list:
-        if ":" in header:
-            key, value = header.split(":", 1)
-            headers[key.strip()] = value.strip()
-        else:
-            print(f"Warning: Ignoring malformed header: {header}")
-    return headers
-
-
-def parse_env_vars(env_list: list[str]) -> dict[str, str]:
-    """Parse environment variable strings in format 'KEY=VALUE' into a dictionary."""
-    env = {}
-    if not env_list:
-        return env
-
-    for env_var in env_list:
-        if "=" in env_var:
-            key, value = env_var.split("=", 1)
-            env[key.strip()] = value.strip()
-        else:
-            print(f"Warning: Ignoring malformed environment variable: {env_var}")
-    return env
-
-
 async def main():
     parser = argparse.ArgumentParser(
         description="Evaluate MCP servers using test questions",
@@ -319,9 +351,14 @@ Examples:
         """,
     )
 
-    parser.add_argument("eval_file", type=Path, help="Path to evaluation XML file")
+    parser.add_argument("eval_file", type=Path, help="Path to evaluation XML or JSON-lines file")
     parser.add_argument("-t", "--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type (default: stdio)")
     parser.add_argument("-m", "--model", default="claude-3-7-sonnet-20250219", help="Claude model to use (default: claude-3-7-sonnet-20250219)")
+    parser.add_argument("-s", "--scorers", default=",".join(DEFAULT_SCORERS), help=f"Comma-separated scorers tried in order, from: {', '.join(SCORERS)} (default: {','.join(DEFAULT_SCORERS)})")
+    parser.add_argument("--numeric-tolerance", type=float, default=1e-6, help="Relative/absolute tolerance for the numeric scorer (default: 1e-6)")
+    parser.add_argument("--grader-model", help="Re-grade answers no scorer accepted with this Claude model, batched")
+    parser.add_argument("--grade-batch-size", type=int, default=20, help="Answers per model-grading request (default: 20)")
+    parser.add_argument("-j", "--concurrency", type=int, default=1, help="Number of tasks to run concurrently (default: 1)")
 
     stdio_group = parser.add_argument_group("stdio options")
     stdio_group.add_argument("-c", "--command", help="Command to run MCP server (stdio only)")
@@ -336,10 +373,19 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.grade_batch_size < 1:
+        parser.error("--grade-batch-size must be at least 1")
+
     if not args.eval_file.exists():
         print(f"Error: Evaluation file not found: {args.eval_file}")
         sys.exit(1)
 
+    try:
+        scorers = build_scorers([name.strip() for name in args.scorers.split(",") if name.strip()], args.numeric_tolerance)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
     headers = parse_headers(args.headers) if args.headers else None
     env_vars = parse_env_vars(args.env) if args.env else None
 
@@ -360,7 +406,19 @@ Examples:
 
     async with connection:
         print("✅ Connected successfully")
-        report = await run_evaluation(args.eval_file, connection, args.model)
+        try:
+            report = await run_evaluation(
+                args.eval_file,
+                connection,
+                args.model,
+                args.concurrency,
+                scorers,
+                args.grader_model,
+                args.grade_batch_size,
+            )
+        except (ValueError, OSError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
         if args.output:
             args.output.write_text(report)
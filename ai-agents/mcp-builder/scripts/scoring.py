@@ -0,0 +1,210 @@
+"""Answer scoring for the MCP evaluation harness.
+
+Scorers compare an expected answer with the agent's response and are tried in
+order; the first one that accepts the answer is recorded on the result. Answers
+no scorer accepts can optionally be re-graded by a model, many per request.
+"""
+
+import asyncio
+import json
+import math
+import re
+from functools import partial
+from typing import Any, Callable
+
+from anthropic import Anthropic
+
+Scorer = Callable[[str, str], bool]
+
+_NUMBER_SYMBOLS = re.compile(r"[$€£%]")
+# Only well-formed groups are thousands separators: "1,234" but not "1,2" or "12,34"
+_THOUSANDS = re.compile(r"(?<![\d,.])\d{1,3}(?:,\d{3})+(?![\d,])")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# A comma between digit groups ("1,234") is a thousands separator, not a list separator
+_LIST_SEPARATORS = re.compile(r"(?<!\d),|,(?!\d{3}(?!\d))|[;\n]")
+# Surrounding quotes and periods, except a decimal point next to a digit (".5", "5.")
+_LEADING_PUNCTUATION = re.compile(r"^(?:[\"'`]|\.(?!\d))+")
+_TRAILING_PUNCTUATION = re.compile(r"(?:[\"'`]|(?<!\d)\.)+$")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace, case-fold and drop surrounding quotes/periods."""
+    text = " ".join(text.split()).casefold()
+    return _TRAILING_PUNCTUATION.sub("", _LEADING_PUNCTUATION.sub("", text))
+
+
+def parse_number(text: str) -> float | None:
+    """Parse a single number, ignoring currency symbols, percent signs and thousands separators.
+
+    Returns None unless exactly one number remains, so "1, 2, 3" or "1 2" are not numbers.
+    """
+    text = _THOUSANDS.sub(lambda m: m.group().replace(",", ""), text)
+    text = _NUMBER_SYMBOLS.sub("", text).strip()
+    if not _NUMBER.fullmatch(text):
+        return None
+    return float(text)
+
+
+def split_items(text: str) -> list[str]:
+    """Split a list-like answer into normalized items."""
+    text = text.strip().strip("[]()")
+    return [normalize_text(item) for item in _LIST_SEPARATORS.split(text) if item.strip()]
+
+
+def exact_match(expected: str, actual: str) -> bool:
+    return actual == expected
+
+
+def normalized_match(expected: str, actual: str) -> bool:
+    return normalize_text(actual) == normalize_text(expected)
+
+
+def numeric_match(expected: str, actual: str, tolerance: float = 1e-6) -> bool:
+    expected_num = parse_number(expected)
+    actual_num = parse_number(actual)
+    if expected_num is None or actual_num is None:
+        return False
+    return math.isclose(expected_num, actual_num, rel_tol=tolerance, abs_tol=tolerance)
+
+
+def list_match(expected: str, actual: str) -> bool:
+    expected_items = split_items(expected)
+    return len(expected_items) > 1 and split_items(actual) == expected_items
+
+
+def set_match(expected: str, actual: str) -> bool:
+    expected_items = split_items(expected)
+    return len(expected_items) > 1 and sorted(split_items(actual)) == sorted(expected_items)
+
+
+SCORERS: dict[str, Callable[..., bool]] = {
+    "exact": exact_match,
+    "normalized": normalized_match,
+    "numeric": numeric_match,
+    "list": list_match,
+    "set": set_match,
+}
+
+# The list scorers accept answers that are only equal as lists ("1,234" and
+# "234, 1" as a set), so they only run when asked for with -s
+DEFAULT_SCORERS = ["exact", "normalized", "numeric"]
+
+
+def build_scorers(names: list[str], numeric_tolerance: float = 1e-6) -> list[tuple[str, Scorer]]:
+    """Resolve scorer names into an ordered list of (name, scorer) pairs."""
+    scorers = []
+    for name in names:
+        if name not in SCORERS:
+            raise ValueError(f"Unknown scorer: {name}. Use one of: {', '.join(SCORERS)}")
+        scorer = SCORERS[name]
+        if name == "numeric":
+            scorer = partial(scorer, tolerance=numeric_tolerance)
+        scorers.append((name, scorer))
+    return scorers
+
+
+def score_answer(
+    expected: str,
+    actual: str | None,
+    scorers: list[tuple[str, Scorer]],
+) -> tuple[int, str | None]:
+    """Score an answer, returning (score, name of the scorer that accepted it)."""
+    if not actual:
+        return 0, None
+    for name, scorer in scorers:
+        if scorer(expected, actual):
+            return 1, name
+    return 0, None
+
+
+GRADING_PROMPT = """You are grading answers to questions against ground-truth answers.
+
+For each numbered item, decide whether the actual answer conveys the same final answer as the expected one.
+Ignore differences in formatting, units notation, rounding beyond the requested precision, and phrasing.
+Do not give credit for partially correct or hedged answers.
+
+Reply with only a JSON array inside <grades> tags, one object per item:
+<grades>[{"id": 1, "correct": true}, {"id": 2, "correct": false}]</grades>"""
+
+
+async def grade_batch(
+    client: Anthropic,
+    model: str,
+    items: list[dict[str, Any]],
+) -> list[bool]:
+    """Grade several answers in a single model request.
+
+    Items the grader's reply doesn't grade validly (a missing or malformed
+    reply, entries that aren't {"id": int, "correct": bool}) stay ungraded.
+    """
+    body = "\n\n".join(
+        f"Item {i + 1}\nQuestion: {item['question']}\nExpected: {item['expected']}\nActual: {item['actual']}"
+        for i, item in enumerate(items)
+    )
+    response = await asyncio.to_thread(
+        client.messages.create,
+        model=model,
+        max_tokens=32 * len(items) + 256,
+        system=GRADING_PROMPT,
+        messages=[{"role": "user", "content": body}],
+    )
+    text = next((block.text for block in response.content if hasattr(block, "text")), "")
+    match = re.search(r"<grades>(.*?)</grades>", text, re.DOTALL)
+
+    verdicts = [False] * len(items)
+    if not match:
+        return verdicts
+    try:
+        grades = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        print("Warning: Ignoring grader reply that is not valid JSON")
+        return verdicts
+    if not isinstance(grades, list):
+        print("Warning: Ignoring grader reply that is not a JSON array")
+        return verdicts
+    for grade in grades:
+        item_id = grade.get("id") if isinstance(grade, dict) else None
+        # bool is an int subclass; {"id": true} is not an id
+        if not isinstance(item_id, int) or isinstance(item_id, bool) or not 1 <= item_id <= len(items):
+            print(f"Warning: Ignoring malformed grade: {grade!r}")
+            continue
+        verdicts[item_id - 1] = grade.get("correct") is True
+    return verdicts
+
+
+async def model_grade_results(
+    client: Anthropic,
+    model: str,
+    results: list[dict[str, Any]],
+    batch_size: int = 20,
+) -> int:
+    """Re-grade answers no rule-based scorer accepted, `batch_size` per request.
+
+    Updates results in place and returns the number newly marked correct. A
+    batch whose request fails (API error, rate limit, timeout) keeps its
+    rule-based scores; its results get the error under "grader_error".
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    candidates = [r for r in results if not r["score"] and r["actual"]]
+    batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+
+    async def grade_or_fail(batch: list[dict[str, Any]]) -> list[bool]:
+        try:
+            return await grade_batch(client, model, batch)
+        except Exception as e:
+            print(f"Warning: Model grading failed for {len(batch)} answers: {e}")
+            for result in batch:
+                result["grader_error"] = str(e) or type(e).__name__
+            return [False] * len(batch)
+
+    verdict_batches = await asyncio.gather(*(grade_or_fail(batch) for batch in batches))
+
+    upgraded = 0
+    for batch, verdicts in zip(batches, verdict_batches):
+        for result, correct in zip(batch, verdicts):
+            if correct:
+                result["score"] = 1
+                result["scorer"] = "model"
+                upgraded += 1
+    return upgraded
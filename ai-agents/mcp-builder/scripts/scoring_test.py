@@ -0,0 +1,157 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+
+from scoring import (
+    DEFAULT_SCORERS,
+    build_scorers,
+    grade_batch,
+    model_grade_results,
+    normalized_match,
+    numeric_match,
+    parse_number,
+    score_answer,
+    split_items,
+)
+
+
+class TestParseNumber(unittest.TestCase):
+
+    def test_plain_and_decorated_numbers(self):
+        self.assertEqual(parse_number("42"), 42.0)
+        self.assertEqual(parse_number(" -3.5 "), -3.5)
+        self.assertEqual(parse_number("$1,234.50"), 1234.5)
+        self.assertEqual(parse_number("1,234,567"), 1234567.0)
+        self.assertEqual(parse_number("15%"), 15.0)
+        self.assertEqual(parse_number("€ 7"), 7.0)
+
+    def test_lists_are_not_numbers(self):
+        for text in ("1, 2, 3", "1,2,3", "1 2 3", "1,2", "12,34", "1,234,5"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_number(text))
+
+    def test_non_numbers(self):
+        for text in ("", "abc", "nan", "inf", "1_000", "$"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_number(text))
+
+
+class TestNumericMatch(unittest.TestCase):
+
+    def test_lists_do_not_match_numbers(self):
+        self.assertFalse(numeric_match("123", "1, 2, 3"))
+        self.assertFalse(numeric_match("1 2 3", "1,2,3"))
+        self.assertFalse(numeric_match("12", "1,2"))
+
+    def test_equal_numbers_match(self):
+        self.assertTrue(numeric_match("1234", "1,234"))
+        self.assertTrue(numeric_match("0.1", "0.1000000001"))
+        self.assertFalse(numeric_match("0.1", "0.2"))
+
+
+class TestNormalizedMatch(unittest.TestCase):
+
+    def test_quotes_and_periods_are_trimmed(self):
+        self.assertTrue(normalized_match("Paris", '"paris."'))
+        self.assertTrue(normalized_match("the end", "...The  End"))
+
+    def test_decimal_points_are_kept(self):
+        self.assertFalse(normalized_match("5.", "5"))
+        self.assertFalse(normalized_match(".5", "5"))
+
+
+class TestSplitItems(unittest.TestCase):
+
+    def test_thousands_separators_do_not_split(self):
+        self.assertEqual(split_items("1,234"), ["1,234"])
+        self.assertEqual(split_items("1,234,567; 8"), ["1,234,567", "8"])
+        self.assertEqual(split_items("1,2,3"), ["1", "2", "3"])
+
+
+class TestScoreAnswer(unittest.TestCase):
+
+    def setUp(self):
+        self.scorers = build_scorers(DEFAULT_SCORERS)
+        self.list_scorers = build_scorers(["exact", "normalized", "list", "set", "numeric"])
+
+    def test_list_scorers_are_opt_in(self):
+        self.assertNotIn("list", DEFAULT_SCORERS)
+        self.assertNotIn("set", DEFAULT_SCORERS)
+        self.assertEqual(score_answer("1, 2, 3", "3, 2, 1", self.scorers), (0, None))
+
+    def test_list_answers_are_scored_as_lists(self):
+        self.assertEqual(score_answer("1, 2, 3", "1,2,3", self.list_scorers), (1, "list"))
+        self.assertEqual(score_answer("1, 2, 3", "3, 2, 1", self.list_scorers), (1, "set"))
+        self.assertEqual(score_answer("1, 2, 3", "123", self.list_scorers), (0, None))
+        self.assertEqual(score_answer("1,2,3", "1 2 3", self.list_scorers), (0, None))
+
+    def test_numbers_are_not_scored_as_lists(self):
+        for scorers in (self.scorers, self.list_scorers):
+            with self.subTest(scorers=[name for name, _ in scorers]):
+                self.assertEqual(score_answer("1,234", "234, 1", scorers), (0, None))
+                self.assertEqual(score_answer(".5", "5", scorers), (0, None))
+                self.assertEqual(score_answer("5.", "5", scorers), (1, "numeric"))
+
+    def test_numbers_are_scored_as_numbers(self):
+        self.assertEqual(score_answer("1234", "$1,234", self.scorers), (1, "numeric"))
+        self.assertEqual(score_answer("12", "1,2", self.scorers), (0, None))
+
+
+class FakeClient:
+    """Returns a fixed grader reply."""
+
+    def __init__(self, reply):
+        self.messages = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(content=[SimpleNamespace(text=reply)]))
+
+
+class TestGradeBatch(unittest.TestCase):
+
+    items = [{"question": "q", "expected": "a", "actual": "b"}] * 3
+
+    def grade(self, reply):
+        return asyncio.run(grade_batch(FakeClient(reply), "model", self.items))
+
+    def test_valid_reply(self):
+        reply = '<grades>[{"id": 1, "correct": true}, {"id": 3, "correct": true}]</grades>'
+        self.assertEqual(self.grade(reply), [True, False, True])
+
+    def test_malformed_replies_leave_items_ungraded(self):
+        for reply in ('no tags', '<grades>{"id": 1}</grades>', '<grades>not json</grades>', '<grades>"x"</grades>'):
+            with self.subTest(reply=reply):
+                self.assertEqual(self.grade(reply), [False, False, False])
+
+    def test_malformed_entries_are_skipped(self):
+        reply = '<grades>[1, "x", {"id": "2", "correct": true}, {"id": true, "correct": true}, {"id": 9, "correct": true}, {"id": 3, "correct": true}]</grades>'
+        self.assertEqual(self.grade(reply), [False, False, True])
+
+
+
+class FailingClient:
+    """Fails the first grading request, then replies with every item correct."""
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("rate limited")
+        ids = range(1, kwargs["messages"][0]["content"].count("Item ") + 1)
+        grades = json.dumps([{"id": i, "correct": True} for i in ids])
+        return SimpleNamespace(content=[SimpleNamespace(text=f"<grades>{grades}</grades>")])
+
+
+class TestModelGradeResults(unittest.TestCase):
+
+    def test_failed_batch_keeps_rule_based_scores(self):
+        results = [{"question": "q", "expected": "a", "actual": "b", "score": 0, "scorer": None} for _ in range(4)]
+        upgraded = asyncio.run(model_grade_results(FailingClient(), "model", results, batch_size=2))
+        self.assertEqual(upgraded, 2)
+        self.assertEqual([r["score"] for r in results], [0, 0, 1, 1])
+        self.assertEqual([r.get("grader_error") for r in results], ["rate limited", "rate limited", None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,25 @@
 """
 API Validator - Checks API endpoints for best practices.
 Validates OpenAPI specs, response formats, and common issues.
+
+The project is walked once, pruning dependency and build directories, and the
+API files found are checked in parallel.
+
+Usage:
+    python api_validator.py [project_path] [-j JOBS]
 """
+import os
 import sys
 import json
 import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from openapi_spec import OpenAPISpec, SpecError, yaml
+from payload_checks import INLINE_SCHEMA_MAX_PROPERTIES, check_code_payloads, check_project_payloads, check_spec_payloads
+from rule_engine import Rule, RuleSet
+
 # Fix Windows console encoding for Unicode output
 try:
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -15,186 +28,326 @@ try:
 except AttributeError:
     pass  # Python < 3.7
 
+# Directories never searched for API files
+SKIP_DIRS = {
+    'node_modules', '.git', '.hg', '.svn', 'dist', 'build', 'out', 'coverage',
+    '__pycache__', '.venv', 'venv', '.next', '.nuxt', '.turbo', '.cache', 'vendor',
+}
+
+# Directory name -> source suffixes of the route files it holds
+ROUTE_DIRS = {
+    'routes': ('.ts', '.js', '.py'),
+    'controllers': ('.ts', '.js'),
+    'endpoints': ('.ts', '.py'),
+}
+
+SPEC_NAMES = {'swagger.json', 'swagger.yaml', 'openapi.json', 'openapi.yaml'}
+
+
+def walk_project(project_path: Path, skip_dirs=SKIP_DIRS):
+    """Yield (directory name, file entry) for every file under project_path in a
+    single os.scandir walk, without descending into skipped directories."""
+    # The project root has no directory name: `**/routes/*.ts` is relative to it
+    stack = [(str(project_path), '')]
+    while stack:
+        directory, dir_name = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        subdirs.append((entry.path, entry.name))
+                elif entry.is_file():
+                    yield dir_name, entry
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+def is_api_file(dir_name: str, name: str) -> bool:
+    """Whether a file matches any of the API file patterns:
+    *api*.{ts,js,py}, routes|controllers|endpoints/*, *.openapi.{json,yaml},
+    swagger.{json,yaml} and openapi.{json,yaml}."""
+    suffix = os.path.splitext(name)[1]
+    if 'api' in name and suffix in ('.ts', '.js', '.py'):
+        return True
+    if suffix in ROUTE_DIRS.get(dir_name, ()):
+        return True
+    return name in SPEC_NAMES or name.endswith(('.openapi.json', '.openapi.yaml'))
+
+
+def is_spec_file(file_path: Path) -> bool:
+    name = file_path.name.lower()
+    return 'openapi' in name or 'swagger' in name
+
+
 def find_api_files(project_path: Path) -> list:
-    """Find API-related files."""
-    patterns = [
-        "**/*api*.ts", "**/*api*.js", "**/*api*.py",
-        "**/routes/*.ts", "**/routes/*.js", "**/routes/*.py",
-        "**/controllers/*.ts", "**/controllers/*.js",
-        "**/endpoints/*.ts", "**/endpoints/*.py",
-        "**/*.openapi.json", "**/*.openapi.yaml",
-        "**/swagger.json", "**/swagger.yaml",
-        "**/openapi.json", "**/openapi.yaml"
+    """Find API-related files, classifying each file once during a single walk."""
+    return [
+        Path(entry.path)
+        for dir_name, entry in walk_project(project_path)
+        if is_api_file(dir_name, entry.name)
     ]
+
+# Operations listed per performance rule before the rest are summarized
+MAX_LISTED = 20
+
+
+def listed(operations: list) -> str:
+    shown = ', '.join(operations[:MAX_LISTED])
+    return shown + (f" and {len(operations) - MAX_LISTED} more" if len(operations) > MAX_LISTED else '')
+
+
+def check_openapi_spec_basic(content: str) -> tuple:
+    """Substring checks for YAML specs when PyYAML is not installed."""
+    issues = []
+    passed = []
+    if 'openapi:' in content or 'swagger:' in content:
+        passed.append("[OK] OpenAPI/Swagger version defined")
+    else:
+        issues.append("[X] No OpenAPI version found")
     
-    files = []
-    for pattern in patterns:
-        files.extend(project_path.glob(pattern))
+    if 'paths:' in content:
+        passed.append("[OK] Paths section exists")
+    else:
+        issues.append("[X] No paths defined")
     
-    # Exclude node_modules, etc.
-    return [f for f in files if not any(x in str(f) for x in ['node_modules', '.git', 'dist', 'build', '__pycache__'])]
+    if 'components:' in content or 'definitions:' in content:
+        passed.append("[OK] Schema components defined")
+    return passed, issues
+
 
 def check_openapi_spec(file_path: Path) -> dict:
     """Check OpenAPI/Swagger specification."""
     issues = []
     passed = []
+    findings = []
     
     try:
-        content = file_path.read_text(encoding='utf-8')
+        try:
+            spec = OpenAPISpec.load(file_path)
+        except SpecError as e:
+            if yaml is not None:
+                raise
+            passed, issues = check_openapi_spec_basic(file_path.read_text(encoding='utf-8'))
+            issues.append(f"[!] {e}; only basic YAML checks were run")
+            return {'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'openapi', 'findings': findings}
+        document = spec.document
         
-        if file_path.suffix == '.json':
-            spec = json.loads(content)
-        else:
-            # Basic YAML check
-            if 'openapi:' in content or 'swagger:' in content:
-                passed.append("[OK] OpenAPI/Swagger version defined")
-            else:
-                issues.append("[X] No OpenAPI version found")
-            
-            if 'paths:' in content:
-                passed.append("[OK] Paths section exists")
-            else:
-                issues.append("[X] No paths defined")
-            
-            if 'components:' in content or 'definitions:' in content:
-                passed.append("[OK] Schema components defined")
-            
-            return {'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'openapi'}
-        
-        # JSON OpenAPI checks
-        if 'openapi' in spec or 'swagger' in spec:
+        if 'openapi' in document or 'swagger' in document:
             passed.append("[OK] OpenAPI version defined")
+        else:
+            issues.append("[X] No OpenAPI version found")
         
-        if 'info' in spec:
-            if 'title' in spec['info']:
+        info = document.get('info')
+        if isinstance(info, dict):
+            if 'title' in info:
                 passed.append("[OK] API title defined")
-            if 'version' in spec['info']:
+            if 'version' in info:
                 passed.append("[OK] API version defined")
-            if 'description' not in spec['info']:
+            if 'description' not in info:
                 issues.append("[!] API description missing")
         
-        if 'paths' in spec:
-            path_count = len(spec['paths'])
-            passed.append(f"[OK] {path_count} endpoints defined")
-            
-            # Check each path
-            for path, methods in spec['paths'].items():
-                for method, details in methods.items():
-                    if method in ['get', 'post', 'put', 'patch', 'delete']:
-                        if 'responses' not in details:
-                            issues.append(f"[X] {method.upper()} {path}: No responses defined")
-                        if 'summary' not in details and 'description' not in details:
-                            issues.append(f"[!] {method.upper()} {path}: No description")
+        if 'paths' not in document:
+            issues.append("[X] No paths defined")
+        else:
+            passed.append(f"[OK] {len(document['paths'] or {})} endpoints defined")
+        
+        # Operations are checked one at a time; referenced schemas are resolved once
+        for operation in spec.iter_operations():
+            details = operation.spec
+            if operation.method in ['get', 'post', 'put', 'patch', 'delete']:
+                if 'responses' not in details:
+                    issues.append(f"[X] {operation.label}: No responses defined")
+                if 'summary' not in details and 'description' not in details:
+                    issues.append(f"[!] {operation.label}: No description")
+        
+        findings, get_count = check_spec_payloads(spec, str(file_path))
+        by_rule = {}
+        for item in findings:
+            by_rule.setdefault(item['rule'], []).append(item)
+        
+        def endpoints(rule, with_message=False):
+            return listed([f"{f['endpoint']} ({f['message'].split(': ', 1)[-1]})" if with_message else f['endpoint']
+                           for f in by_rule[rule]])
+        
+        if 'unpaginated-list' in by_rule:
+            issues.append(f"[!] {len(by_rule['unpaginated-list'])} list endpoints have no limit/cursor parameter: {endpoints('unpaginated-list')}")
+        elif get_count:
+            passed.append("[OK] List endpoints are paginated")
+        if 'unbounded-array' in by_rule:
+            issues.append(f"[!] {len(by_rule['unbounded-array'])} GET responses contain arrays without maxItems: {endpoints('unbounded-array', True)}")
+        if 'missing-cache-headers' in by_rule:
+            issues.append(f"[!] {len(by_rule['missing-cache-headers'])} of {get_count} GET operations declare no Cache-Control/ETag/Last-Modified header: {endpoints('missing-cache-headers')}")
+        elif get_count:
+            passed.append("[OK] GET responses declare caching headers")
+        if 'oversized-inline-schema' in by_rule:
+            issues.append(f"[!] {len(by_rule['oversized-inline-schema'])} inline schemas have more than {INLINE_SCHEMA_MAX_PROPERTIES} properties; move them to components: {endpoints('oversized-inline-schema', True)}")
         
     except Exception as e:
         issues.append(f"[X] Parse error: {e}")
     
-    return {'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'openapi'}
+    return {'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'openapi', 'findings': findings}
+
+
+# Detectors for check_api_code, compiled once into a single pattern
+API_CODE_RULES = RuleSet([
+    Rule('error_handling', [r'try\s*{', r'try:', r'\.catch\(', r'except\s+', r'catch\s*\('],
+         description="Error handling"),
+    Rule('status_codes', [
+        r'status\s*\(\s*\d{3}\s*\)', r'statusCode\s*[=:]\s*\d{3}',
+        r'HttpStatus\.', r'status_code\s*=\s*\d{3}',
+        r'\.status\(\d{3}\)', r'res\.status\(',
+    ], description="HTTP status codes"),
+    Rule('validation', [r'validate', r'schema', r'zod', r'joi', r'yup', r'pydantic', r'@Body\(', r'@Query\('],
+         re.IGNORECASE, description="Input validation"),
+    Rule('auth', [r'auth', r'jwt', r'bearer', r'token', r'middleware', r'guard', r'@Authenticated'],
+         re.IGNORECASE, description="Authentication/authorization"),
+    Rule('rate_limiting', [r'rateLimit', r'throttle', r'rate.?limit'], re.IGNORECASE, description="Rate limiting"),
+    Rule('logging', [r'console\.log', r'logger\.', r'logging\.', r'log\.'], description="Logging"),
+])
+
 
 def check_api_code(file_path: Path) -> dict:
     """Check API code for common issues."""
     issues = []
     passed = []
+    matches = {}
+    findings = []
+    features = set()
     
     try:
         content = file_path.read_text(encoding='utf-8')
+        matches = API_CODE_RULES.first_matches(content)
+        
+        def at(rule_id):
+            return f" (line {matches[rule_id].line})"
         
         # Check for error handling
-        error_patterns = [
-            r'try\s*{', r'try:', r'\.catch\(',
-            r'except\s+', r'catch\s*\('
-        ]
-        has_error_handling = any(re.search(p, content) for p in error_patterns)
-        if has_error_handling:
-            passed.append("[OK] Error handling present")
+        if 'error_handling' in matches:
+            passed.append("[OK] Error handling present" + at('error_handling'))
         else:
             issues.append("[X] No error handling found")
         
         # Check for status codes
-        status_patterns = [
-            r'status\s*\(\s*\d{3}\s*\)', r'statusCode\s*[=:]\s*\d{3}',
-            r'HttpStatus\.', r'status_code\s*=\s*\d{3}',
-            r'\.status\(\d{3}\)', r'res\.status\('
-        ]
-        has_status = any(re.search(p, content) for p in status_patterns)
-        if has_status:
-            passed.append("[OK] HTTP status codes used")
+        if 'status_codes' in matches:
+            passed.append("[OK] HTTP status codes used" + at('status_codes'))
         else:
             issues.append("[!] No explicit HTTP status codes")
         
         # Check for validation
-        validation_patterns = [
-            r'validate', r'schema', r'zod', r'joi', r'yup',
-            r'pydantic', r'@Body\(', r'@Query\('
-        ]
-        has_validation = any(re.search(p, content, re.I) for p in validation_patterns)
-        if has_validation:
-            passed.append("[OK] Input validation present")
+        if 'validation' in matches:
+            passed.append("[OK] Input validation present" + at('validation'))
         else:
             issues.append("[!] No input validation detected")
         
         # Check for auth middleware
-        auth_patterns = [
-            r'auth', r'jwt', r'bearer', r'token',
-            r'middleware', r'guard', r'@Authenticated'
-        ]
-        has_auth = any(re.search(p, content, re.I) for p in auth_patterns)
-        if has_auth:
-            passed.append("[OK] Authentication/authorization detected")
+        if 'auth' in matches:
+            passed.append("[OK] Authentication/authorization detected" + at('auth'))
         
         # Check for rate limiting
-        rate_patterns = [r'rateLimit', r'throttle', r'rate.?limit']
-        has_rate = any(re.search(p, content, re.I) for p in rate_patterns)
-        if has_rate:
-            passed.append("[OK] Rate limiting present")
+        if 'rate_limiting' in matches:
+            passed.append("[OK] Rate limiting present" + at('rate_limiting'))
         
         # Check for logging
-        log_patterns = [r'console\.log', r'logger\.', r'logging\.', r'log\.']
-        has_logging = any(re.search(p, content) for p in log_patterns)
-        if has_logging:
-            passed.append("[OK] Logging present")
+        if 'logging' in matches:
+            passed.append("[OK] Logging present" + at('logging'))
+        
+        # Check for unpaginated lists and N+1 queries in route handlers
+        findings, features = check_code_payloads(content, str(file_path))
+        for item in findings:
+            issues.append(f"[!] Line {item['line']}: {item['message']}")
         
     except Exception as e:
         issues.append(f"[X] Read error: {e}")
     
-    return {'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'code'}
+    return {
+        'file': str(file_path), 'passed': passed, 'issues': issues, 'type': 'code',
+        'matches': {rule: {'line': m.line, 'column': m.column, 'text': m.text} for rule, m in matches.items()},
+        'findings': findings, 'features': sorted(features),
+    }
+
+def check_file(file_path: Path) -> dict:
+    if is_spec_file(file_path):
+        return check_openapi_spec(file_path)
+    return check_api_code(file_path)
+
+
+def check_files(files: list, jobs=None) -> list:
+    """Check files in a process pool; results are in the order of `files`."""
+    if len(files) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(check_file, files, chunksize=max(1, len(files) // 64)))
+    return [check_file(f) for f in files]
+
 
 def main():
-    target = sys.argv[1] if len(sys.argv) > 1 else "."
-    project_path = Path(target)
+    parser = argparse.ArgumentParser(description="Check API endpoints for best practices")
+    parser.add_argument("project_path", nargs="?", default=".", help="Project directory (default: .)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print a structured JSON report instead of text")
+    args = parser.parse_args()
+    project_path = Path(args.project_path)
     
-    print("\n" + "=" * 60)
-    print("  API VALIDATOR - Endpoint Best Practices Check")
-    print("=" * 60 + "\n")
+    if not args.json:
+        print("\n" + "=" * 60)
+        print("  API VALIDATOR - Endpoint Best Practices Check")
+        print("=" * 60 + "\n")
     
     api_files = find_api_files(project_path)
     
     if not api_files:
+        if args.json:
+            print(json.dumps({"script": "api_validator", "project": str(project_path), "files_checked": 0, "findings": []}, indent=2))
+            sys.exit(0)
         print("[!] No API files found.")
         print("   Looking for: routes/, controllers/, api/, openapi.json/yaml")
         sys.exit(0)
     
-    results = []
-    for file_path in api_files[:15]:  # Limit
-        if 'openapi' in file_path.name.lower() or 'swagger' in file_path.name.lower():
-            result = check_openapi_spec(file_path)
-        else:
-            result = check_api_code(file_path)
-        results.append(result)
+    results = check_files(api_files, args.jobs)
     
-    # Print results
-    total_issues = 0
-    total_passed = 0
+    # Compression and caching are configured once per project, not per file
+    code_results = [r for r in results if r['type'] == 'code']
+    features = {feature for r in code_results for feature in r.get('features', [])}
+    project_findings = check_project_payloads(code_results, features)
+    
+    total_passed = sum(len(r['passed']) for r in results)
+    total_issues = sum(1 for r in results for item in r['issues'] if item.startswith("[X]"))
+    
+    if args.json:
+        findings = [f for r in results for f in r.get('findings', [])] + project_findings
+        by_rule = {}
+        for item in findings:
+            by_rule[item['rule']] = by_rule.get(item['rule'], 0) + 1
+        print(json.dumps({
+            "script": "api_validator",
+            "project": str(project_path),
+            "files_checked": len(results),
+            "passed": total_passed,
+            "critical_issues": total_issues,
+            "findings_by_rule": by_rule,
+            "findings": findings,
+            "files": [{k: r[k] for k in ('file', 'type', 'passed', 'issues')} for r in results],
+        }, indent=2))
+        sys.exit(0 if total_issues == 0 else 1)
     
+    # Print results
     for result in results:
         print(f"\n[FILE] {result['file']} [{result['type']}]")
         for item in result['passed']:
             print(f"   {item}")
-            total_passed += 1
         for item in result['issues']:
             print(f"   {item}")
-            if item.startswith("[X]"):
-                total_issues += 1
+    
+    if project_findings:
+        print(f"\n[PROJECT] {project_path}")
+        for item in project_findings:
+            print(f"   [!] {item['message']}")
     
     print("\n" + "=" * 60)
     print(f"[RESULTS] {total_passed} passed, {total_issues} critical issues")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+OpenAPI Spec - Loader and lazy $ref resolver for OpenAPI 3 / Swagger 2 specs.
+
+Specs are loaded from JSON, or from YAML with PyYAML's safe loader (the C
+loader when available). Local `$ref`s ("#/components/schemas/User") are
+resolved only when a check asks for them, and each one is resolved once, so
+checking a spec with 10k+ operations does not expand shared components per
+operation. Operations are yielded one at a time.
+
+Usage:
+    python openapi_spec.py <openapi.yaml|openapi.json>    # prints a summary of the operations
+"""
+
+import sys
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import unquote
+
+try:
+    import yaml
+    YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:  # PyYAML is optional; only JSON specs can be loaded without it
+    yaml = None
+
+
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+
+
+class SpecError(Exception):
+    pass
+
+
+@dataclass
+class Operation:
+    path: str
+    method: str
+    spec: dict              # the operation object
+    path_item: dict
+
+    @property
+    def label(self) -> str:
+        return f"{self.method.upper()} {self.path}"
+
+
+class OpenAPISpec:
+    def __init__(self, document: dict):
+        if not isinstance(document, dict):
+            raise SpecError("spec is not a mapping")
+        self.document = document
+        self._refs = {}
+
+    @classmethod
+    def load(cls, file_path: Path) -> 'OpenAPISpec':
+        """Load a JSON or YAML spec. Raises SpecError if YAML is needed but PyYAML is missing."""
+        with open(file_path, 'rb') as f:
+            if Path(file_path).suffix == '.json':
+                return cls(json.load(f))
+            if yaml is None:
+                raise SpecError("PyYAML is not installed (pip install pyyaml)")
+            return cls(yaml.load(f, Loader=YAML_LOADER))
+
+    @property
+    def is_swagger2(self) -> bool:
+        return 'swagger' in self.document
+
+    def resolve(self, node):
+        """Follow `$ref`s until a non-reference node. External references and
+        cycles resolve to None."""
+        seen = set()
+        while isinstance(node, dict) and '$ref' in node:
+            ref = node['$ref']
+            if ref in seen:
+                return None
+            seen.add(ref)
+            node = self._lookup(ref)
+        return node
+
+    def _lookup(self, ref: str):
+        if ref not in self._refs:
+            target = None
+            if isinstance(ref, str) and ref.startswith('#/'):
+                target = self.document
+                for part in ref[2:].split('/'):
+                    part = unquote(part).replace('~1', '/').replace('~0', '~')
+                    if isinstance(target, dict) and part in target:
+                        target = target[part]
+                    elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+                        target = target[int(part)]
+                    else:
+                        target = None
+                        break
+            self._refs[ref] = target
+        return self._refs[ref]
+
+    def iter_operations(self):
+        """Yield every operation in the spec, in document order."""
+        paths = self.document.get('paths') or {}
+        for path, path_item in paths.items():
+            path_item = self.resolve(path_item)
+            if not isinstance(path_item, dict):
+                continue
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if isinstance(operation, dict):
+                    yield Operation(path, method, operation, path_item)
+
+    def parameters(self, operation: Operation) -> list:
+        """Resolved parameters of an operation, including path-level ones it doesn't override."""
+        params = {}
+        for source in (operation.path_item.get('parameters'), operation.spec.get('parameters')):
+            for param in source or []:
+                param = self.resolve(param)
+                if isinstance(param, dict) and 'name' in param:
+                    params[(param['name'], param.get('in'))] = param
+        return list(params.values())
+
+    def success_responses(self, operation: Operation) -> list:
+        """(status, resolved response) for each 2xx response."""
+        responses = operation.spec.get('responses') or {}
+        result = []
+        for status, response in responses.items():
+            if str(status).startswith('2'):
+                response = self.resolve(response)
+                if isinstance(response, dict):
+                    result.append((str(status), response))
+        return result
+
+    def response_schema(self, response: dict):
+        """The (unresolved) schema of a JSON response, if any."""
+        if self.is_swagger2:
+            return response.get('schema')
+        return json_media_schema(response.get('content'))
+
+    def request_schema(self, operation: Operation):
+        """The (unresolved) schema of a JSON request body, if any."""
+        if self.is_swagger2:
+            body = next((p for p in self.parameters(operation) if p.get('in') == 'body'), None)
+            return body.get('schema') if body else None
+        body = self.resolve(operation.spec.get('requestBody'))
+        return json_media_schema(body.get('content')) if isinstance(body, dict) else None
+
+
+def json_media_schema(content):
+    """Schema of the JSON media type of an OpenAPI 3 `content` map, if any."""
+    if not isinstance(content, dict):
+        return None
+    for media_type, media in content.items():
+        if 'json' in media_type and isinstance(media, dict):
+            return media.get('schema')
+    return None
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    spec = OpenAPISpec.load(Path(sys.argv[1]))
+    operations = [op.label for op in spec.iter_operations()]
+    print(json.dumps({"swagger2": spec.is_swagger2, "operations": len(operations), "first": operations[:20]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Payload Checks - Pagination, payload size and caching rules for API specs and code.
+
+The biggest API incidents come from unpaginated list endpoints and unbounded
+responses. This check family looks for them in both places they show up:
+
+OpenAPI specs (`check_spec_payloads`):
+    unpaginated-list          list endpoint without a limit/cursor parameter
+    unbounded-array           array without maxItems in a GET response
+    missing-cache-headers     GET response without Cache-Control/ETag/Last-Modified
+    oversized-inline-schema   inline request/response schema with too many properties
+
+API code (`check_code_payloads`, `check_project_payloads`):
+    unpaginated-list          GET handler that fetches all rows and reads no limit/cursor
+    n-plus-one-query          database call inside a loop in a route handler
+    missing-compression       no response compression middleware in the project
+    missing-cache-headers     no Cache-Control/ETag handling in the project
+
+Code checks are heuristics over the source text: a route handler runs from
+its route declaration to the next one, and a loop body is the indented block
+(or the rest of the line) after the loop. Findings are plain dicts, so they
+can be printed or written as JSON.
+"""
+
+import re
+import bisect
+
+from openapi_spec import OpenAPISpec
+from rule_engine import Rule, RuleSet
+
+
+# Query parameters that bound a list response, compared without case, '_', '-' and '$'
+PAGINATION_PARAMS = {
+    'limit', 'pagesize', 'perpage', 'size', 'first', 'last', 'top', 'maxresults', 'count',
+    'cursor', 'after', 'before', 'page', 'offset', 'skip', 'pagetoken', 'nexttoken',
+    'startingafter', 'endingbefore',
+}
+CACHE_HEADERS = {'cache-control', 'etag', 'last-modified', 'expires'}
+# Properties that hold the items of an enveloped list response: {"data": [...], "next": ...}
+LIST_ENVELOPE_KEYS = ('data', 'items', 'results', 'records', 'entries', 'edges', 'nodes', 'content')
+INLINE_SCHEMA_MAX_PROPERTIES = 30
+MAX_SCHEMA_DEPTH = 32
+
+
+def normalize_param(name) -> str:
+    # YAML loads names such as `123` or `on` as numbers and booleans
+    return str(name).lower().replace('_', '').replace('-', '').replace('$', '')
+
+
+def list_payload_path(spec: OpenAPISpec, schema):
+    """() if the response is a JSON array, (key,) if it is an envelope whose `key`
+    is an array, else None."""
+    resolved = spec.resolve(schema)
+    if not isinstance(resolved, dict):
+        return None
+    if resolved.get('type') == 'array' or 'items' in resolved:
+        return ()
+    properties = resolved.get('properties') or {}
+    for key in LIST_ENVELOPE_KEYS:
+        prop = spec.resolve(properties.get(key))
+        if isinstance(prop, dict) and (prop.get('type') == 'array' or 'items' in prop):
+            return (key,)
+    return None
+
+
+def unbounded_arrays(spec: OpenAPISpec, schema, memo: dict, depth=0) -> list:
+    """Paths (tuples of property names, '[]' for items) of arrays without maxItems.
+
+    Results for `$ref`d schemas are memoized by reference, so each shared
+    component is walked once per spec; recursive references end the walk.
+    """
+    if depth > MAX_SCHEMA_DEPTH or not isinstance(schema, dict):
+        return []
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if ref not in memo:
+            memo[ref] = []  # placeholder while walking, so cycles stop here
+            memo[ref] = unbounded_arrays(spec, spec.resolve(schema), memo, depth + 1)
+        return memo[ref]
+    found = []
+    if schema.get('type') == 'array' or 'items' in schema:
+        if 'maxItems' not in schema:
+            found.append(())
+        found.extend(('[]',) + p for p in unbounded_arrays(spec, schema.get('items'), memo, depth + 1))
+    for name, prop in (schema.get('properties') or {}).items():
+        found.extend((name,) + p for p in unbounded_arrays(spec, prop, memo, depth + 1))
+    for key in ('allOf', 'oneOf', 'anyOf'):
+        for sub in schema.get(key) or []:
+            found.extend(unbounded_arrays(spec, sub, memo, depth + 1))
+    if isinstance(schema.get('additionalProperties'), dict):
+        found.extend(('*',) + p for p in unbounded_arrays(spec, schema['additionalProperties'], memo, depth + 1))
+    return list(dict.fromkeys(found))
+
+
+def inline_property_count(schema, depth=0) -> int:
+    """Properties declared inline in a schema tree, not counting `$ref`d schemas."""
+    if depth > MAX_SCHEMA_DEPTH or not isinstance(schema, dict) or '$ref' in schema:
+        return 0
+    properties = schema.get('properties') or {}
+    count = len(properties)
+    for prop in properties.values():
+        count += inline_property_count(prop, depth + 1)
+    count += inline_property_count(schema.get('items'), depth + 1)
+    for key in ('allOf', 'oneOf', 'anyOf'):
+        for sub in schema.get(key) or []:
+            count += inline_property_count(sub, depth + 1)
+    return count
+
+
+def format_schema_path(path: tuple) -> str:
+    return ''.join(p if p == '[]' else f'.{p}' for p in map(str, path)).lstrip('.') or '(root)'
+
+
+
+def finding(rule: str, message: str, file=None, line=None, endpoint=None, severity='warning') -> dict:
+    return {'rule': rule, 'severity': severity, 'file': file, 'line': line, 'endpoint': endpoint, 'message': message}
+
+
+def check_spec_payloads(spec: OpenAPISpec, file=None) -> tuple:
+    """Findings for every operation of a spec, and the number of GET operations checked."""
+    findings = []
+    memo = {}
+    get_count = 0
+    for operation in spec.iter_operations():
+        responses = spec.success_responses(operation)
+        if operation.method == 'get' and responses:
+            get_count += 1
+            params = {normalize_param(p['name']) for p in spec.parameters(operation) if p.get('in') == 'query'}
+            schema = spec.response_schema(responses[0][1])
+            list_path = list_payload_path(spec, schema) if schema is not None else None
+            if list_path is not None and not params & PAGINATION_PARAMS:
+                findings.append(finding('unpaginated-list', "List endpoint has no limit/cursor parameter",
+                                        file, endpoint=operation.label))
+            if schema is not None:
+                # The list itself is bounded by pagination, or reported above
+                arrays = [p for p in unbounded_arrays(spec, schema, memo) if p != list_path]
+                if arrays:
+                    paths = ', '.join(format_schema_path(p) for p in arrays[:5])
+                    findings.append(finding('unbounded-array', f"Response arrays without maxItems: {paths}",
+                                            file, endpoint=operation.label))
+            headers = {str(name).lower() for _, r in responses for name in (r.get('headers') or {})}
+            if not headers & CACHE_HEADERS:
+                findings.append(finding('missing-cache-headers', "No Cache-Control/ETag/Last-Modified response header",
+                                        file, endpoint=operation.label))
+
+        for kind, schema in (('request', spec.request_schema(operation)),
+                             ('response', spec.response_schema(responses[0][1]) if responses else None)):
+            count = inline_property_count(schema)
+            if count > INLINE_SCHEMA_MAX_PROPERTIES:
+                findings.append(finding('oversized-inline-schema', f"Inline {kind} schema has {count} properties",
+                                        file, endpoint=operation.label))
+    return findings, get_count
+
+
+ROUTE_OBJECTS = ('app', 'router', 'server', 'fastify', 'api', 'route', 'routes')
+PAGINATION_WORDS = ('limit', 'take', 'skip', 'offset', 'cursor', 'page_?size', 'per_?page', 'page_?token', r'paginat\w*')
+
+# Detectors for route handlers, scanned once per file. Alternatives start with
+# a literal (or \b and a literal) so the combined scan can skip ahead quickly.
+CODE_PAYLOAD_RULES = RuleSet([
+    # app.get('/users', ...), router.post(...), @app.get("/users"), @bp.route(...), @Get()
+    Rule('route', [
+        *(rf'\b{name}\.(?:get|post|put|patch|delete|all)\s*\(' for name in ROUTE_OBJECTS),
+        r'@\w+\.(?:get|post|put|patch|delete|route|api_route)\s*\(',
+        r'@(?:Get|Post|Put|Patch|Delete)\s*\(',
+    ]),
+    # Queries that return every row unless bounded
+    Rule('fetch_all', [
+        r'\.findMany\s*\(', r'\.findAll\s*\(', r'\.find\s*\(\s*(?:\{\s*\})?\s*\)',
+        r'\.objects\.all\s*\(', r'\.all\s*\(\s*\)', r'\.fetchall\s*\(',
+    ]),
+    Rule('sql_select', [r'\bselect\s[^;\'"`]*?\bfrom\b'], re.IGNORECASE),
+    Rule('pagination', [rf'\b{word}\b' for word in PAGINATION_WORDS], re.IGNORECASE),
+    Rule('loop', [
+        r'\bfor\s*\(', r'\bfor\s+[\w, ()]+\s+in\s', r'\bwhile\s*\(',
+        r'\.(?:map|forEach)\s*\(\s*async\b',
+    ]),
+    Rule('db_call', [
+        r'\bawait\s+(?:prisma|db|knex|pool|client|sql|\w*[Rr]epo(?:sitory)?|\w+Model)\b',
+        r'\.(?:findOne|findUnique|findFirst|findById|findByPk|get_object_or_404)\s*\(',
+        r'\bsession\.(?:query|get|execute|scalars?)\s*\(', r'\.objects\.(?:get|filter)\s*\(',
+        *(rf'\b{name}\.(?:execute|query)\s*\(' for name in ('cursor', 'conn', 'connection', 'db')),
+    ]),
+    Rule('compression', [
+        r'\bcompression\s*\(', r'GZipMiddleware', r'\bCompress\s*\(', r'@fastify/compress',
+        r'\bgzip\b', r'\bbrotli\b', r'Content-Encoding',
+    ]),
+    Rule('cache_headers', [r'cache-control', r'cache_control', r'\betag\b', r'last-modified', r'\bmax-age\b'],
+         re.IGNORECASE),
+])
+
+ROUTE_METHOD = re.compile(r'\.(get|post|put|patch|delete|all|route|api_route)\b|@(Get|Post|Put|Patch|Delete)\b')
+
+
+def route_method(route_text: str) -> str:
+    match = ROUTE_METHOD.search(route_text)
+    if not match:
+        return 'get'
+    method = (match.group(1) or match.group(2)).lower()
+    # Flask's @app.route and catch-all routes serve GET unless told otherwise
+    return 'get' if method in ('route', 'api_route', 'all') else method
+
+
+def indentation(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def loop_body_end(lines: list, loop_line: int) -> int:
+    """Last line (1-based) of the indented block after a loop on `loop_line`."""
+    loop_indent = indentation(lines[loop_line - 1])
+    end = loop_line
+    for number in range(loop_line + 1, len(lines) + 1):
+        line = lines[number - 1]
+        if not line.strip():
+            continue
+        if indentation(line) <= loop_indent:
+            # A closing bracket at the loop's indentation still belongs to it
+            if line.strip()[0] in ')}]':
+                end = number
+            break
+        end = number
+    return end
+
+
+def check_code_payloads(content: str, file=None) -> tuple:
+    """Findings for the route handlers of one source file, and the project-wide
+    features seen in it ({'compression', 'cache_headers'} subset)."""
+    matches = list(CODE_PAYLOAD_RULES.finditer(content, overlapping=True))
+    features = {m.rule for m in matches if m.rule in ('compression', 'cache_headers')}
+    routes = [m for m in matches if m.rule == 'route']
+    if not routes:
+        return [], features
+
+    lines = content.split('\n')
+    match_lines = [m.line for m in matches]
+    findings = []
+    for index, route in enumerate(routes):
+        # A handler runs until the next route declaration
+        end = routes[index + 1].line - 1 if index + 1 < len(routes) else len(lines)
+        body = matches[bisect.bisect_left(match_lines, route.line):bisect.bisect_right(match_lines, end)]
+        method = route_method(route.text)
+        endpoint = f"{method.upper()} handler at line {route.line}"
+
+        if method == 'get':
+            fetch_all = next((m for m in body if m.rule in ('fetch_all', 'sql_select')), None)
+            if fetch_all and not any(m.rule == 'pagination' for m in body):
+                findings.append(finding(
+                    'unpaginated-list',
+                    f"Handler fetches all rows with `{fetch_all.text.strip()[:40]}` and reads no limit/cursor",
+                    file, fetch_all.line, endpoint,
+                ))
+
+        reported_loops = set()
+        for loop in (m for m in body if m.rule == 'loop'):
+            loop_end = min(loop_body_end(lines, loop.line), end)
+            call = next((m for m in body if m.rule == 'db_call' and (
+                m.line > loop.line or (m.line == loop.line and m.column > loop.column)) and m.line <= loop_end), None)
+            if call and loop.line not in reported_loops:
+                reported_loops.add(loop.line)
+                findings.append(finding(
+                    'n-plus-one-query',
+                    f"Database call `{call.text.strip()[:40]}` inside a loop at line {loop.line} (N+1 queries); batch it into one query",
+                    file, call.line, endpoint,
+                ))
+    return findings, features
+
+
+def check_project_payloads(code_files: list, features: set) -> list:
+    """Project-level findings: compression and caching are usually set up once,
+    so they are reported only if no API file handles them."""
+    if not code_files:
+        return []
+    findings = []
+    if 'compression' not in features:
+        findings.append(finding('missing-compression',
+                                "No response compression (e.g. compression(), GZipMiddleware) found in API code"))
+    if 'cache_headers' not in features:
+        findings.append(finding('missing-cache-headers',
+                                "No Cache-Control/ETag handling found in API code"))
+    return findings
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Rule Engine - Scan a file once for many regex detectors.
+
+Each rule is a list of alternative patterns. The patterns of all rules in
+a RuleSet are compiled into one flat alternation, each followed by an empty
+marker group that identifies its rule, so a file is scanned once however
+many rules there are, and each match reports the rule that produced it with
+its line and column. (A flat alternation lets the regex engine skip
+positions by their first character; wrapping each rule in its own group
+would defeat that, and so would a leading \\b, which is therefore moved
+behind the first literal character: `\\bfor` is matched as `f(?<!\\wf)or`.)
+
+Case-insensitive rules are matched against a lowercased copy of the text
+with lowercased patterns, which Python's regex engine handles several
+times faster than IGNORECASE; the case-sensitive and case-insensitive
+rules therefore make one pass each.
+
+Because the patterns share one regex, their groups are renumbered and their
+group names must be unique, so patterns may not use backreferences (\\1,
+(?P=name)) or named groups; RuleSet rejects them with ValueError. Use plain
+(or non-capturing) groups; a rule needing a backreference belongs in a
+separate re.compile.
+
+`finditer` reports non-overlapping matches, like re.finditer, trying the
+rules in order at each position; with overlapping=True it also reports
+matches that start inside an earlier match. `first_matches` finds the first
+match of every rule, even where it overlaps another rule's match.
+
+Usage:
+    from rule_engine import Rule, RuleSet
+
+    rules = RuleSet([
+        Rule('error_handling', [r'try\\s*{', r'\\.catch\\(']),
+        Rule('auth', [r'auth', r'jwt'], re.IGNORECASE),
+    ])
+    rules.first_matches(content)    # {'auth': RuleMatch(rule='auth', line=3, ...)}
+"""
+
+import re
+import bisect
+import heapq
+from dataclasses import dataclass, field as dataclass_field
+
+
+# Flags that can be scoped to one rule inside the combined pattern
+SCOPED_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's'}
+
+# Escapes whose meaning changes when lowercased (\S vs \s) or that name a
+# character by code point; patterns using them keep the IGNORECASE flag
+CASE_SENSITIVE_ESCAPES = re.compile(r'\\[A-Zxu]')
+
+
+# Backreferences (\1, (?P=name)) and named groups (?P<name>...). Every escape is
+# consumed, so `\\1` (an escaped backslash, then 1) is not taken for a backreference.
+GROUP_REFERENCES = re.compile(r'\\(?:(?P<backreference>[1-9])|.)|(?P<named>\(\?P[<=])', re.DOTALL)
+
+LEADING_WORD_BOUNDARY = re.compile(r'^\\b([A-Za-z0-9_])(?![*+?{])')
+
+
+def hoist_word_boundary(pattern: str) -> str:
+    """Rewrite `\\bx...` as `x(?<!\\wx)...`, which matches the same text but keeps
+    the literal first character the regex engine uses to skip ahead."""
+    return LEADING_WORD_BOUNDARY.sub(lambda m: f'{m.group(1)}(?<!\\w{m.group(1)})', pattern)
+
+
+def fold_pattern(pattern: str) -> str:
+    """Lowercase the literal characters of a pattern, leaving escapes alone."""
+    return re.sub(r'\\.|[^\\]+', lambda m: m.group() if m.group().startswith('\\') else m.group().lower(), pattern)
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    patterns: list = dataclass_field(default_factory=list)
+    flags: int = 0
+    description: str = ''
+
+    @property
+    def foldable(self) -> bool:
+        """Whether the rule can match a lowercased text instead of using IGNORECASE."""
+        return bool(self.flags & re.IGNORECASE) and not any(CASE_SENSITIVE_ESCAPES.search(p) for p in self.patterns)
+
+    def alternatives(self, folded=False) -> list:
+        """The rule's patterns, with its flags scoped to each of them."""
+        unsupported = self.flags & ~sum(SCOPED_FLAGS)
+        if unsupported:
+            raise ValueError(f"rule '{self.id}': only IGNORECASE, MULTILINE and DOTALL can be used per rule")
+        for pattern in self.patterns:
+            if any(m.group('backreference') or m.group('named') for m in GROUP_REFERENCES.finditer(pattern)):
+                raise ValueError(f"rule '{self.id}': backreferences and named groups can't be used in a combined "
+                                 f"pattern, whose groups are renumbered: {pattern!r}")
+        flags = self.flags & ~re.IGNORECASE if folded else self.flags
+        patterns = [hoist_word_boundary(fold_pattern(p) if folded else p) for p in self.patterns]
+        letters = ''.join(letter for flag, letter in SCOPED_FLAGS.items() if flags & flag)
+        return [f'(?{letters}:{p})' for p in patterns] if letters else list(patterns)
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    rule: str
+    line: int
+    column: int
+    text: str
+
+
+class LineIndex:
+    """Maps string offsets to 1-based line numbers."""
+
+    def __init__(self, text: str):
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+
+    def position(self, offset: int):
+        """(line, column) of an offset, both 1-based."""
+        line = bisect.bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+
+class RuleSet:
+    def __init__(self, rules: list):
+        self.rules = list(rules)
+        for rule in self.rules:
+            rule.alternatives()     # raises ValueError for patterns that can't be combined
+        self.folded = tuple(i for i, rule in enumerate(self.rules) if rule.foldable)
+        self.exact = tuple(i for i, rule in enumerate(self.rules) if not rule.foldable)
+        self._patterns = {}
+
+    def _pattern_for(self, indexes: tuple, folded: bool):
+        """Combined pattern for a subset of the rules and its {marker group: rule index},
+        compiled once per subset."""
+        key = (indexes, folded)
+        if key not in self._patterns:
+            parts = []
+            markers = {}
+            group = 0
+            for i in indexes:
+                for pattern in self.rules[i].alternatives(folded):
+                    # The marker follows the pattern's own groups
+                    group += re.compile(pattern).groups + 1
+                    markers[group] = i
+                    parts.append(f'{pattern}()')
+            self._patterns[key] = (re.compile('|'.join(parts)), markers)
+        return self._patterns[key]
+
+    def _passes(self, text: str):
+        """(text, rule indexes, folded) for each pass over the text."""
+        lowered = text.lower() if self.folded else text
+        if len(lowered) != len(text):
+            # Some characters lowercase to several, which would shift offsets
+            return [(text, tuple(range(len(self.rules))), False)]
+        passes = []
+        if self.exact:
+            passes.append((text, self.exact, False))
+        if self.folded:
+            passes.append((lowered, self.folded, True))
+        return passes
+
+    def _match(self, match, rule_index: int, text: str, lines: LineIndex) -> RuleMatch:
+        line, column = lines.position(match.start())
+        return RuleMatch(self.rules[rule_index].id, line, column, text[match.start():match.end()])
+
+    def _scan(self, text: str, indexes: tuple, folded: bool, overlapping: bool):
+        pattern, markers = self._pattern_for(indexes, folded)
+        if overlapping:
+            match = pattern.search(text)
+            while match:
+                yield match.start(), markers[match.lastindex], match
+                match = pattern.search(text, match.start() + 1)
+            return
+        for match in pattern.finditer(text):
+            # The marker closes after the pattern's own groups, so it is the last group
+            yield match.start(), markers[match.lastindex], match
+
+    def finditer(self, text: str, overlapping=False):
+        """Yield a RuleMatch for every match of a rule, in text order."""
+        lines = LineIndex(text)
+        streams = [
+            self._scan(scanned, indexes, folded, overlapping)
+            for scanned, indexes, folded in self._passes(text)
+        ]
+        for _, rule_index, match in heapq.merge(*streams, key=lambda item: item[:2]):
+            yield self._match(match, rule_index, text, lines)
+
+    def first_matches(self, text: str) -> dict:
+        """First match of each rule that matches, keyed by rule id in rule order.
+
+        Rules drop out of the pattern once they have matched and the scan resumes
+        where it stopped, so each pass still reads the text once and ends early
+        when all of its rules have matched.
+        """
+        found = {}
+        lines = None
+        for scanned, remaining, folded in self._passes(text):
+            position = 0
+            while remaining:
+                pattern, markers = self._pattern_for(remaining, folded)
+                match = pattern.search(scanned, position)
+                if match is None:
+                    break
+                if lines is None:
+                    lines = LineIndex(text)
+                index = markers[match.lastindex]
+                found[self.rules[index].id] = self._match(match, index, text, lines)
+                remaining = tuple(i for i in remaining if i != index)
+                # Another rule may match at the same position
+                position = match.start()
+        return {rule.id: found[rule.id] for rule in self.rules if rule.id in found}
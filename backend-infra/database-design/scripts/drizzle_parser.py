@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Drizzle Parser - Table definitions from Drizzle ORM TypeScript schema files.
+
+Tokenizes the TypeScript source once and extracts every table declared with
+pgTable / mysqlTable / sqliteTable / singlestoreTable (or a table creator such
+as `pgSchema(...).table`), with its columns, column modifiers, references and
+the indexes and constraints of the extra-config callback, in both the object
+(`(t) => ({ ... })`) and array (`(t) => [ ... ]`) forms.
+
+This is not a full TypeScript parser: it only follows the call shapes that
+Drizzle schema files use, and skips everything else.
+
+Parsed tables are plain dicts, so they can be cached as JSON; see
+`parse_drizzle_file_cached`, which keys the cache by content hash and keeps
+the MAX_CACHED_ASTS most recently used entries.
+
+Columns spread into a table from a helper (`...timestamps`) are not resolved;
+their names are listed under the table's 'spreads', so checks can treat the
+columns they add as unknown rather than missing.
+
+Usage:
+    python drizzle_parser.py <schema.ts>    # prints the parsed tables as JSON
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+
+TABLE_FUNCTIONS = {'pgTable', 'mysqlTable', 'sqliteTable', 'singlestoreTable', 'table'}
+
+# Extra-config builders and the kind of constraint each one declares
+INDEX_BUILDERS = {'index': 'index', 'uniqueIndex': 'unique', 'unique': 'unique', 'primaryKey': 'primary', 'foreignKey': 'foreign'}
+
+# Bump when the parsed structure changes so cached ASTs are discarded
+AST_VERSION = 2
+
+# Cached ASTs kept per cache directory; the least recently used are evicted
+MAX_CACHED_ASTS = 256
+
+TOKEN_RE = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)
+  | (?P<number>\d[\w.]*)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>=>|\.\.\.|\?\.|[{}()\[\],:;.=<>!?&|+\-*/%^~@#])
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+OPEN = {'(': ')', '[': ']', '{': '}'}
+CLOSE = {')', ']', '}'}
+
+
+def tokenize(text: str) -> list:
+    """Return (kind, value, line) tuples, without whitespace and comments."""
+    tokens = []
+    line = 1
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind not in ('space', 'comment', 'newline'):
+            tokens.append((kind, value, line))
+        line += value.count('\n')
+    return tokens
+
+
+def string_value(token) -> str:
+    return token[1][1:-1]
+
+
+def matching_close(tokens: list, start: int) -> int:
+    """Index of the bracket closing the one at `start` (or len(tokens))."""
+    depth = 0
+    for i in range(start, len(tokens)):
+        value = tokens[i][1]
+        if value in OPEN:
+            depth += 1
+        elif value in CLOSE:
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens)
+
+
+def split_top_level(tokens: list, start: int, end: int) -> list:
+    """Split tokens[start:end] on top-level commas into (start, end) ranges."""
+    parts = []
+    depth = 0
+    part_start = start
+    for i in range(start, end):
+        value = tokens[i][1]
+        if value in OPEN:
+            depth += 1
+        elif value in CLOSE:
+            depth -= 1
+        elif value == ',' and depth == 0:
+            parts.append((part_start, i))
+            part_start = i + 1
+    if part_start < end:
+        parts.append((part_start, end))
+    return parts
+
+
+def call_chain(tokens: list, start: int, end: int) -> list:
+    """Calls in an expression such as `integer('a').notNull().references(...)`,
+    as [(name, args_start, args_end)], where args exclude the parentheses."""
+    calls = []
+    i = start
+    while i < end:
+        kind, value, _ = tokens[i]
+        if value in OPEN:
+            i = matching_close(tokens, i) + 1
+            continue
+        if kind == 'name' and i + 1 < end and tokens[i + 1][1] == '(':
+            close = matching_close(tokens, i + 1)
+            calls.append((value, i + 2, close))
+            i = close + 1
+            continue
+        i += 1
+    return calls
+
+
+def member_names(tokens: list, start: int, end: int) -> list:
+    """Property names of member accesses like `table.authorId` in tokens[start:end]."""
+    names = []
+    for i in range(start + 1, end):
+        if tokens[i - 1][1] in ('.', '?.') and tokens[i][0] == 'name':
+            names.append(tokens[i][1])
+    return names
+
+
+def parse_column(key: str, tokens: list, start: int, end: int) -> dict:
+    calls = call_chain(tokens, start, end)
+    column = {
+        'key': key,
+        'name': key,
+        'type': calls[0][0] if calls else None,
+        'modifiers': [name for name, _, _ in calls[1:]],
+        'references': None,
+        'line': tokens[start][2] if start < len(tokens) else 0,
+    }
+    if calls:
+        _, args_start, args_end = calls[0]
+        if args_start < args_end and tokens[args_start][0] == 'string':
+            column['name'] = string_value(tokens[args_start])
+    for name, args_start, args_end in calls[1:]:
+        if name == 'references':
+            # .references(() => users.id, { onDelete: 'cascade' })
+            first_arg = split_top_level(tokens, args_start, args_end)[:1]
+            for arg_start, arg_end in first_arg:
+                arrow = next((i for i in range(arg_start, arg_end) if tokens[i][1] == '=>'), None)
+                if arrow is not None:
+                    path = [t[1] for t in tokens[arrow + 1:arg_end] if t[0] == 'name']
+                    if len(path) >= 2:
+                        column['references'] = {'table': path[-2], 'column': path[-1]}
+    return column
+
+
+def parse_constraints(tokens: list, start: int, end: int) -> list:
+    """Indexes and constraints declared in the extra-config argument of a table."""
+    constraints = []
+    i = start
+    while i < end:
+        kind, value, line = tokens[i]
+        if kind == 'name' and value in INDEX_BUILDERS and i + 1 < end and tokens[i + 1][1] == '(':
+            # Ignore property names such as `.index(` on other objects
+            if i > start and tokens[i - 1][1] in ('.', '?.'):
+                i += 1
+                continue
+            chain_end = i
+            depth = 0
+            # The builder's chain ends at the next top-level comma or closing bracket
+            while chain_end < end:
+                v = tokens[chain_end][1]
+                if v in OPEN:
+                    depth += 1
+                elif v in CLOSE:
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif v == ',' and depth == 0:
+                    break
+                chain_end += 1
+            calls = call_chain(tokens, i, chain_end)
+            columns = []
+            on_call = next((c for c in calls[1:] if c[0] == 'on'), None)
+            if on_call:
+                columns = member_names(tokens, on_call[1], on_call[2])
+            else:
+                # primaryKey({ columns: [t.a, t.b] }) / foreignKey({ columns: [...], foreignColumns: [...] })
+                _, args_start, args_end = calls[0]
+                for j in range(args_start, args_end - 1):
+                    if tokens[j][1] == 'columns' and tokens[j + 1][1] == ':' and j + 2 < args_end and tokens[j + 2][1] == '[':
+                        columns = member_names(tokens, j + 2, matching_close(tokens, j + 2))
+                        break
+                else:
+                    # Older positional form: primaryKey(t.a, t.b)
+                    columns = member_names(tokens, args_start, args_end)
+            constraints.append({'kind': INDEX_BUILDERS[value], 'columns': columns, 'line': line})
+            i = chain_end
+            continue
+        i += 1
+    return constraints
+
+
+def parse_drizzle_source(text: str) -> list:
+    """Parse every table declared in a Drizzle schema source file."""
+    tokens = tokenize(text)
+    tables = []
+    i = 0
+    while i < len(tokens) - 3:
+        # const users = pgTable('users', { ... }, (t) => ...)
+        if tokens[i][1] in ('const', 'let', 'var') and tokens[i + 1][0] == 'name' and tokens[i + 2][1] == '=':
+            variable = tokens[i + 1][1]
+            line = tokens[i][2]
+            j = i + 3
+            # Skip a table-creator prefix such as `mySchema.table` or `createTable`
+            while j + 1 < len(tokens) and tokens[j][0] == 'name' and tokens[j + 1][1] in ('.', '?.'):
+                j += 2
+            if j + 1 < len(tokens) and tokens[j + 1][1] == '(' and (tokens[j][1] in TABLE_FUNCTIONS or tokens[j][1].endswith('Table')):
+                close = matching_close(tokens, j + 1)
+                args = split_top_level(tokens, j + 2, close)
+                if len(args) >= 2 and tokens[args[0][0]][0] == 'string' and tokens[args[1][0]][1] == '{':
+                    tables.append(parse_table(variable, tokens, args, line))
+                    i = close + 1
+                    continue
+        i += 1
+    return tables
+
+
+def parse_table(variable: str, tokens: list, args: list, line: int) -> dict:
+    table = {
+        'variable': variable,
+        'name': string_value(tokens[args[0][0]]),
+        'columns': [],
+        'constraints': [],
+        'spreads': [],
+        'line': line,
+    }
+    columns_start, columns_end = args[1]
+    columns_close = matching_close(tokens, columns_start)
+    for part_start, part_end in split_top_level(tokens, columns_start + 1, min(columns_close, columns_end)):
+        if part_end - part_start >= 3 and tokens[part_start + 1][1] == ':' and tokens[part_start][0] in ('name', 'string'):
+            key_token = tokens[part_start]
+            key = string_value(key_token) if key_token[0] == 'string' else key_token[1]
+            table['columns'].append(parse_column(key, tokens, part_start + 2, part_end))
+        elif tokens[part_start][1] == '...':
+            table['spreads'].append(''.join(t[1] for t in tokens[part_start + 1:part_end]))
+    if len(args) >= 3:
+        table['constraints'] = parse_constraints(tokens, args[2][0], args[2][1])
+    return table
+
+
+def parse_drizzle_file_cached(file_path: Path, cache_dir=None) -> list:
+    """Parse a Drizzle schema file, reusing the AST cached for identical content."""
+    content = Path(file_path).read_bytes()
+    if cache_dir is None:
+        return parse_drizzle_source(content.decode('utf-8', errors='ignore'))
+
+    digest = hashlib.sha256(content).hexdigest()
+    cache_path = Path(cache_dir) / f'{digest}.json'
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        if cached.get('version') == AST_VERSION:
+            # Mark as recently used for eviction
+            os.utime(cache_path)
+            return cached['tables']
+    except (OSError, ValueError):
+        pass
+
+    tables = parse_drizzle_source(content.decode('utf-8', errors='ignore'))
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps({'version': AST_VERSION, 'tables': tables}), encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+        evict_cached_asts(cache_path.parent, MAX_CACHED_ASTS)
+    except OSError:
+        pass
+    return tables
+
+
+def evict_cached_asts(cache_dir: Path, keep: int):
+    """Delete all but the `keep` most recently used ASTs in a cache directory."""
+    entries = []
+    for path in cache_dir.glob('*.json'):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            pass
+    if len(entries) <= keep:
+        return
+    entries.sort(reverse=True)
+    for _, path in entries[keep:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    print(json.dumps(parse_drizzle_file_cached(Path(sys.argv[1])), indent=2))
+
+
+if __name__ == "__main__":
+    main()
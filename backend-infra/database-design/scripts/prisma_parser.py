@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Prisma Parser - Tokenizer and AST for Prisma schema files.
+
+Parses a schema once into models, fields, attributes, enums and block
+attributes (@@index, @@unique, @@id, ...) so validators can run checks as
+lookups instead of re-scanning the text. Comments, strings, nested
+parentheses and multi-line attribute arguments are handled by the tokenizer.
+
+Usage:
+    python prisma_parser.py <schema.prisma>    # prints the parsed models as JSON
+"""
+
+import re
+import sys
+import json
+from dataclasses import dataclass, field as dataclass_field
+from pathlib import Path
+
+
+SCALAR_TYPES = {
+    'String', 'Boolean', 'Int', 'BigInt', 'Float', 'Decimal',
+    'DateTime', 'Json', 'Bytes', 'Unsupported',
+}
+
+# Blocks whose bodies are lists of fields
+FIELD_BLOCKS = {'model', 'view', 'type'}
+
+TOKEN_RE = re.compile(r'''
+    (?P<comment>//[^\n]*)
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<block_attr>@@[A-Za-z_][\w.]*)
+  | (?P<attr>@[A-Za-z_][\w.]*)
+  | (?P<name>[A-Za-z_][\w.]*)
+  | (?P<punct>[{}()\[\],:=?!])
+  | (?P<error>.)
+''', re.VERBOSE)
+
+# Escapes inside string literals; any other escaped character, as in a regex
+# such as @default("\d+"), is kept as written
+ESCAPE_RE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|(.))')
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class PrismaSyntaxError(Exception):
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class Token:
+    kind: str
+    value: str
+    line: int
+
+
+@dataclass
+class Attribute:
+    name: str                       # without the leading @ / @@, e.g. 'relation', 'db.VarChar'
+    args: list = dataclass_field(default_factory=list)
+    kwargs: dict = dataclass_field(default_factory=dict)
+    line: int = 0
+
+    def arg(self, key: str, position: int = 0):
+        """Return a keyword argument, falling back to the positional one."""
+        if key in self.kwargs:
+            return self.kwargs[key]
+        return self.args[position] if len(self.args) > position else None
+
+
+@dataclass
+class Field:
+    name: str
+    type: str
+    is_list: bool = False
+    is_optional: bool = False
+    attributes: list = dataclass_field(default_factory=list)
+    line: int = 0
+
+    def attribute(self, name: str):
+        return next((a for a in self.attributes if a.name == name), None)
+
+
+@dataclass
+class Model:
+    name: str
+    kind: str = 'model'             # 'model', 'view' or 'type'
+    fields: list = dataclass_field(default_factory=list)
+    block_attributes: list = dataclass_field(default_factory=list)
+    line: int = 0
+
+    def __post_init__(self):
+        self.fields_by_name = {f.name: f for f in self.fields}
+
+    def add_field(self, field: Field):
+        self.fields.append(field)
+        self.fields_by_name[field.name] = field
+
+    def block_attribute_list(self, name: str) -> list:
+        return [a for a in self.block_attributes if a.name == name]
+
+    def relation_fields(self) -> list:
+        """(relation field, [scalar FK field names]) for each @relation(fields: [...])."""
+        relations = []
+        for f in self.fields:
+            relation = f.attribute('relation')
+            fields = relation.kwargs.get('fields') if relation else None
+            if isinstance(fields, list) and fields:
+                relations.append((f, [str(name) for name in fields]))
+        return relations
+
+    def indexed_field_lists(self) -> list:
+        """Field name lists covered by an index: @@index, @@unique, @@id, @unique and @id."""
+        indexed = []
+        for attr in self.block_attributes:
+            if attr.name in ('index', 'unique', 'id'):
+                fields = attr.arg('fields')
+                if isinstance(fields, list):
+                    indexed.append([index_field_name(v) for v in fields])
+        for f in self.fields:
+            if f.attribute('id') or f.attribute('unique'):
+                indexed.append([f.name])
+        return indexed
+
+
+@dataclass
+class Enum:
+    name: str
+    values: list = dataclass_field(default_factory=list)
+    line: int = 0
+
+
+@dataclass
+class FunctionCall:
+    name: str
+    args: list = dataclass_field(default_factory=list)
+    kwargs: dict = dataclass_field(default_factory=dict)
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass
+class Schema:
+    models: dict = dataclass_field(default_factory=dict)
+    enums: dict = dataclass_field(default_factory=dict)
+    errors: list = dataclass_field(default_factory=list)
+
+
+def index_field_name(value) -> str:
+    """Field name from an index entry such as `title` or `title(sort: Desc)`."""
+    return value.name if isinstance(value, FunctionCall) else str(value)
+
+
+def describe(token: Token) -> str:
+    return {'newline': 'end of line', 'eof': 'end of file'}.get(token.kind, token.value)
+
+
+def string_value(token: Token) -> str:
+    """Contents of a string literal token, with escapes decoded."""
+    text = token.value[1:-1]
+    if '\\' not in text:
+        return text
+    return ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)) if m.group(1) else ESCAPES.get(m.group(2), m.group()), text)
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    line = 1
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'newline':
+            tokens.append(Token('newline', '\n', line))
+            line += 1
+        elif kind == 'error':
+            tokens.append(Token('error', match.group(), line))
+        elif kind not in ('space', 'comment'):
+            tokens.append(Token(kind, match.group(), line))
+    tokens.append(Token('eof', '', line))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+        # Inside (...) or [...], newlines don't end a field
+        self.nesting = 0
+        # Position just after the '{' of the block being parsed, for error recovery
+        self.block_start = None
+
+    def peek(self) -> Token:
+        while self.nesting and self.tokens[self.pos].kind == 'newline':
+            self.pos += 1
+        return self.tokens[self.pos]
+
+    def next(self) -> Token:
+        token = self.peek()
+        if token.kind != 'eof':
+            self.pos += 1
+        return token
+
+    def expect(self, value: str) -> Token:
+        token = self.next()
+        if token.value != value:
+            raise PrismaSyntaxError(f"expected '{value}', found '{describe(token)}'", token.line)
+        return token
+
+    def expect_name(self) -> Token:
+        token = self.next()
+        if token.kind != 'name':
+            raise PrismaSyntaxError(f"expected a name, found '{describe(token)}'", token.line)
+        return token
+
+    def skip_newlines(self):
+        while self.tokens[self.pos].kind == 'newline':
+            self.pos += 1
+
+    def skip_line(self):
+        while self.tokens[self.pos].kind not in ('newline', 'eof'):
+            self.pos += 1
+
+    def skip_block(self):
+        """Recover from an error by skipping to the end of the current block."""
+        depth = 0
+        while True:
+            token = self.tokens[self.pos]
+            if token.kind == 'eof':
+                return
+            self.pos += 1
+            if token.value == '{':
+                depth += 1
+            elif token.value == '}':
+                if depth == 0:
+                    return
+                depth -= 1
+
+    def parse(self) -> Schema:
+        schema = Schema()
+        while True:
+            self.skip_newlines()
+            token = self.peek()
+            if token.kind == 'eof':
+                return schema
+            line_start = self.pos
+            try:
+                self.parse_block(schema)
+            except PrismaSyntaxError as e:
+                schema.errors.append(e)
+                self.nesting = 0
+                if self.block_start is not None:
+                    self.pos = self.block_start
+                    self.skip_block()
+                else:
+                    self.pos = line_start
+                    self.skip_line()
+            self.block_start = None
+
+    def parse_block(self, schema: Schema):
+        keyword = self.expect_name()
+        name = self.expect_name()
+        self.expect('{')
+        self.block_start = self.pos
+        if keyword.value in FIELD_BLOCKS:
+            model = Model(name.value, keyword.value, line=keyword.line)
+            self.parse_model_body(model)
+            schema.models[model.name] = model
+        elif keyword.value == 'enum':
+            enum = Enum(name.value, line=keyword.line)
+            self.parse_enum_body(enum)
+            schema.enums[enum.name] = enum
+        elif keyword.value in ('datasource', 'generator'):
+            self.skip_block()
+        else:
+            raise PrismaSyntaxError(f"unknown block type '{keyword.value}'", keyword.line)
+
+    def parse_model_body(self, model: Model):
+        while True:
+            self.skip_newlines()
+            token = self.peek()
+            if token.value == '}':
+                self.next()
+                return
+            if token.kind == 'block_attr':
+                model.block_attributes.append(self.parse_attribute())
+            elif token.kind == 'name':
+                model.add_field(self.parse_field())
+            else:
+                raise PrismaSyntaxError(f"unexpected '{describe(token)}' in {model.name}", token.line)
+            self.end_of_line()
+
+    def parse_enum_body(self, enum: Enum):
+        while True:
+            self.skip_newlines()
+            token = self.peek()
+            if token.value == '}':
+                self.next()
+                return
+            if token.kind == 'name':
+                enum.values.append(self.next().value)
+                while self.peek().kind == 'attr':
+                    self.parse_attribute()
+            elif token.kind == 'block_attr':
+                self.parse_attribute()
+            else:
+                raise PrismaSyntaxError(f"unexpected '{describe(token)}' in enum {enum.name}", token.line)
+            self.end_of_line()
+
+    def end_of_line(self):
+        token = self.peek()
+        if token.kind not in ('newline', 'eof') and token.value != '}':
+            raise PrismaSyntaxError(f"unexpected '{describe(token)}'", token.line)
+
+    def parse_field(self) -> Field:
+        name = self.expect_name()
+        field_type = self.expect_name()
+        field = Field(name.value, field_type.value, line=name.line)
+        if field_type.value == 'Unsupported' and self.peek().value == '(':
+            self.parse_arguments()
+        if self.peek().value == '[':
+            self.next()
+            self.expect(']')
+            field.is_list = True
+        if self.peek().value in ('?', '!'):
+            field.is_optional = self.next().value == '?'
+        while self.peek().kind == 'attr':
+            field.attributes.append(self.parse_attribute())
+        return field
+
+    def parse_attribute(self) -> Attribute:
+        token = self.next()
+        attribute = Attribute(token.value.lstrip('@'), line=token.line)
+        if self.peek().value == '(':
+            attribute.args, attribute.kwargs = self.parse_arguments()
+        return attribute
+
+    def parse_arguments(self):
+        args, kwargs = [], {}
+        self.expect('(')
+        self.nesting += 1
+        try:
+            while self.peek().value != ')':
+                token = self.peek()
+                following = self.tokens[self.pos + 1] if token.kind == 'name' else None
+                if following is not None and following.value == ':':
+                    self.next()
+                    self.next()
+                    kwargs[token.value] = self.parse_value()
+                else:
+                    args.append(self.parse_value())
+                if self.peek().value == ',':
+                    self.next()
+                elif self.peek().value != ')':
+                    token = self.peek()
+                    raise PrismaSyntaxError(f"expected ',' or ')', found '{describe(token)}'", token.line)
+            self.next()
+        finally:
+            self.nesting -= 1
+        return args, kwargs
+
+    def parse_value(self):
+        token = self.next()
+        if token.kind == 'string':
+            return string_value(token)
+        if token.kind == 'number':
+            return float(token.value) if '.' in token.value else int(token.value)
+        if token.value == '[':
+            self.nesting += 1
+            try:
+                values = []
+                while self.peek().value != ']':
+                    values.append(self.parse_value())
+                    if self.peek().value == ',':
+                        self.next()
+                    elif self.peek().value != ']':
+                        token = self.peek()
+                        raise PrismaSyntaxError(f"expected ',' or ']', found '{describe(token)}'", token.line)
+                self.next()
+            finally:
+                self.nesting -= 1
+            return values
+        if token.kind == 'name':
+            if self.peek().value == '(':
+                args, kwargs = self.parse_arguments()
+                return FunctionCall(token.value, args, kwargs)
+            return token.value
+        raise PrismaSyntaxError(f"unexpected '{describe(token)}' in arguments", token.line)
+
+
+def parse_prisma_schema(text: str) -> Schema:
+    """Parse a Prisma schema. Syntax errors are collected in `schema.errors`,
+    and parsing resumes after the block that contained them."""
+    return _Parser(tokenize(text)).parse()
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    schema = parse_prisma_schema(Path(sys.argv[1]).read_text(encoding='utf-8', errors='ignore'))
+    output = {
+        "models": {
+            name: {
+                "kind": model.kind,
+                "line": model.line,
+                "fields": [
+                    {"name": f.name, "type": f.type, "list": f.is_list, "optional": f.is_optional,
+                     "attributes": [a.name for a in f.attributes]}
+                    for f in model.fields
+                ],
+                "indexes": model.indexed_field_lists(),
+            }
+            for name, model in schema.models.items()
+        },
+        "enums": {name: enum.values for name, enum in schema.enums.items()},
+        "errors": [str(e) for e in schema.errors],
+    }
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,34 @@
 #!/usr/bin/env python3
 """
 Schema Validator - Database schema validation
-Validates Prisma schemas and checks for common issues.
+Validates Prisma and Drizzle schemas and checks for common issues.
 
 Usage:
-    python schema_validator.py <project_path>
+    python schema_validator.py <project_path> [--jobs N] [--no-cache]
 
 Checks:
     - Prisma schema syntax
     - Missing relations
     - Index recommendations
     - Naming conventions
+
+The project is walked once, skipping dependency and build directories before
+descending into them. Schemas are validated in parallel, and results are cached
+by file mtime and size so re-runs only revalidate files that changed.
 """
 
+import argparse
+import hashlib
+import os
 import sys
 import json
-import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from drizzle_parser import parse_drizzle_file_cached
+from prisma_parser import SCALAR_TYPES, parse_prisma_schema
+
 # Fix Windows console encoding
 try:
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -26,22 +36,151 @@ except:
     pass
 
 
+# Directories that never contain a project's own schema files
+SKIP_DIRS = {
+    'node_modules', '.git', '.hg', '.svn', 'dist', 'build', 'out', 'coverage',
+    '__pycache__', '.venv', 'venv', '.next', '.nuxt', '.turbo', '.cache', 'vendor',
+}
+
+# Bump when validation rules change so cached results are discarded
+CACHE_VERSION = 3
+
+
+def walk_project(project_path: Path, skip_dirs=SKIP_DIRS):
+    """Yield every file under project_path in a single walk, pruning skipped directories."""
+    for dirpath, dirnames, filenames in os.walk(project_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip_dirs)
+        for filename in sorted(filenames):
+            yield Path(dirpath, filename)
+
+
+def schema_type_for(file_path: Path):
+    """Return 'prisma' or 'drizzle' if file_path is a schema file, else None."""
+    parent = file_path.parent.name
+    if file_path.name == 'schema.prisma' and parent == 'prisma':
+        return 'prisma'
+    if file_path.suffix == '.ts' and parent in ('drizzle', 'schema'):
+        name = file_path.name.lower()
+        if 'schema' in name or 'table' in name:
+            return 'drizzle'
+    return None
+
+
 def find_schema_files(project_path: Path) -> list:
     """Find database schema files."""
     schemas = []
-    
-    # Prisma schema
-    prisma_files = list(project_path.glob('**/prisma/schema.prisma'))
-    schemas.extend([('prisma', f) for f in prisma_files])
-    
-    # Drizzle schema files
-    drizzle_files = list(project_path.glob('**/drizzle/*.ts'))
-    drizzle_files.extend(project_path.glob('**/schema/*.ts'))
-    for f in drizzle_files:
-        if 'schema' in f.name.lower() or 'table' in f.name.lower():
-            schemas.append(('drizzle', f))
-    
-    return schemas[:10]  # Limit
+    for file_path in walk_project(project_path):
+        schema_type = schema_type_for(file_path)
+        if schema_type:
+            schemas.append((schema_type, file_path))
+    return schemas
+
+
+def default_cache_path(project_path: Path) -> Path:
+    """Per-project cache file under the user cache directory."""
+    cache_home = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    project_key = hashlib.sha256(str(project_path).encode()).hexdigest()[:16]
+    return cache_home / 'schema_validator' / f'{project_key}.json'
+
+
+def load_cache(cache_path: Path) -> dict:
+    try:
+        cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path: Path, entries: dict):
+    """Write the cache atomically; failures only cost a revalidation next time."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'files': entries}), encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def file_signature(file_path: Path) -> list:
+    stat = file_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def validate_schema_file(schema_type: str, file_path: Path, ast_cache_dir=None) -> list:
+    """Run the validator for one schema file."""
+    if schema_type == 'prisma':
+        return validate_prisma_schema(file_path)
+    return validate_drizzle_schema(file_path, ast_cache_dir)
+
+
+def validate_schemas(schemas: list, cache_path=None, jobs=None) -> dict:
+    """Validate schema files, reusing cached results for unchanged files.
+
+    Files whose mtime changed but whose content didn't still skip reparsing:
+    Drizzle ASTs are cached by content hash next to the results cache.
+
+    Returns {file path: issues} in the order of `schemas`.
+    """
+    cached = load_cache(cache_path) if cache_path else {}
+    entries = {}
+    results = {}
+    pending = []
+    for schema_type, file_path in schemas:
+        key = str(file_path)
+        try:
+            signature = file_signature(file_path)
+        except OSError:
+            signature = None
+        entry = cached.get(key)
+        if signature and entry and entry['signature'] == signature and entry['type'] == schema_type:
+            results[key] = entry['issues']
+            entries[key] = entry
+        else:
+            pending.append((schema_type, file_path, signature))
+
+    ast_cache_dir = cache_path.parent / 'drizzle_ast' if cache_path else None
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            validated = list(executor.map(
+                validate_schema_file,
+                [t for t, _, _ in pending],
+                [p for _, p, _ in pending],
+                [ast_cache_dir] * len(pending),
+            ))
+    else:
+        validated = [validate_schema_file(t, p, ast_cache_dir) for t, p, _ in pending]
+
+    for (schema_type, file_path, signature), issues in zip(pending, validated):
+        results[str(file_path)] = issues
+        if signature:
+            entries[str(file_path)] = {'type': schema_type, 'signature': signature, 'issues': issues}
+
+    if cache_path:
+        save_cache(cache_path, entries)
+    return {str(file_path): results[str(file_path)] for _, file_path in schemas}
+
+
+def missing_fk_indexes(model) -> list:
+    """Foreign key field lists in `model` that no index starts with.
+
+    Foreign keys are the scalar fields of each @relation(fields: [...]), plus
+    scalar fields named like `authorId`. An index covers a foreign key if the
+    key's fields are a prefix of the index's fields.
+    """
+    indexed = model.indexed_field_lists()
+    candidates = [fields for _, fields in model.relation_fields()]
+    related = {name for fields in candidates for name in fields}
+    for f in model.fields:
+        if f.name.endswith('Id') and f.type in SCALAR_TYPES and not f.is_list and f.name not in related:
+            candidates.append([f.name])
+    missing = []
+    for fields in candidates:
+        if not any(index[:len(fields)] == fields for index in indexed) and fields not in missing:
+            missing.append(fields)
+    return missing
 
 
 def validate_prisma_schema(file_path: Path) -> list:
@@ -50,49 +189,125 @@ def validate_prisma_schema(file_path: Path) -> list:
     
     try:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
+    except Exception as e:
+        return [f"Error reading schema: {str(e)[:50]}"]
+    
+    schema = parse_prisma_schema(content)
+    for error in schema.errors:
+        issues.append(f"Syntax error at {error}")
+    
+    known_types = SCALAR_TYPES | set(schema.models) | set(schema.enums)
+    
+    for model_name, model in schema.models.items():
+        if model.kind != 'model':
+            continue
+        
+        # Check naming convention (PascalCase)
+        if not model_name[0].isupper():
+            issues.append(f"Model '{model_name}' should be PascalCase")
         
-        # Find all models
-        models = re.findall(r'model\s+(\w+)\s*{([^}]+)}', content, re.DOTALL)
+        # Check for id field
+        has_id = any(f.attribute('id') for f in model.fields) or model.block_attribute_list('id')
+        if not has_id and not any(f.attribute('unique') for f in model.fields) and not model.block_attribute_list('unique'):
+            issues.append(f"Model '{model_name}' might be missing @id field")
         
-        for model_name, model_body in models:
-            # Check naming convention (PascalCase)
-            if not model_name[0].isupper():
-                issues.append(f"Model '{model_name}' should be PascalCase")
-            
-            # Check for id field
-            if '@id' not in model_body and 'id' not in model_body.lower():
-                issues.append(f"Model '{model_name}' might be missing @id field")
-            
-            # Check for createdAt/updatedAt
-            if 'createdAt' not in model_body and 'created_at' not in model_body:
-                issues.append(f"Model '{model_name}' missing createdAt field (recommended)")
-            
-            # Check for @relation without fields
-            relations = re.findall(r'@relation\([^)]*\)', model_body)
-            for rel in relations:
-                if 'fields:' not in rel and 'references:' not in rel:
-                    pass  # Implicit relation, ok
-            
-            # Check for @@index suggestions
-            foreign_keys = re.findall(r'(\w+Id)\s+\w+', model_body)
-            for fk in foreign_keys:
-                if f'@@index([{fk}])' not in content and f'@@index(["{fk}"])' not in content:
-                    issues.append(f"Consider adding @@index([{fk}]) for better query performance in {model_name}")
+        # Check for createdAt/updatedAt
+        if 'createdAt' not in model.fields_by_name and 'created_at' not in model.fields_by_name:
+            issues.append(f"Model '{model_name}' missing createdAt field (recommended)")
         
-        # Check for enum definitions
-        enums = re.findall(r'enum\s+(\w+)\s*{', content)
-        for enum_name in enums:
-            if not enum_name[0].isupper():
-                issues.append(f"Enum '{enum_name}' should be PascalCase")
+        # Check for relations to undefined models
+        for f in model.fields:
+            if f.type not in known_types:
+                issues.append(f"Field '{f.name}' in '{model_name}' references unknown type '{f.type}'")
         
+        # Check for @@index suggestions
+        for fields in missing_fk_indexes(model):
+            issues.append(f"Consider adding @@index([{', '.join(fields)}]) for better query performance in {model_name}")
+    
+    # Check for enum definitions
+    for enum_name in schema.enums:
+        if not enum_name[0].isupper():
+            issues.append(f"Enum '{enum_name}' should be PascalCase")
+    
+    return issues
+
+
+def is_snake_case(name: str) -> bool:
+    return name == name.lower()
+
+
+def missing_drizzle_fk_indexes(table: dict) -> list:
+    """Foreign key column lists in a Drizzle table that no index starts with.
+
+    Same rule as `missing_fk_indexes` for Prisma: foreign keys are columns with
+    .references(...), foreignKey({ columns }) constraints, and columns named like
+    `authorId` / `author_id`. Primary keys and unique constraints count as indexes.
+    """
+    indexed = [c['columns'] for c in table['constraints'] if c['kind'] in ('index', 'unique', 'primary')]
+    for column in table['columns']:
+        if 'primaryKey' in column['modifiers'] or 'unique' in column['modifiers']:
+            indexed.append([column['key']])
+    candidates = [c['columns'] for c in table['constraints'] if c['kind'] == 'foreign' and c['columns']]
+    related = {key for columns in candidates for key in columns}
+    for column in table['columns']:
+        is_fk_name = column['key'].endswith('Id') or column['name'].endswith('_id')
+        if column['key'] not in related and (column['references'] or is_fk_name) and 'primaryKey' not in column['modifiers']:
+            candidates.append([column['key']])
+    missing = []
+    for columns in candidates:
+        if not any(index[:len(columns)] == columns for index in indexed) and columns not in missing:
+            missing.append(columns)
+    return missing
+
+
+def validate_drizzle_schema(file_path: Path, ast_cache_dir=None) -> list:
+    """Validate Drizzle schema file."""
+    issues = []
+    
+    try:
+        tables = parse_drizzle_file_cached(file_path, ast_cache_dir)
     except Exception as e:
-        issues.append(f"Error reading schema: {str(e)[:50]}")
+        return [f"Error reading schema: {str(e)[:50]}"]
+    
+    for table in tables:
+        table_name = table['name']
+        
+        # Check naming convention (snake_case table and column names)
+        if not is_snake_case(table_name):
+            issues.append(f"Table '{table_name}' should be snake_case")
+        for column in table['columns']:
+            if not is_snake_case(column['name']) and column['name'] != column['key']:
+                issues.append(f"Column '{column['name']}' in '{table_name}' should be snake_case")
+        
+        # Columns spread in from helpers (`...timestamps`) are unknown, so
+        # don't report columns they may provide as missing
+        has_spreads = bool(table.get('spreads'))
+        
+        # Check for primary key
+        has_primary_key = any('primaryKey' in c['modifiers'] for c in table['columns'])
+        if not has_primary_key and not has_spreads and not any(c['kind'] == 'primary' for c in table['constraints']):
+            issues.append(f"Table '{table_name}' might be missing a primary key")
+        
+        # Check for createdAt/updatedAt
+        column_names = {c['key'] for c in table['columns']} | {c['name'] for c in table['columns']}
+        if 'createdAt' not in column_names and 'created_at' not in column_names and not has_spreads:
+            issues.append(f"Table '{table_name}' missing createdAt column (recommended)")
+        
+        # Check for index suggestions
+        for columns in missing_drizzle_fk_indexes(table):
+            on = ', '.join(f'table.{key}' for key in columns)
+            issues.append(f"Consider adding index().on({on}) for better query performance in {table_name}")
     
     return issues
 
 
 def main():
-    project_path = Path(sys.argv[1] if len(sys.argv) > 1 else ".").resolve()
+    parser = argparse.ArgumentParser(description="Validate database schema files in a project")
+    parser.add_argument("project_path", nargs="?", default=".", help="Project root (default: current directory)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Revalidate every file and don't update the cache")
+    args = parser.parse_args()
+    project_path = Path(args.project_path).resolve()
     
     print(f"\n{'='*60}")
     print(f"[SCHEMA VALIDATOR] Database Schema Validation")
@@ -118,19 +333,17 @@ def main():
         sys.exit(0)
     
     # Validate each schema
+    cache_path = None if args.no_cache else default_cache_path(project_path)
+    issues_by_file = validate_schemas(schemas, cache_path, args.jobs)
     all_issues = []
     
     for schema_type, file_path in schemas:
-        print(f"\nValidating: {file_path.name} ({schema_type})")
-        
-        if schema_type == 'prisma':
-            issues = validate_prisma_schema(file_path)
-        else:
-            issues = []  # Drizzle validation could be added
+        print(f"\nValidating: {file_path.relative_to(project_path)} ({schema_type})")
+        issues = issues_by_file[str(file_path)]
         
         if issues:
             all_issues.append({
-                "file": str(file_path.name),
+                "file": str(file_path.relative_to(project_path)),
                 "type": schema_type,
                 "issues": issues
             })
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import argparse
+from pathlib import Path
+
+from audit_schema import audit_files, expand_inputs, normalize_identifier, print_color
+
+"""
+Postgres Query Plan Auditor
+===========================
+Companion to audit_schema.py: reads captured `EXPLAIN (FORMAT JSON)` plans and
+cross-references them with the schema parsed from SQL files.
+
+Checks:
+1. Sequential scans on large tables, noting whether an index exists for the filtered column.
+2. Joins on foreign key columns that have no index (see schema-foreign-key-indexes.md).
+3. Sorts and hashes that spill to disk (work_mem too small for the sort/hash).
+
+Findings are ranked by the estimated total cost of the plan node they were found on.
+
+Plans are read from files, fully offline. A file may hold the output of one or more
+`EXPLAIN (FORMAT JSON)` statements (e.g. `psql -XAt -c "EXPLAIN (FORMAT JSON) ..."`)
+or auto_explain JSON entries. Plans captured with ANALYZE report actual row counts and
+real sort spills; without it, estimates are used.
+
+Optionally, plans can be collected from a local Postgres through `psql`. With --analyze
+each query is executed inside a transaction that is rolled back.
+
+Usage:
+  python audit_plans.py plans/*.json --schema supabase/migrations/
+  python audit_plans.py plans/ --schema schema.sql --format json
+  python audit_plans.py --dsn postgres://localhost/mydb --queries queries.sql --save-plans plans/ --schema schema.sql
+"""
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Tid Scan", "Sample Scan"}
+JOIN_CONDITIONS = ("Hash Cond", "Merge Cond", "Join Filter")
+
+# `(o.user_id)::text`, `"Users".id`, `user_id` -> optional alias and column
+COLUMN_REFERENCE = re.compile(r'^(?:("[^"]+"|\w+)\.)?("[^"]+"|\w+)$')
+CAST = re.compile(r'::[\w\s."\[\]]+$')
+# A column compared in a filter: `status = `, `(email)::text = `, `deleted_at IS `
+FILTER_COLUMN = re.compile(r'(?<![:\w])(?:\w+\.)?([a-z_]\w*)\)?(?:::[a-z][\w ]*?)?\s*(?:<>|!=|<=|>=|=|<|>|!?~~\*?|IS\b|IN\b)')
+
+
+def iter_json_values(text):
+    """JSON values in `text`, which may hold several concatenated documents."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            return
+        value, pos = decoder.raw_decode(text, pos)
+        yield value
+
+
+def load_plans(path):
+    """Top-level EXPLAIN results ({"Plan": ..., ...}) from a plan file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    plans = []
+    for value in iter_json_values(text):
+        for entry in value if isinstance(value, list) else [value]:
+            if isinstance(entry, dict) and "Plan" in entry:
+                plans.append(entry)
+    return plans
+
+
+def iter_nodes(plan):
+    """(node, parent) for every node of a plan tree, depth first."""
+    stack = [(plan, None)]
+    while stack:
+        node, parent = stack.pop()
+        yield node, parent
+        for child in reversed(node.get("Plans", [])):
+            stack.append((child, node))
+
+
+def relation_name(node):
+    name = node["Relation Name"]
+    schema = node.get("Schema")
+    return normalize_identifier(f'"{schema}"."{name}"' if schema else f'"{name}"')
+
+
+def rows_scanned(node):
+    """Rows a scan reads per loop: actual (returned + filtered out) if analyzed,
+    else the planner's estimate."""
+    if "Actual Rows" in node:
+        return node["Actual Rows"] + node.get("Rows Removed by Filter", 0)
+    return node.get("Plan Rows", 0)
+
+
+def column_reference(operand):
+    """(alias or None, column) for a plain column operand, ignoring parentheses and casts."""
+    # Split conditions leave unbalanced parentheses, e.g. `((o.user_id` and `u.id))`
+    while True:
+        stripped = CAST.sub("", operand.strip().lstrip("(").rstrip(")")).strip()
+        if stripped == operand:
+            break
+        operand = stripped
+    match = COLUMN_REFERENCE.match(operand)
+    if not match:
+        return None
+    alias, column = match.groups()
+    return (alias.strip('"') if alias else None), normalize_identifier(column)
+
+
+def equality_pairs(condition):
+    """Column pairs compared with `=` in a plan condition such as
+    `((o.user_id = u.id) AND (o.org_id = u.org_id))`."""
+    pairs = []
+    for part in re.split(r'\bAND\b', condition):
+        sides = part.split(" = ")
+        if len(sides) != 2:
+            continue
+        left, right = column_reference(sides[0]), column_reference(sides[1])
+        if left and right:
+            pairs.append((left, right))
+    return pairs
+
+
+def filter_columns(condition):
+    """Columns referenced by a scan filter, e.g. `(status = 'active'::text)` -> ['status']."""
+    condition = re.sub(r"'(?:[^']|'')*'", "''", condition)
+    columns = []
+    for match in FILTER_COLUMN.finditer(condition):
+        column = match.group(1)
+        if column.upper() not in ("AND", "OR", "NOT", "NULL", "TRUE", "FALSE") and column not in columns:
+            columns.append(column)
+    return columns
+
+
+def sort_bytes(node):
+    return node.get("Plan Rows", 0) * node.get("Plan Width", 0)
+
+
+def finding(rule, message, node, plan_label, plan_cost):
+    cost = node.get("Total Cost", 0.0)
+    return {
+        "rule": rule,
+        "message": message,
+        "cost": cost,
+        "plan_share": round(cost / plan_cost, 3) if plan_cost else None,
+        "plan": plan_label,
+    }
+
+
+class PlanAuditor:
+    def __init__(self, foreign_keys=(), indexed_prefixes=(), min_rows=10000, work_mem_kb=4096):
+        # (table, first column) of FKs without a covering index
+        self.unindexed_fk_columns = {}
+        indexed_prefixes = set(indexed_prefixes)
+        for fk in foreign_keys:
+            table = normalize_identifier(fk["table"])
+            columns = tuple(normalize_identifier(c) for c in fk["columns"])
+            if (table, columns) not in indexed_prefixes:
+                self.unindexed_fk_columns[(table, columns[0])] = fk
+        self.indexed_prefixes = indexed_prefixes
+        self.has_schema = bool(foreign_keys) or bool(indexed_prefixes)
+        self.min_rows = min_rows
+        self.work_mem_kb = work_mem_kb
+
+    def audit(self, plan, plan_label):
+        """Findings for one EXPLAIN result ({"Plan": ...})."""
+        root = plan["Plan"]
+        plan_cost = root.get("Total Cost", 0.0)
+        aliases = {}
+        for node, _ in iter_nodes(root):
+            if node.get("Node Type") in SCAN_NODES and "Relation Name" in node:
+                aliases[node.get("Alias", node["Relation Name"])] = relation_name(node)
+
+        findings = []
+        for node, parent in iter_nodes(root):
+            node_type = node.get("Node Type")
+            if node_type == "Seq Scan" and "Relation Name" in node:
+                findings.extend(self._check_seq_scan(node, parent, aliases, plan_label, plan_cost))
+            elif node_type in ("Sort", "Incremental Sort"):
+                findings.extend(self._check_sort(node, plan_label, plan_cost))
+            elif node_type == "Hash":
+                findings.extend(self._check_hash(node, parent, plan_label, plan_cost))
+            for key in JOIN_CONDITIONS:
+                if key in node:
+                    findings.extend(self._check_join(node, node[key], None, aliases, plan_label, plan_cost))
+        return findings
+
+    def _check_seq_scan(self, node, parent, aliases, plan_label, plan_cost):
+        findings = []
+        table = relation_name(node)
+        rows = rows_scanned(node)
+        loops = node.get("Actual Loops", 1)
+        if "Filter" in node:
+            # A join condition pushed into the inner side of a nested loop
+            if parent is not None and parent.get("Node Type") == "Nested Loop":
+                findings.extend(self._check_join(parent, node["Filter"], table, aliases, plan_label, plan_cost))
+        if rows < self.min_rows:
+            return findings
+
+        message = f"Seq Scan on '{table}' reads ~{rows:,.0f} rows"
+        if loops > 1:
+            message += f" x {loops} loops"
+        hint = ""
+        columns = filter_columns(node.get("Filter", ""))
+        if columns and self.has_schema:
+            unindexed = [c for c in columns if (table, (normalize_identifier(c),)) not in self.indexed_prefixes]
+            if unindexed:
+                hint = f" No index leads with {', '.join(unindexed)}; consider CREATE INDEX ON {table} ({unindexed[0]})."
+            else:
+                hint = " An index exists for the filter, but the planner chose a seq scan (low selectivity or stale statistics; run ANALYZE)."
+        elif columns:
+            hint = f" Filter on {', '.join(columns)}; check that an index exists."
+        findings.append(finding("seq-scan-large-table", message + "." + hint, node, plan_label, plan_cost))
+        return findings
+
+    def _check_join(self, node, condition, own_table, aliases, plan_label, plan_cost):
+        findings = []
+        for pair in equality_pairs(condition):
+            for alias, column in pair:
+                table = aliases.get(alias) if alias else own_table
+                fk = self.unindexed_fk_columns.get((table, column))
+                if fk is None:
+                    continue
+                location = f" ({fk['file']}:{fk['line']})" if fk.get("file") else ""
+                findings.append(finding(
+                    "unindexed-fk-join",
+                    f"{node.get('Node Type')} joins on foreign key '{table}.{column}'{location}, which has no index. "
+                    f"Add CREATE INDEX ON {table} ({', '.join(fk['columns'])}).",
+                    node, plan_label, plan_cost,
+                ))
+        return findings
+
+    def _check_sort(self, node, plan_label, plan_cost):
+        keys = ", ".join(node.get("Sort Key", []))
+        if node.get("Sort Space Type") == "Disk":
+            message = f"Sort on ({keys}) spilled {node.get('Sort Space Used', 0):,} kB to disk ({node.get('Sort Method', 'external')})."
+        elif "Sort Space Type" not in node and sort_bytes(node) > self.work_mem_kb * 1024:
+            message = f"Sort on ({keys}) needs ~{sort_bytes(node) // 1024:,} kB, more than work_mem ({self.work_mem_kb:,} kB); it will likely spill to disk."
+        else:
+            return []
+        return [finding("sort-spill", message + " Raise work_mem for this query or index the sort key.", node, plan_label, plan_cost)]
+
+    def _check_hash(self, node, parent, plan_label, plan_cost):
+        if node.get("Hash Batches", 1) <= 1:
+            return []
+        message = (f"Hash for {parent.get('Node Type', 'join') if parent else 'join'} used {node['Hash Batches']} batches "
+                   f"(peak {node.get('Peak Memory Usage', 0):,} kB), so it spilled to disk. Raise work_mem or join on fewer rows.")
+        return [finding("hash-spill", message, node, plan_label, plan_cost)]
+
+
+def split_queries(text):
+    """Statements of a queries file, one per `;`-terminated line."""
+    queries, current = [], []
+    for line in text.splitlines():
+        if not current and (not line.strip() or line.lstrip().startswith("--")):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            queries.append("\n".join(current).rstrip().rstrip(";"))
+            current = []
+    if "\n".join(current).strip():
+        queries.append("\n".join(current))
+    return queries
+
+
+def collect_plans(dsn, queries, analyze=False):
+    """EXPLAIN each query on a live database with psql; yields (query, plan)."""
+    psql = shutil.which("psql")
+    if not psql:
+        raise RuntimeError("psql not found on PATH; capture plans elsewhere and pass the files instead")
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    for query in queries:
+        result = subprocess.run(
+            [psql, "-X", "-q", "-A", "-t", "-v", "ON_ERROR_STOP=1", "-d", dsn,
+             "-c", "BEGIN", "-c", f"EXPLAIN ({options}) {query}", "-c", "ROLLBACK"],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"EXPLAIN failed for query:\n{query}\n{result.stderr.strip()}")
+        for value in iter_json_values(result.stdout):
+            for entry in value:
+                entry["Query Text"] = query
+                yield query, entry
+
+
+def plan_label(path, index, plan):
+    label = f"{path}#{index}" if path else f"query {index}"
+    query = plan.get("Query Text")
+    if query:
+        label += f": {' '.join(query.split())[:80]}"
+    return label
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit captured Postgres EXPLAIN (FORMAT JSON) plans")
+    parser.add_argument("plans", nargs="*", help="Plan files, directories (*.json) or glob patterns")
+    parser.add_argument("--schema", nargs="+", default=[], help="SQL schema files, directories or globs to cross-reference")
+    parser.add_argument("--min-rows", type=int, default=10000, help="Rows scanned for a table to count as large (default: 10000)")
+    parser.add_argument("--work-mem", type=int, default=4096, help="work_mem in kB, to estimate spills of plans without ANALYZE (default: 4096)")
+    parser.add_argument("--top", type=int, default=None, help="Only report the N most expensive findings")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Report format (default: text)")
+    parser.add_argument("--dsn", help="Collect plans from this local Postgres via psql (optional)")
+    parser.add_argument("--queries", help="With --dsn: file of ;-terminated queries to EXPLAIN")
+    parser.add_argument("--analyze", action="store_true", help="With --dsn: use EXPLAIN ANALYZE (runs each query in a rolled-back transaction)")
+    parser.add_argument("--save-plans", help="With --dsn: write the collected plans to this directory for offline use")
+    args = parser.parse_args()
+
+    if not args.plans and not args.dsn:
+        parser.print_help()
+        sys.exit(1)
+
+    foreign_keys, indexed_prefixes = [], set()
+    if args.schema:
+        schema_paths, unmatched = expand_inputs(args.schema)
+        for pattern in unmatched:
+            print_color("RED", f"Error reading file: no SQL files match '{pattern}'")
+        if schema_paths:
+            schema = audit_files(schema_paths)
+            foreign_keys, indexed_prefixes = schema["foreign_keys"], schema["indexed_prefixes"]
+
+    plans = []
+    plan_paths = []
+    for item in args.plans:
+        if os.path.isdir(item):
+            plan_paths.extend(sorted(str(p) for p in Path(item).rglob("*.json")))
+        else:
+            paths, unmatched = expand_inputs([item])
+            plan_paths.extend(paths)
+            for pattern in unmatched:
+                print_color("RED", f"Error reading file: no plan files match '{pattern}'")
+    for path in plan_paths:
+        try:
+            for index, plan in enumerate(load_plans(path), 1):
+                plans.append((plan_label(path, index, plan), plan))
+        except (OSError, ValueError) as e:
+            print_color("RED", f"Error reading plan file {path}: {e}")
+
+    if args.dsn:
+        if not args.queries:
+            parser.error("--dsn requires --queries")
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = split_queries(f.read())
+        try:
+            for index, (query, plan) in enumerate(collect_plans(args.dsn, queries, args.analyze), 1):
+                plans.append((plan_label(None, index, plan), plan))
+                if args.save_plans:
+                    os.makedirs(args.save_plans, exist_ok=True)
+                    with open(os.path.join(args.save_plans, f"query_{index:03d}.json"), "w", encoding="utf-8") as f:
+                        json.dump([plan], f, indent=2)
+        except RuntimeError as e:
+            print_color("RED", f"Error: {e}")
+            sys.exit(1)
+
+    auditor = PlanAuditor(foreign_keys, indexed_prefixes, args.min_rows, args.work_mem)
+    findings = []
+    for label, plan in plans:
+        findings.extend(auditor.audit(plan, label))
+    findings.sort(key=lambda f: f["cost"], reverse=True)
+    if args.top:
+        findings = findings[:args.top]
+
+    if args.format == "json":
+        print(json.dumps({
+            "script": "audit_plans",
+            "plans_checked": len(plans),
+            "schema_foreign_keys": len(foreign_keys),
+            "findings_count": len(findings),
+            "findings": findings,
+        }, indent=2))
+        return
+
+    print_color("BLUE", f"Auditing {len(plans)} plan(s)" + (f" against {len(foreign_keys)} foreign keys..." if args.schema else "..."))
+    if not findings:
+        print_color("GREEN", "✓ No issues found")
+    for rank, item in enumerate(findings, 1):
+        share = f", {item['plan_share']:.0%} of plan" if item["plan_share"] is not None else ""
+        print(f"\n{rank}. [{item['rule']}] cost {item['cost']:,.0f}{share} - {item['plan']}")
+        print_color("YELLOW", f"   ⚠ {item['message']}")
+
+if __name__ == "__main__":
+    main()
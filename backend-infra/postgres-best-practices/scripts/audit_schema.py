@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
+import glob
+import io
+import json
+import os
 import re
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 """
@@ -15,9 +20,18 @@ Checks:
 3. Foreign Keys: Checks if FK columns have a corresponding index.
 4. Naming: Checks for mixed-case identifiers.
 
+The input is read as a stream of statements, so multi-gigabyte `pg_dump --schema-only`
+output can be audited with bounded memory. Comments, string literals and dollar-quoted
+function bodies are ignored.
+
+Several files, directories (searched recursively for *.sql) and glob patterns can be
+audited at once. Files are parsed in parallel and foreign keys are matched against indexes
+from all of them, so an index added by a later migration covers an FK from an earlier one.
+
 Usage:
   python audit_schema.py schema.sql
   cat schema.sql | python audit_schema.py -
+  python audit_schema.py migrations/ --format sarif --output audit.sarif
 """
 
 COLORS = {
@@ -34,168 +48,577 @@ def print_color(color, text):
     else:
         print(text)
 
+class SQLStatement:
+    """One SQL statement with comments blanked out and literals emptied.
+
+    `code` keeps the statement's newlines, so line `start_line + k` of the
+    input is `code.split("\n")[k]`. String literals become '' and dollar-quoted
+    bodies become $$$$, which keeps function bodies and data out of the checks.
+    """
+    __slots__ = ("code", "start_line")
+
+    def __init__(self, code, start_line):
+        self.code = code
+        self.start_line = start_line
+
+    def lines(self):
+        for offset, line in enumerate(self.code.split("\n")):
+            yield self.start_line + offset, line
+
+    def line_at(self, position):
+        return self.start_line + self.code.count("\n", 0, position)
+
+
+# Tokens that change the lexer state outside of literals and comments
+NORMAL_TOKEN = re.compile(r"--|/\*|[eE]'|'|\"|(?<![\w$])\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$|;")
+BLOCK_COMMENT_TOKEN = re.compile(r"/\*|\*/")
+COPY_FROM_STDIN = re.compile(r"^\s*copy\b.*\bfrom\s+stdin\b", re.IGNORECASE | re.DOTALL)
+
+
+def iter_sql_statements(lines):
+    """Split SQL read line by line from `lines` into SQLStatements.
+
+    Handles statements spanning lines, `--` and nested `/* */` comments, quoted
+    strings and identifiers, E'' escapes and dollar quoting. Only the current
+    statement is held in memory, and literal contents are never stored, so
+    memory stays bounded on multi-gigabyte dumps. COPY ... FROM stdin data
+    blocks and psql meta-commands (lines starting with a backslash) are skipped.
+    """
+    parts = []          # code fragments of the current statement
+    start_line = 1
+    state = None        # None, "comment", "'", "E'", '"' or a dollar tag like "$body$"
+    comment_depth = 0
+    in_copy_data = False
+
+    for line_number, line in enumerate(lines, 1):
+        if in_copy_data:
+            if line.rstrip("\r\n") == "\\.":
+                in_copy_data = False
+                start_line = line_number + 1
+            continue
+        line = line.rstrip("\r\n")
+        if state is None and line.startswith("\\") and not "".join(parts).strip():
+            parts = []
+            start_line = line_number + 1
+            continue
+
+        pos = 0
+        while pos <= len(line):
+            if state is None:
+                match = NORMAL_TOKEN.search(line, pos)
+                if not match:
+                    parts.append(line[pos:])
+                    break
+                parts.append(line[pos:match.start()])
+                token = match.group()
+                pos = match.end()
+                if token == "--":
+                    break
+                if token == "/*":
+                    state, comment_depth = "comment", 1
+                    parts.append(" ")
+                elif token == ";":
+                    parts.append(";")
+                    code = "".join(parts)
+                    if code.strip() != ";":
+                        yield SQLStatement(code, start_line)
+                    if COPY_FROM_STDIN.match(code):
+                        in_copy_data = True
+                    parts = []
+                    start_line = line_number
+                elif token == '"':
+                    state = '"'
+                    parts.append('"')
+                elif token in ("'", "e'", "E'"):
+                    state = "E'" if token != "'" else "'"
+                    parts.append("''")
+                else:
+                    state = token
+                    parts.append("$$")
+            elif state == "comment":
+                match = BLOCK_COMMENT_TOKEN.search(line, pos)
+                if not match:
+                    break
+                pos = match.end()
+                comment_depth += 1 if match.group() == "/*" else -1
+                if comment_depth == 0:
+                    state = None
+            elif state == '"':
+                end = line.find('"', pos)
+                while end != -1 and line.startswith('""', end):
+                    end = line.find('"', end + 2)
+                if end == -1:
+                    parts.append(line[pos:])
+                    break
+                parts.append(line[pos:end + 1])
+                pos = end + 1
+                state = None
+            elif state in ("'", "E'"):
+                pattern = r"\\.|''|'" if state == "E'" else r"''|'"
+                for match in re.finditer(pattern, line[pos:]):
+                    if match.group() == "'":
+                        pos += match.end()
+                        state = None
+                        break
+                else:
+                    break
+            else:
+                end = line.find(state, pos)
+                if end == -1:
+                    break
+                pos = end + len(state)
+                parts.append("$$")
+                state = None
+        parts.append("\n")
+
+    code = "".join(parts)
+    if code.strip():
+        yield SQLStatement(code, start_line)
+
+
+PARENS_AND_COMMAS = re.compile(r"[(),]")
+
+
+def split_top_level(text):
+    """Split on commas outside parentheses; yields (offset, part)."""
+    depth = 0
+    start = 0
+    for match in PARENS_AND_COMMAS.finditer(text):
+        char = match.group()
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            yield start, text[start:match.start()]
+            start = match.end()
+    yield start, text[start:]
+
+
+def matching_paren(text, open_pos):
+    depth = 0
+    for match in PARENS_AND_COMMAS.finditer(text, open_pos):
+        char = match.group()
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return len(text)
+
+
+IDENTIFIER = r'(?:"[^"]*"|[a-zA-Z0-9_$]+)'
+QUALIFIED_NAME = rf'{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER})*'
+TABLE_PATTERN = re.compile(
+    rf'^\s*create\s+(?:(?:global\s+|local\s+)?(?:temp|temporary|unlogged)\s+)?table\s+(?:if\s+not\s+exists\s+)?({QUALIFIED_NAME})\s*\(',
+    re.IGNORECASE)
+INDEX_PATTERN = re.compile(
+    rf'^\s*create\s+(?:unique\s+)?index\s+(?:concurrently\s+)?(?:if\s+not\s+exists\s+)?(?:({IDENTIFIER})\s+)?on\s+(?:only\s+)?({QUALIFIED_NAME})\s*(?:using\s+\w+\s*)?\(',
+    re.IGNORECASE)
+REFERENCES_PATTERN = re.compile(rf'\breferences\s+({QUALIFIED_NAME})', re.IGNORECASE)
+FOREIGN_KEY_PATTERN = re.compile(r'^\s*foreign\s+key\s*\(([^)]*)\)', re.IGNORECASE)
+CONSTRAINT_PREFIX = re.compile(rf'^\s*constraint\s+{IDENTIFIER}\s+', re.IGNORECASE)
+# Words that every per-line check needs at least one of
+LINE_CHECK_HINT = re.compile(r'serial|uuid|char|timestamp|"', re.IGNORECASE)
+CREATE_STATEMENT = re.compile(r'^\s*create\b', re.IGNORECASE)
+TABLE_CONSTRAINT = re.compile(r'^\s*(?:check|exclude|like)\b', re.IGNORECASE)
+# PRIMARY KEY (a, b) / UNIQUE [NULLS [NOT] DISTINCT] (a, b) table constraints, which create indexes
+KEY_CONSTRAINT = re.compile(r'^\s*(?:primary\s+key|unique(?:\s+nulls\s+(?:not\s+)?distinct)?)\s*\(([^)]*)\)', re.IGNORECASE)
+INLINE_KEY = re.compile(r'\b(?:primary\s+key|unique)\b', re.IGNORECASE)
+ALTER_TABLE_PATTERN = re.compile(
+    rf'^\s*alter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?({QUALIFIED_NAME})\s+', re.IGNORECASE)
+ADD_ACTION = re.compile(r'^\s*add\s+(?:column\s+)?(?:if\s+not\s+exists\s+)?', re.IGNORECASE)
+
+
+def normalize_identifier(name):
+    """Compare names the way Postgres resolves them: unquoted parts fold to lower
+    case, quotes are dropped, and the default `public` schema is implied."""
+    parts = [
+        part[1:-1] if part.startswith('"') else part.lower()
+        for part in re.findall(IDENTIFIER, name)
+    ]
+    if len(parts) > 1 and parts[0] == "public":
+        parts = parts[1:]
+    return ".".join(parts)
+
+
+def column_names(column_list):
+    """First word of each comma-separated column entry (drops ASC/DESC, opclasses)."""
+    names = []
+    for _, part in split_top_level(column_list):
+        words = part.split()
+        if words:
+            names.append(words[0])
+    return names
+
+
+CATEGORIES = ["Primary Keys", "Data Types", "Indexes on Foreign Keys", "Naming Conventions"]
+
+# Rule ID -> (category, short description), used for reports
+RULES = {
+    "serial-primary-key": ("Primary Keys", "Prefer identity columns over serial"),
+    "uuid-v4-primary-key": ("Primary Keys", "UUID primary keys should use v7"),
+    "varchar-length": ("Data Types", "Prefer text over varchar(n)"),
+    "char-length": ("Data Types", "Prefer text over char(n)"),
+    "timestamp-without-tz": ("Data Types", "Prefer timestamptz over timestamp"),
+    "unindexed-foreign-key": ("Indexes on Foreign Keys", "Foreign key columns should be indexed"),
+    "mixed-case-identifier": ("Naming Conventions", "Prefer lowercase snake_case identifiers"),
+}
+
+
+def issue(rule, message, line=None, file=None):
+    return {"rule": rule, "category": RULES[rule][0], "message": message, "line": line, "file": file}
+
+
+def unindexed_foreign_keys(foreign_keys, indexed_prefixes):
+    """Issues for FKs whose (table, columns) isn't a prefix of any index.
+
+    An index covers a foreign key if the FK's columns are a prefix of the index's
+    columns on the same table; primary keys and unique constraints count too.
+    """
+    issues = []
+    for fk in foreign_keys:
+        key = (normalize_identifier(fk['table']), tuple(normalize_identifier(c) for c in fk['columns']))
+        if key in indexed_prefixes:
+            continue
+        if len(fk['columns']) > 1:
+            message = f"Table '{fk['table']}', Columns '{', '.join(fk['columns'])}': Foreign Key appears unindexed. This will cause slow JOINs and cascading deletes."
+        else:
+            message = f"Table '{fk['table']}', Column '{fk['column']}': Foreign Key appears unindexed. This will cause slow JOINs and cascading deletes."
+        issues.append(issue("unindexed-foreign-key", message, fk['line'], fk.get('file')))
+    return issues
+
+
+def format_issue(item, show_file=False):
+    text = item["message"]
+    if item["line"] and item["rule"] != "unindexed-foreign-key":
+        text = f"Line {item['line']}: {text}"
+    if show_file and item["file"]:
+        text = f"{item['file']}: {text}"
+    return text
+
+
 class SchemaAuditor:
-    def __init__(self, content):
-        self.content = content
-        self.lines = content.splitlines()
-        self.issues = []
+    CATEGORIES = CATEGORIES
+
+    def __init__(self, source, path=None):
+        """`source` is SQL text or any iterable of lines, such as an open file or sys.stdin.
+        `path` is recorded in issues and foreign keys for multi-file reports."""
+        if isinstance(source, str):
+            source = io.StringIO(source)
+        self.path = path
+        self.issues = {category: [] for category in self.CATEGORIES}
         self.tables = []
         self.indexes = []
         self.foreign_keys = []
-        
-        self._parse()
-
-    def _parse(self):
-        # Naive SQL parsing - sufficient for standard DDL
-        # Find tables
-        table_pattern = re.compile(r'create\s+table\s+(?:if\s+not\s+exists\s+)?([a-zA-Z0-9_"\.]+)', re.IGNORECASE)
-        for i, line in enumerate(self.lines):
-            match = table_pattern.search(line)
-            if match:
-                self.tables.append({"name": match.group(1), "line": i + 1})
-
-        # Find indexes
-        index_pattern = re.compile(r'create\s+(?:unique\s+)?index\s+(?:if\s+not\s+exists\s+)?([a-zA-Z0-9_"]+)\s+on\s+([a-zA-Z0-9_"\.]+)\s*(?:using\s+\w+\s*)?\(([^)]+)\)', re.IGNORECASE)
-        # Handle multi-line index definitions simply by joining (limitation: simple parsing)
-        full_content_normalized = re.sub(r'\s+', ' ', self.content)
-        for match in index_pattern.finditer(full_content_normalized):
-            idx_name = match.group(1)
-            table_name = match.group(2)
-            columns = [c.strip().split()[0] for c in match.group(3).split(',')] # Extract col name, ignore asc/desc
-            self.indexes.append({"name": idx_name, "table": table_name, "columns": columns})
-
-        # Find inline Foreign Keys & Column Defs
-        # This is complex with regex. We'll do line-by-line checks for standard patterns.
-        fk_pattern = re.compile(r'\b([a-zA-Z0-9_"]+)\s+.*\breferences\s+([a-zA-Z0-9_"\.]+)', re.IGNORECASE)
-        
-        table_context = None
-        for i, line in enumerate(self.lines):
-            clean_line = line.strip()
-            if clean_line.lower().startswith("create table"):
-                match = table_pattern.search(line)
-                if match:
-                    table_context = match.group(1)
-            elif clean_line.startswith(");"):
-                table_context = None
-            
-            # Check for inline FKs
-            if table_context:
-                fk_match = fk_pattern.search(clean_line)
-                if fk_match and not clean_line.startswith("--"):
-                    col_name = fk_match.group(1)
-                    ref_table = fk_match.group(2)
-                    self.foreign_keys.append({
-                        "table": table_context,
-                        "column": col_name,
-                        "ref_table": ref_table,
-                        "line": i + 1
-                    })
+        # (table, leading columns) for every prefix of every index, so an FK is
+        # covered if its normalized (table, columns) is in the set
+        self.indexed_prefixes = set()
+
+        self._parse(source)
+
+    def _parse(self, lines):
+        # Everything is collected in one pass over the statements; only the FK
+        # check needs the whole schema and runs when results are requested.
+        for statement in iter_sql_statements(lines):
+            self._parse_statement(statement)
+            # Most statements have nothing the line checks look for
+            if not LINE_CHECK_HINT.search(statement.code):
+                continue
+            is_create = CREATE_STATEMENT.match(statement.code) is not None
+            for line_number, line in statement.lines():
+                if LINE_CHECK_HINT.search(line):
+                    self._check_line(line_number, line, is_create)
+
+    def _parse_statement(self, statement):
+        code = statement.code
+        match = TABLE_PATTERN.match(code)
+        if match:
+            table = match.group(1)
+            self.tables.append({"name": table, "line": statement.line_at(match.start(1))})
+            body_start = match.end()
+            body = code[body_start:matching_paren(code, body_start - 1)]
+            for offset, element in split_top_level(body):
+                self._parse_table_element(table, element, statement.line_at(body_start + offset + len(element) - len(element.lstrip())))
+            return
+
+        match = INDEX_PATTERN.match(code)
+        if match:
+            columns_start = match.end()
+            columns = column_names(code[columns_start:matching_paren(code, columns_start - 1)])
+            self._add_index(match.group(1), match.group(2), columns)
+            return
+
+        # ALTER TABLE ... ADD [CONSTRAINT name] FOREIGN KEY / PRIMARY KEY / UNIQUE, as pg_dump
+        # writes them, and ADD [COLUMN] definitions with inline constraints
+        match = ALTER_TABLE_PATTERN.match(code)
+        if match:
+            table = match.group(1)
+            actions_start = match.end()
+            for offset, action in split_top_level(code[actions_start:].rstrip().rstrip(";")):
+                add = ADD_ACTION.match(action)
+                if add:
+                    line = statement.line_at(actions_start + offset + len(action) - len(action.lstrip()))
+                    self._parse_table_element(table, action[add.end():], line)
+
+    def _add_index(self, name, table, columns):
+        self.indexes.append({"name": name, "table": table, "columns": columns})
+        table_key = normalize_identifier(table)
+        normalized = tuple(normalize_identifier(c) for c in columns)
+        for length in range(1, len(normalized) + 1):
+            self.indexed_prefixes.add((table_key, normalized[:length]))
+
+    def _parse_table_element(self, table, element, line):
+        element = CONSTRAINT_PREFIX.sub("", element, count=1)
+        if TABLE_CONSTRAINT.match(element):
+            return
+        key = KEY_CONSTRAINT.match(element)
+        if key:
+            self._add_index(None, table, column_names(key.group(1)))
+            return
+        foreign_key = FOREIGN_KEY_PATTERN.match(element)
+        column = element.split()[:1]
+        if not foreign_key and column and INLINE_KEY.search(element):
+            # Column-level PRIMARY KEY / UNIQUE
+            self._add_index(None, table, column)
+        references = REFERENCES_PATTERN.search(element)
+        if not references:
+            return
+        columns = column_names(foreign_key.group(1)) if foreign_key else column
+        if columns:
+            self.foreign_keys.append({
+                "table": table,
+                "column": columns[0],
+                "columns": columns,
+                "ref_table": references.group(1),
+                "line": line,
+                "file": self.path,
+            })
+
+    def _check_line(self, line_number, line, is_create):
+        checks = [self._check_primary_keys, self._check_data_types]
+        if is_create:
+            checks.append(self._check_naming)
+        for check in checks:
+            for rule, message in check(line):
+                self.issues[RULES[rule][0]].append(issue(rule, message, line_number, self.path))
 
     def check_best_practices(self):
-        self._check_result("Primary Keys", self._check_primary_keys())
-        self._check_result("Data Types", self._check_data_types())
-        self._check_result("Indexes on Foreign Keys", self._check_fk_indexes())
-        self._check_result("Naming Conventions", self._check_naming())
+        self.issues["Indexes on Foreign Keys"] = self._check_fk_indexes()
+        print_issues(self.issues)
 
-    def _check_result(self, category, issues):
-        print(f"\n--- {category} ---")
-        if not issues:
-            print_color("GREEN", "✓ No issues found")
-        else:
-            for issue in issues:
-                print_color("YELLOW", f"⚠ {issue}")
+    SERIAL = re.compile(r'\bserial\b', re.IGNORECASE)
+    UUID = re.compile(r'\buuid\b', re.IGNORECASE)
+    DEFAULT_GEN_UUID = re.compile(r'default\s+gen_random_uuid\(\)', re.IGNORECASE)
 
-    def _check_primary_keys(self):
+    def _check_primary_keys(self, line):
         issues = []
-        serial_pattern = re.compile(r'\bserial\b', re.IGNORECASE)
-        uuid_pattern = re.compile(r'\buuid\b', re.IGNORECASE)
-        default_gen_uuid = re.compile(r'default\s+gen_random_uuid\(\)', re.IGNORECASE)
-
-        for i, line in enumerate(self.lines):
-            if serial_pattern.search(line):
-                issues.append(f"Line {i+1}: Usage of 'serial' detected. Prefer 'generated always as identity' (SQL Standard).")
-            
-            if uuid_pattern.search(line) and "primary key" in line.lower():
-                 if not default_gen_uuid.search(line) and "uuid_generate_v7" not in line.lower():
-                     issues.append(f"Line {i+1}: UUID Primary Key detected without v7 function. Ensure you are using v7 or aware of fragmentation with v4.")
+        if self.SERIAL.search(line):
+            issues.append(("serial-primary-key", "Usage of 'serial' detected. Prefer 'generated always as identity' (SQL Standard)."))
+        
+        if self.UUID.search(line) and "primary key" in line.lower():
+             if not self.DEFAULT_GEN_UUID.search(line) and "uuid_generate_v7" not in line.lower():
+                 issues.append(("uuid-v4-primary-key", "UUID Primary Key detected without v7 function. Ensure you are using v7 or aware of fragmentation with v4."))
 
         return issues
 
-    def _check_data_types(self):
+    VARCHAR_N = re.compile(r'varchar\s*\(', re.IGNORECASE)
+    CHAR_N = re.compile(r'\bchar\s*\(', re.IGNORECASE)
+    TIMESTAMP = re.compile(r'\btimestamp\b', re.IGNORECASE)
+    TIMESTAMPTZ = re.compile(r'\btimestamptz\b', re.IGNORECASE)
+
+    def _check_data_types(self, line):
         issues = []
-        varchar_n = re.compile(r'varchar\s*\(', re.IGNORECASE)
-        char_n = re.compile(r'\bchar\s*\(', re.IGNORECASE)
-        timestamp = re.compile(r'\btimestamp\b', re.IGNORECASE)
-        timestamptz = re.compile(r'\btimestamptz\b', re.IGNORECASE)
-
-        for i, line in enumerate(self.lines):
-             if varchar_n.search(line):
-                 issues.append(f"Line {i+1}: 'varchar(n)' detected. Prefer 'text' in Postgres (no performance diff, no arbitrary limits).")
-             if char_n.search(line):
-                 issues.append(f"Line {i+1}: 'char(n)' detected. This pads with spaces. Prefer 'text'.")
-             if timestamp.search(line) and not timestamptz.search(line):
-                  # simple check, might identify 'timestamp with time zone' which is fine
-                  if "with time zone" not in line.lower():
-                      issues.append(f"Line {i+1}: 'timestamp' (no tz) detected. Almost always prefer 'timestamptz' to store UTC point-in-time.")
+        if self.VARCHAR_N.search(line):
+            issues.append(("varchar-length", "'varchar(n)' detected. Prefer 'text' in Postgres (no performance diff, no arbitrary limits)."))
+        if self.CHAR_N.search(line):
+            issues.append(("char-length", "'char(n)' detected. This pads with spaces. Prefer 'text'."))
+        if self.TIMESTAMP.search(line) and not self.TIMESTAMPTZ.search(line):
+             # simple check, might identify 'timestamp with time zone' which is fine
+             if "with time zone" not in line.lower():
+                 issues.append(("timestamp-without-tz", "'timestamp' (no tz) detected. Almost always prefer 'timestamptz' to store UTC point-in-time."))
         return issues
 
     def _check_fk_indexes(self):
-        issues = []
-        # Naive check: does an index exist where 'table' matches and 'columns' contains the FK column?
-        # Note: This is hard to do perfectly with regex on raw SQL text without a full parser state,
-        # but we can do a "best effort" check.
-        
-        # We need to map table names from FK definitions to table names in Index definitions.
-        # This naive parser might fail on schemas or quoted names differences.
-        
-        for fk in self.foreign_keys:
-            is_indexed = False
-            for idx in self.indexes:
-                # Normalize names (remove quotes)
-                idx_table = idx['table'].replace('"', '')
-                fk_table = fk['table'].replace('"', '')
-                
-                if idx_table == fk_table:
-                    # Check if FK column is the FIRST column in the index
-                    if idx['columns'] and idx['columns'][0].replace('"', '') == fk['column'].replace('"', ''):
-                        is_indexed = True
-                        break
-            
-            if not is_indexed:
-                issues.append(f"Table '{fk['table']}', Column '{fk['column']}': Foreign Key appears unindexed. This will cause slow JOINs and cascading deletes.")
-        
-        return issues
+        return unindexed_foreign_keys(self.foreign_keys, self.indexed_prefixes)
 
-    def _check_naming(self):
+    MIXED_CASE = re.compile(r'"[a-z]+[A-Z]+[^"]*"')
+
+    def _check_naming(self, line):
         issues = []
-        mixed_case = re.compile(r'"[a-z]+[A-Z]+[^"]*"')
-        for i, line in enumerate(self.lines):
-            if mixed_case.search(line) and "create" in line.lower():
-                issues.append(f"Line {i+1}: Mixed-case quoted identifier detected. Prefer lowercase snake_case to avoid double-quoting hell.")
+        if self.MIXED_CASE.search(line):
+            issues.append(("mixed-case-identifier", "Mixed-case quoted identifier detected. Prefer lowercase snake_case to avoid double-quoting hell."))
         return issues
 
+
+def print_issues(issues_by_category, show_file=False):
+    for category in CATEGORIES:
+        issues = issues_by_category[category]
+        print(f"\n--- {category} ---")
+        if not issues:
+            print_color("GREEN", "✓ No issues found")
+        else:
+            for item in issues:
+                print_color("YELLOW", f"⚠ {format_issue(item, show_file)}")
+
+
+def expand_inputs(inputs):
+    """Resolve files, directories (recursive *.sql) and glob patterns to a sorted,
+    de-duplicated list of files. Returns (files, patterns that matched nothing)."""
+    files = []
+    unmatched = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, dirnames, filenames in os.walk(item):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+                files.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.lower().endswith('.sql'))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            matches = sorted(m for m in glob.glob(item, recursive=True) if os.path.isfile(m))
+            if not matches:
+                unmatched.append(item)
+            files.extend(matches)
+    return list(dict.fromkeys(files)), unmatched
+
+
+def audit_file(path):
+    """Parse one file; returns what the cross-file FK check and the report need."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            auditor = SchemaAuditor(f, path)
+    except OSError as e:
+        return {"file": path, "error": str(e)}
+    return {
+        "file": path,
+        "tables": len(auditor.tables),
+        "issues": auditor.issues,
+        "foreign_keys": auditor.foreign_keys,
+        "indexed_prefixes": auditor.indexed_prefixes,
+    }
+
+
+def audit_files(paths, jobs=None):
+    """Audit files in a process pool and check FKs against indexes from all of them.
+
+    Returns {"files": [...], "errors": [...], "issues": {category: [...]}}, plus the
+    merged "foreign_keys" and "indexed_prefixes" for tools that cross-reference the schema.
+    """
+    if len(paths) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(audit_file, paths, chunksize=max(1, len(paths) // 64)))
+    else:
+        results = [audit_file(path) for path in paths]
+
+    issues = {category: [] for category in CATEGORIES}
+    foreign_keys = []
+    indexed_prefixes = set()
+    errors = []
+    for result in results:
+        if "error" in result:
+            errors.append({"file": result["file"], "message": result["error"]})
+            continue
+        for category, items in result["issues"].items():
+            issues[category].extend(items)
+        foreign_keys.extend(result["foreign_keys"])
+        indexed_prefixes |= result["indexed_prefixes"]
+    issues["Indexes on Foreign Keys"] = unindexed_foreign_keys(foreign_keys, indexed_prefixes)
+    return {
+        "files": [{"file": r["file"], "tables": r.get("tables", 0)} for r in results if "error" not in r],
+        "errors": errors,
+        "issues": issues,
+        "foreign_keys": foreign_keys,
+        "indexed_prefixes": indexed_prefixes,
+    }
+
+
+def json_report(report):
+    issues = [item for category in CATEGORIES for item in report["issues"][category]]
+    return {
+        "script": "audit_schema",
+        "files_checked": len(report["files"]),
+        "issues_found": len(issues),
+        "errors": report["errors"],
+        "issues": issues,
+    }
+
+
+def sarif_report(report):
+    rule_ids = list(RULES)
+    results = []
+    for category in CATEGORIES:
+        for item in report["issues"][category]:
+            location = {"artifactLocation": {"uri": Path(item["file"] or "stdin").as_posix()}}
+            if item["line"]:
+                location["region"] = {"startLine": item["line"]}
+            results.append({
+                "ruleId": item["rule"],
+                "ruleIndex": rule_ids.index(item["rule"]),
+                "level": "warning",
+                "message": {"text": item["message"]},
+                "locations": [{"physicalLocation": location}],
+            })
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {
+                "name": "audit_schema",
+                "informationUri": "https://supabase.com/docs/guides/database/overview",
+                "rules": [
+                    {"id": rule, "name": rule, "shortDescription": {"text": description},
+                     "properties": {"category": category}}
+                    for rule, (category, description) in RULES.items()
+                ],
+            }},
+            "results": results,
+        }],
+    }
+
 def main():
     parser = argparse.ArgumentParser(description="Audit SQL for Supabase/Postgres Best Practices")
-    parser.add_argument("file", nargs="?", help="SQL file path or - for stdin")
+    parser.add_argument("files", nargs="*", metavar="file", help="SQL files, directories or glob patterns, or - for stdin")
+    parser.add_argument("--format", choices=["text", "json", "sarif"], default="text", help="Report format (default: text)")
+    parser.add_argument("-o", "--output", help="Write the report to this file instead of stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes for multiple files (default: CPU count)")
     args = parser.parse_args()
 
-    content = ""
-    if args.file == "-" or not args.file:
+    if not args.files or args.files == ["-"]:
         if sys.stdin.isatty():
              parser.print_help()
              sys.exit(1)
-        content = sys.stdin.read()
+        if args.format == "text":
+            print_color("BLUE", "Starting Postgres Schema Audit...")
+        auditor = SchemaAuditor(sys.stdin)
+        auditor.issues["Indexes on Foreign Keys"] = auditor._check_fk_indexes()
+        report = {"files": [{"file": "-", "tables": len(auditor.tables)}], "errors": [], "issues": auditor.issues}
     else:
-        try:
-            with open(args.file, 'r') as f:
-                content = f.read()
-        except Exception as e:
-            print_color("RED", f"Error reading file: {e}")
+        paths, unmatched = expand_inputs(args.files)
+        for pattern in unmatched:
+            print_color("RED", f"Error reading file: no SQL files match '{pattern}'")
+        if not paths:
             sys.exit(1)
+        if args.format == "text":
+            print_color("BLUE", f"Starting Postgres Schema Audit of {len(paths)} file(s)..." if len(paths) > 1 else "Starting Postgres Schema Audit...")
+        report = audit_files(paths, args.jobs)
+        for error in report["errors"]:
+            print_color("RED", f"Error reading file: {error['message']}")
 
-    print_color("BLUE", "Starting Postgres Schema Audit...")
-    auditor = SchemaAuditor(content)
-    auditor.check_best_practices()
+    if args.format == "text" and not args.output:
+        print_issues(report["issues"], show_file=len(report["files"]) > 1)
+        return
+    if args.format == "text":
+        show_file = len(report["files"]) > 1
+        output = "\n".join(format_issue(item, show_file) for category in CATEGORIES for item in report["issues"][category])
+    else:
+        output = json.dumps(json_report(report) if args.format == "json" else sarif_report(report), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Wrote {args.format} report to {args.output}")
+    else:
+        print(output)
 
 if __name__ == "__main__":
     main()
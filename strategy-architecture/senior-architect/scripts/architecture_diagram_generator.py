@@ -2,13 +2,29 @@
 """
 Architecture Diagram Generator
 Generates a Mermaid JS graph of the project structure.
+
+Node IDs are derived from each entry's path relative to the root, so the same
+tree always produces the same diagram and diagrams can be diffed. With
+--cache-dir, the diagram is cached together with the mtimes of the directories
+it lists; it is regenerated only when one of them changes (an entry was added,
+removed or renamed).
+
+With --imports, the diagram is the project's import graph instead (see
+import_graph.py): files are grouped by their directory --depth levels below
+the root, edges are labelled with the number of imports between groups,
+groups containing an import cycle are outlined in red and imports that break
+--layers are drawn in red.
 """
 
 import os
 import sys
+import json
+import hashlib
 import argparse
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, List, Optional, Tuple
+
+from import_graph import analyze_project, collapse, collapsed_edges, parse_layers
 
 IGNORED_DIRS = {
     '.git', '__pycache__', 'node_modules', 'venv', '.env', '.idea', '.vscode',
@@ -16,65 +32,181 @@ IGNORED_DIRS = {
 }
 
 IGNORED_FILES = {
-    '.DS_Store', 'Thumbs.db', '.gitignore', '.dockerignore', 'LICENSE', 
+    '.DS_Store', 'Thumbs.db', '.gitignore', '.dockerignore', 'LICENSE',
     'README.md', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml'
 }
 
-def generate_mermaid_graph(root_path: Path, max_depth: int = 2) -> str:
-    """Scans directory and returns mermaid graph definition"""
+# Bump when the diagram format changes so cached diagrams are discarded
+CACHE_VERSION = 1
+
+
+def node_id(rel_path: str) -> str:
+    """Stable Mermaid node ID for a path relative to the root."""
+    return f"node_{hashlib.sha1(rel_path.encode('utf-8')).hexdigest()[:12]}"
+
+
+def sorted_entries(path: str) -> List[os.DirEntry]:
+    """Entries of a directory, directories first, then files, by name."""
+    with os.scandir(path) as it:
+        entries = [e for e in it if e.name not in IGNORED_DIRS and e.name not in IGNORED_FILES]
+    # DirEntry.is_dir() uses the file type returned by the directory listing,
+    # so sorting costs no extra stat per entry
+    entries.sort(key=lambda e: (not e.is_dir(), e.name.lower()))
+    return entries
+
+
+def scan_tree(root_path: Path, max_depth: int = 2) -> Tuple[str, Dict[str, int]]:
+    """Scans directory and returns the mermaid graph definition and the
+    mtimes (ns) of the directories it listed, keyed by relative path."""
     lines = ["graph TD"]
-    
-    # Sanitize root name for mermaid (alphanumeric only)
+    dir_mtimes = {}
+
     root_id = "root"
     lines.append(f"    {root_id}[{root_path.name}/]")
-    
-    def scan(current_path: Path, parent_id: str, current_depth: int):
+
+    def scan(current_path: str, rel_path: str, parent_id: str, current_depth: int):
         if current_depth > max_depth:
             return
 
         try:
-            # Sort for consistent output: directories first, then files
-            entries = sorted(list(current_path.iterdir()), key=lambda e: (not e.is_dir(), e.name.lower()))
-            
-            for entry in entries:
-                if entry.name in IGNORED_DIRS or entry.name in IGNORED_FILES:
-                    continue
-                
-                # Simple ID generation: parent_id + index, but using hash to specific path might be safer against collision if we had complex linkage
-                # specific unique ID based on path hash to avoid collisions?
-                # for simple visualization, just unique incremental or based on name might be risky if dup names in diff folders.
-                # using formatted path as ID.
-                
-                node_id = f"node_{abs(hash(str(entry)))}" 
-                
-                if entry.is_dir():
-                    lines.append(f"    {parent_id} --> {node_id}[{entry.name}/]")
-                    scan(entry, node_id, current_depth + 1)
-                else:
-                    lines.append(f"    {parent_id} --> {node_id}({entry.name})")
-
+            # Taken before listing, so a change made during the scan invalidates the cache
+            dir_mtimes[rel_path] = os.stat(current_path).st_mtime_ns
+            entries = sorted_entries(current_path)
         except PermissionError:
-            pass
+            return
+
+        for entry in entries:
+            entry_rel = f"{rel_path}/{entry.name}" if rel_path else entry.name
+            entry_id = node_id(entry_rel)
+
+            if entry.is_dir():
+                lines.append(f"    {parent_id} --> {entry_id}[{entry.name}/]")
+                scan(entry.path, entry_rel, entry_id, current_depth + 1)
+            else:
+                lines.append(f"    {parent_id} --> {entry_id}({entry.name})")
+
+    scan(str(root_path), "", root_id, 1)
+
+    return "\n".join(lines), dir_mtimes
+
+
+def cache_path_for(cache_dir: Path, root_path: Path, max_depth: int) -> Path:
+    key = hashlib.sha1(f"{root_path}\0{max_depth}".encode('utf-8')).hexdigest()
+    return Path(cache_dir) / f"{key}.json"
+
+
+def load_cached_diagram(cache_path: Path, root_path: Path) -> Optional[str]:
+    """The cached diagram, if none of the directories it lists has changed."""
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if cached.get('version') != CACHE_VERSION:
+        return None
+    for rel_path, mtime in cached['dirs'].items():
+        try:
+            if os.stat(root_path / rel_path).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+    return cached['diagram']
 
-    scan(root_path, root_id, 1)
-    
-    return "\n".join(lines)
+
+def save_cached_diagram(cache_path: Path, diagram: str, dir_mtimes: Dict[str, int]):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'dirs': dir_mtimes, 'diagram': diagram}), encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def generate_mermaid_graph(root_path: Path, max_depth: int = 2, cache_dir: Optional[Path] = None) -> str:
+    """Scans directory and returns mermaid graph definition"""
+    if cache_dir is None:
+        return scan_tree(root_path, max_depth)[0]
+
+    cache_path = cache_path_for(cache_dir, root_path, max_depth)
+    diagram = load_cached_diagram(cache_path, root_path)
+    if diagram is None:
+        diagram, dir_mtimes = scan_tree(root_path, max_depth)
+        save_cached_diagram(cache_path, diagram, dir_mtimes)
+    return diagram
+
+def generate_import_graph(root_path: Path, depth: int = 2, layers=None, jobs=None,
+                          cache_dir: Optional[Path] = None) -> Tuple[str, dict]:
+    """Returns a mermaid graph of the imports between directories and the analysis report"""
+    report = analyze_project(root_path, layers, jobs, Path(cache_dir) / 'imports' if cache_dir else None)
+    edges = report.pop('edges')
+
+    groups = sorted({collapse(rel, depth) for rel in edges})
+    cyclic = {collapse(rel, depth) for cycle in report['cycles'] for rel in cycle['files']}
+    violating = {(collapse(v['file'], depth), collapse(v['imports'], depth)) for v in report['layer_violations']}
+
+    lines = ["graph LR"]
+    for group in groups:
+        # Quoted, since names such as [id].tsx are Mermaid syntax
+        lines.append(f'    {node_id(group)}["{group}"]')
+
+    red_links = []
+    for i, ((group, target), count) in enumerate(sorted(collapsed_edges(edges, depth).items())):
+        lines.append(f"    {node_id(group)} -->|{count}| {node_id(target)}")
+        if (group, target) in violating:
+            red_links.append(str(i))
+
+    if cyclic:
+        lines.append("    classDef cycle stroke:#d33,stroke-width:2px")
+        lines.append(f"    class {','.join(node_id(g) for g in sorted(cyclic))} cycle")
+    if red_links:
+        lines.append(f"    linkStyle {','.join(red_links)} stroke:#d33,stroke-width:2px")
+
+    return "\n".join(lines), report
+
+def print_import_summary(report: dict, file=sys.stdout):
+    print(f"Files: {report['files']} ({report['parsed']} parsed, {report['cached']} cached), "
+          f"imports: {report['imports']}, external: {report['external_imports']}", file=file)
+    for error in report['parse_errors']:
+        print(f"Parse error: {error['file']}: {error['error']}", file=file)
+    for cycle in report['cycles']:
+        print(f"Cycle ({len(cycle['files'])} files): {' -> '.join(cycle['example'])}", file=file)
+    for v in report['layer_violations']:
+        print(f"Layer violation: {v['file']}:{v['line']} ({v['layer']}) imports {v['imports']} ({v['imported_layer']})", file=file)
 
 def main():
     parser = argparse.ArgumentParser(description="Generate Mermaid Architecture Diagram")
     parser.add_argument('target', help='Target directory')
     parser.add_argument('--output', '-o', help='Output file path (default: stdout)')
     parser.add_argument('--depth', type=int, default=2, help='Max recursion depth (default: 2)')
-    
+    parser.add_argument('--cache-dir', help='Reuse the diagram cached here while no listed directory has changed '
+                                            '(with --imports: reuse the imports parsed from unchanged files)')
+    parser.add_argument('--imports', action='store_true', help='Draw the import graph, collapsed to --depth, instead of the folder tree')
+    parser.add_argument('--layers', help='With --imports: layers from top to bottom, e.g. ui,services,domain')
+    parser.add_argument('--report', help='With --imports: write the cycles and layer violations as JSON to this file')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='With --imports: worker processes (default: CPU count)')
+
     args = parser.parse_args()
     target_path = Path(args.target).resolve()
-    
+
     if not target_path.exists():
         print(f"Error: Target path {target_path} does not exist.")
         sys.exit(1)
-        
-    diagram = generate_mermaid_graph(target_path, args.depth)
-    
+
+    report = None
+    if args.imports:
+        layers = parse_layers(args.layers) if args.layers else None
+        diagram, report = generate_import_graph(target_path, args.depth, layers, args.jobs, args.cache_dir)
+    else:
+        diagram = generate_mermaid_graph(target_path, args.depth, args.cache_dir)
+
+    if args.report and report is not None:
+        try:
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            print(f"Error writing file: {e}")
+            sys.exit(1)
+
     if args.output:
         try:
             with open(args.output, 'w') as f:
@@ -83,8 +215,13 @@ def main():
         except Exception as e:
             print(f"Error writing file: {e}")
             sys.exit(1)
+        if report is not None:
+            print_import_summary(report)
     else:
         print(diagram)
+        if report is not None:
+            # Keep stdout a valid diagram
+            print_import_summary(report, file=sys.stderr)
 
 if __name__ == '__main__':
     main()
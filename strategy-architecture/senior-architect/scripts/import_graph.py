@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Import Graph
+Builds the module dependency graph of a project from its import statements.
+
+Python files are parsed with `ast`; JavaScript/TypeScript files are scanned
+for `import ... from`, `export ... from`, `import()` and `require()`. Files
+are parsed in a process pool, and with a cache directory each file's imports
+are cached by content hash, so re-analysing a large repository only parses
+the files that changed.
+
+Imports are resolved to files of the project; everything else (standard
+library, packages) is counted as external. Python imports resolve against
+the project root, a top-level `src/` or `lib/`, and the importing file's own
+directory (scripts importing their siblings). JS/TS imports resolve relative
+paths, `@/` and `~/` aliases (project root or `src/`), extensions and
+`index` files.
+
+Type-only imports are left out, since they create no runtime dependency and
+would report cycles that don't exist: TypeScript's `import type` /
+`export type` (and `import { type A, type B }`), and Python imports inside
+`if TYPE_CHECKING:`.
+
+The report lists import cycles (strongly connected components) and, given
+layers ordered from the top (e.g. `ui,services,domain`), imports from a layer
+into a layer listed before it. A file belongs to the first layer whose
+directory appears in its path; `name|other` makes one layer of several
+directory names.
+
+Usage:
+    python import_graph.py <project-path> [--layers ui,services,domain] [--cache-dir DIR] [-j N]
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import hashlib
+import argparse
+import posixpath
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+SKIP_DIRS = {
+    '.git', '__pycache__', 'node_modules', 'venv', '.venv', '.env', '.idea', '.vscode',
+    'dist', 'build', 'coverage', '.next', '.nuxt', 'target', 'bin', 'obj', '.tox', '.mypy_cache'
+}
+
+PY_EXTENSIONS = ('.py',)
+JS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.mts', '.cts')
+
+# Top-level directories that are source roots rather than packages
+SOURCE_ROOTS = ('src', 'lib')
+
+# Fields holding the nested statements of compound statements (and of except/case clauses)
+STATEMENT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+# Bump when the parsed structure changes so cached results are discarded
+CACHE_VERSION = 3
+
+# Strings are matched so that comment markers inside them are left alone
+JS_COMMENT_RE = re.compile(r'''('(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)|//[^\n]*|/\*.*?\*/''', re.DOTALL)
+
+# The clause of `import ... from` spans lines only inside braces and contains
+# no `=`, so it can't run on from an unrelated statement such as
+# `export type Id = string` into the next line's import
+JS_IMPORT_RE = re.compile(r'''
+    # import x from 'a', import { a,\n b } from 'a', export * from 'a'
+    \b(?:import|export)\b(?P<clause>[^'"`;()={}\n]*?(?:\{[^'"`;(){}=]*\}[^'"`;()={}\n]*?)?)\s*\bfrom\s*(['"])(?P<from>[^'"\n]+)\2
+  | \bimport\s*(['"])(?P<bare>[^'"\n]+)\4                                  # import 'a'
+  | \b(?:require|import)\s*\(\s*(['"])(?P<call>[^'"\n]+)\6\s*\)           # require('a'), import('a')
+''', re.VERBOSE)
+
+
+# `type X`, `type { X }`, `type * as X`, but not a default import named `type`
+JS_TYPE_ONLY_CLAUSE = re.compile(r'\s*type\s+[\w${*]')
+
+
+def is_type_only_clause(clause: str) -> bool:
+    """Whether `import <clause> from` imports only types."""
+    if JS_TYPE_ONLY_CLAUSE.match(clause):
+        return True
+    # import { type A, type B } from ...
+    names = clause.strip()
+    if names.startswith('{') and names.endswith('}'):
+        specifiers = [s.strip() for s in names[1:-1].split(',') if s.strip()]
+        return bool(specifiers) and all(s.startswith('type ') for s in specifiers)
+    return False
+
+
+def find_source_files(root_path: Path) -> List[str]:
+    """Relative POSIX paths of the Python and JS/TS files under root_path, sorted."""
+    files = []
+    stack = [(str(root_path), '')]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append((entry.path, rel))
+                elif entry.name.endswith(PY_EXTENSIONS + JS_EXTENSIONS) and not entry.name.endswith('.d.ts') and entry.is_file():
+                    files.append(rel)
+            except OSError:
+                continue
+    return sorted(files)
+
+
+def language(rel_path: str) -> str:
+    return 'python' if rel_path.endswith(PY_EXTENSIONS) else 'js'
+
+
+def is_type_checking_guard(node) -> bool:
+    """`if TYPE_CHECKING:` or `if typing.TYPE_CHECKING:`"""
+    if not isinstance(node, ast.If):
+        return False
+    test = node.test
+    return (isinstance(test, ast.Name) and test.id == 'TYPE_CHECKING') or \
+        (isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING')
+
+
+def iter_statements(tree: ast.Module):
+    """Every statement of a module, including nested ones, except the body of
+    `if TYPE_CHECKING:` blocks. Imports are statements, so expressions, most of
+    the tree, are not visited."""
+    stack = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
+        yield node
+        for field in STATEMENT_FIELDS:
+            if field == 'body' and is_type_checking_guard(node):
+                continue
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                stack.extend(reversed(children))
+
+
+def parse_python(text: str) -> List[dict]:
+    """Import statements of a Python module as {module, names, level, line}."""
+    if 'import' not in text:
+        return []
+    imports = []
+    for node in iter_statements(ast.parse(text)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append({'module': alias.name, 'names': [], 'level': 0, 'line': node.lineno})
+        elif isinstance(node, ast.ImportFrom):
+            imports.append({
+                'module': node.module or '',
+                'names': [alias.name for alias in node.names],
+                'level': node.level,
+                'line': node.lineno,
+            })
+    return sorted(imports, key=lambda imp: imp['line'])
+
+
+def parse_js(text: str) -> List[dict]:
+    """Module specifiers imported by a JS/TS file, in the same shape as parse_python."""
+    # Blank out comments, keeping their newlines so line numbers don't shift
+    text = JS_COMMENT_RE.sub(lambda m: m.group(1) or '\n' * m.group().count('\n'), text)
+    imports = []
+    line = 1
+    position = 0
+    for match in JS_IMPORT_RE.finditer(text):
+        line += text.count('\n', position, match.start())
+        position = match.start()
+        if match.group('from') and is_type_only_clause(match.group('clause')):
+            continue
+        module = match.group('from') or match.group('bare') or match.group('call')
+        imports.append({'module': module, 'names': [], 'level': 0, 'line': line})
+    return imports
+
+
+def parse_source(content: bytes, lang: str) -> dict:
+    text = content.decode('utf-8', errors='replace')
+    try:
+        return {'imports': parse_python(text) if lang == 'python' else parse_js(text), 'error': None}
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        # RecursionError/MemoryError come from pathologically nested code; losing one
+        # file is better than aborting the whole analysis from a pool worker
+        return {'imports': [], 'error': f"{type(e).__name__}: {e}"}
+
+
+def parse_file(file_path: str, cache_dir=None) -> dict:
+    """Parse one file, reusing the result cached for identical content."""
+    lang = language(file_path)
+    try:
+        content = Path(file_path).read_bytes()
+    except OSError as e:
+        return {'imports': [], 'error': str(e), 'cached': False}
+    if cache_dir is None:
+        return {**parse_source(content, lang), 'cached': False}
+
+    digest = hashlib.sha256(lang.encode() + b'\0' + content).hexdigest()
+    cache_path = Path(cache_dir) / digest[:2] / f"{digest}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        if cached.get('version') == CACHE_VERSION:
+            return {**cached['result'], 'cached': True}
+    except (OSError, ValueError):
+        pass
+
+    result = parse_source(content, lang)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'result': result}), encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return {**result, 'cached': False}
+
+
+def parse_files(root_path: Path, files: List[str], jobs=None, cache_dir=None) -> Dict[str, dict]:
+    """Parse files in a process pool, keyed by relative path."""
+    paths = [str(root_path / rel) for rel in files]
+    worker = partial(parse_file, cache_dir=str(cache_dir) if cache_dir else None)
+    if len(paths) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(worker, paths, chunksize=max(1, len(paths) // 64)))
+    else:
+        results = [worker(p) for p in paths]
+    return dict(zip(files, results))
+
+
+def dotted(*parts: str) -> str:
+    return '.'.join(p for p in parts if p)
+
+
+def python_module_index(files: List[str]) -> Dict[str, str]:
+    """Dotted module name -> file, for every Python file."""
+    index = {}
+    for rel in files:
+        if language(rel) != 'python':
+            continue
+        parts = rel[:-3].split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        names = [dotted(*parts)]
+        if len(parts) > 1 and parts[0] in SOURCE_ROOTS:
+            names.append(dotted(*parts[1:]))
+        for name in names:
+            if name:
+                index.setdefault(name, rel)
+    return index
+
+
+def resolve_python(imp: dict, rel: str, index: Dict[str, str]) -> Set[str]:
+    package = rel.split('/')[:-1]
+    if imp['level']:
+        up = imp['level'] - 1
+        if up > len(package):
+            return set()
+        prefixes = [dotted(*package[:len(package) - up])]
+    else:
+        # Absolute, then relative to the file's directory (a script importing a sibling)
+        prefixes = ['', dotted(*package)]
+
+    for prefix in prefixes:
+        module = dotted(prefix, imp['module'])
+        targets = set()
+        missing = not imp['names']
+        for name in imp['names']:
+            submodule = dotted(module, name)
+            if name != '*' and submodule in index:
+                targets.add(index[submodule])
+            else:
+                missing = True
+        if missing and module in index:
+            targets.add(index[module])
+        if targets:
+            return targets
+    return set()
+
+
+def resolve_js(spec: str, rel: str, files: Set[str]) -> Optional[str]:
+    if spec.startswith('.'):
+        bases = [posixpath.normpath(posixpath.join(posixpath.dirname(rel), spec))]
+    elif spec.startswith(('@/', '~/')):
+        bases = [spec[2:], f"src/{spec[2:]}"]
+    else:
+        return None
+
+    for base in bases:
+        stem, ext = posixpath.splitext(base)
+        candidates = [base]
+        candidates += [base + e for e in JS_EXTENSIONS]
+        candidates += [f"{base}/index{e}" for e in JS_EXTENSIONS]
+        if ext in JS_EXTENSIONS:
+            # TypeScript ESM imports name the emitted file: './user.js' is './user.ts'
+            candidates += [stem + e for e in JS_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in files:
+                return candidate
+    return None
+
+
+def build_graph(parsed: Dict[str, dict]) -> dict:
+    """Resolve parsed imports to files: {'edges': {file: {target: line}}, 'external': n}."""
+    files = set(parsed)
+    index = python_module_index(sorted(files))
+    edges = {rel: {} for rel in parsed}
+    external = 0
+    for rel, result in parsed.items():
+        python = language(rel) == 'python'
+        for imp in result['imports']:
+            if python:
+                targets = resolve_python(imp, rel, index)
+            else:
+                target = resolve_js(imp['module'], rel, files)
+                targets = {target} if target else set()
+            if not targets:
+                external += 1
+            for target in targets:
+                edges[rel].setdefault(target, imp['line'])
+    return {'edges': edges, 'external': external}
+
+
+def find_cycles(edges: Dict[str, dict]) -> List[List[str]]:
+    """Strongly connected components with more than one file (or a file importing
+    itself), found with an iterative Tarjan's algorithm."""
+    order = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for start in sorted(edges):
+        if start in order:
+            continue
+        order[start] = low[start] = len(order)
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, iter(sorted(edges[start])))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in order:
+                    order[child] = low[child] = len(order)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(edges.get(child, ())))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], order[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in edges[node]:
+                        components.append(sorted(component))
+    return sorted(components, key=lambda c: (-len(c), c))
+
+
+def cycle_example(component: List[str], edges: Dict[str, dict]) -> List[str]:
+    """A shortest import cycle through the first file of a component."""
+    start = component[0]
+    members = set(component)
+    previous = {}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for child in sorted(edges[node]):
+            if child not in members:
+                continue
+            if child == start:
+                path = [node]
+                while path[-1] != start:
+                    path.append(previous[path[-1]])
+                return list(reversed(path)) + [start]
+            if child not in previous:
+                previous[child] = node
+                queue.append(child)
+    return [start, start]
+
+
+def parse_layers(spec: str) -> List[List[str]]:
+    """'ui,services|api,domain' -> [['ui'], ['services', 'api'], ['domain']]"""
+    return [[name for name in layer.split('|') if name] for layer in spec.split(',') if layer.strip('| ')]
+
+
+def layer_of(rel: str, layers: List[List[str]]) -> Optional[int]:
+    """Index of the first layer whose directory appears in the path of `rel`."""
+    parts = set(rel.split('/')[:-1])
+    for i, names in enumerate(layers):
+        if parts.intersection(names):
+            return i
+    return None
+
+
+def layer_violations(edges: Dict[str, dict], layers: List[List[str]]) -> List[dict]:
+    """Imports from a layer into one listed before it (a lower layer depending on a higher one)."""
+    violations = []
+    for rel in sorted(edges):
+        source = layer_of(rel, layers)
+        if source is None:
+            continue
+        for target, line in sorted(edges[rel].items()):
+            target_layer = layer_of(target, layers)
+            if target_layer is not None and target_layer < source:
+                violations.append({
+                    'file': rel,
+                    'line': line,
+                    'imports': target,
+                    'layer': '|'.join(layers[source]),
+                    'imported_layer': '|'.join(layers[target_layer]),
+                })
+    return violations
+
+
+def collapse(rel: str, depth: int) -> str:
+    """The directory of a file `depth` levels below the root (or the file itself if shallower)."""
+    parts = rel.split('/')
+    return '/'.join(parts[:depth]) if len(parts) > depth else rel
+
+
+def collapsed_edges(edges: Dict[str, dict], depth: int) -> Counter:
+    """Number of file imports between each pair of collapsed groups."""
+    counts = Counter()
+    for rel, targets in edges.items():
+        group = collapse(rel, depth)
+        for target in targets:
+            target_group = collapse(target, depth)
+            if target_group != group:
+                counts[(group, target_group)] += 1
+    return counts
+
+
+def analyze_project(root_path: Path, layers=None, jobs=None, cache_dir=None) -> dict:
+    """Parse, resolve and check a project's imports."""
+    files = find_source_files(root_path)
+    parsed = parse_files(root_path, files, jobs, cache_dir)
+    graph = build_graph(parsed)
+    edges = graph['edges']
+    cycles = find_cycles(edges)
+    return {
+        'project': str(root_path),
+        'files': len(files),
+        'parsed': sum(1 for r in parsed.values() if not r['cached']),
+        'cached': sum(1 for r in parsed.values() if r['cached']),
+        'parse_errors': [{'file': rel, 'error': r['error']} for rel, r in parsed.items() if r['error']],
+        'imports': sum(len(targets) for targets in edges.values()),
+        'external_imports': graph['external'],
+        'cycles': [{'files': c, 'example': cycle_example(c, edges)} for c in cycles],
+        'layer_violations': layer_violations(edges, layers) if layers else [],
+        'edges': edges,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a project's import graph and report cycles and layer violations")
+    parser.add_argument('target', help='Target directory')
+    parser.add_argument('--layers', help='Layers from top to bottom, e.g. ui,services,domain')
+    parser.add_argument('--cache-dir', help='Cache parsed imports here, keyed by file content')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    args = parser.parse_args()
+    target_path = Path(args.target).resolve()
+
+    if not target_path.exists():
+        print(f"Error: Target path {target_path} does not exist.")
+        sys.exit(1)
+
+    layers = parse_layers(args.layers) if args.layers else None
+    report = analyze_project(target_path, layers, args.jobs, args.cache_dir)
+    del report['edges']
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import unittest
+
+from import_graph import layer_of, parse_js
+
+
+class TestParseJs(unittest.TestCase):
+
+    def modules(self, text):
+        return [(imp['module'], imp['line']) for imp in parse_js(text)]
+
+    def test_type_alias_does_not_hide_next_import(self):
+        text = "export type Id = string\nimport { helper } from './helper'\n"
+        self.assertEqual(self.modules(text), [('./helper', 2)])
+
+    def test_export_statement_does_not_run_into_next_import(self):
+        text = "export default config\nimport { a } from './a'\n"
+        self.assertEqual(self.modules(text), [('./a', 2)])
+
+    def test_multiline_braces(self):
+        text = "import Default, {\n  a,\n  b,\n} from './x'\n"
+        self.assertEqual(self.modules(text), [('./x', 1)])
+
+    def test_type_only_imports_are_skipped(self):
+        text = (
+            "import type { T } from './t'\n"
+            "import { type A, type B } from './ab'\n"
+            "export type { C } from './c'\n"
+            "import { type D, e } from './de'\n"
+        )
+        self.assertEqual(self.modules(text), [('./de', 4)])
+
+
+class TestLayerOf(unittest.TestCase):
+
+    def test_first_listed_layer_wins(self):
+        layers = [['domain'], ['ui']]
+        self.assertEqual(layer_of('ui/domain/x.ts', layers), 0)
+        self.assertEqual(layer_of('ui/x.ts', layers), 1)
+        self.assertIsNone(layer_of('lib/x.ts', layers))
+
+    def test_file_name_is_not_a_layer(self):
+        self.assertIsNone(layer_of('lib/ui', [['ui']]))
+
+
+if __name__ == '__main__':
+    unittest.main()
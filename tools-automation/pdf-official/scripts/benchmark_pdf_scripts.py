@@ -0,0 +1,206 @@
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import os
+import platform
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pypdf
+from pypdf import PdfReader
+
+from check_bounding_boxes import get_bounding_box_messages
+from check_bounding_boxes_benchmark import generate_form_fields
+from extract_form_field_info import get_field_info
+from fill_fillable_fields import fill_pdf_fields, monkeypatch_pydpf_method
+from fill_pdf_form_with_annotations import fill_pdf_form
+from synthetic_forms import PAGE_HEIGHT, PAGE_WIDTH, write_fillable_pdf
+
+
+# Benchmarks the form scripts on synthetic fillable PDFs of increasing size, recording wall
+# time and peak Python memory for each operation, and optionally cProfile output. The JSON
+# report can be compared against a previous one to catch performance regressions.
+
+
+OPERATIONS = ["get_field_info", "fill_pdf_fields", "fill_pdf_fields_incremental", "fill_pdf_form", "get_bounding_box_messages"]
+
+# Image size used for the annotation-based `fields.json`, as if pages were rendered at ~1.6x.
+IMAGE_WIDTH, IMAGE_HEIGHT = 1000, 1294
+
+
+# A value that passes validation for each field returned by get_field_info.
+def sample_value(field):
+    if field["type"] == "checkbox":
+        return field["checked_value"]
+    if field["type"] == "radio_group":
+        return field["radio_options"][0]["value"]
+    if field["type"] == "choice":
+        return field["choice_options"][0]["value"]
+    return f"Value for {field['field_id']}"
+
+
+# Writes the synthetic PDF and the JSON inputs every operation needs into `work_dir`.
+def prepare_inputs(work_dir, pages, fields_per_page, nesting_depth):
+    pdf_path = os.path.join(work_dir, "form.pdf")
+    write_fillable_pdf(pdf_path, pages, fields_per_page, nesting_depth=nesting_depth)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        field_info = get_field_info(PdfReader(pdf_path))
+    field_values_path = os.path.join(work_dir, "field_values.json")
+    with open(field_values_path, "w") as f:
+        json.dump([{**field, "value": sample_value(field)} for field in field_info], f)
+
+    # Annotation-based fields.json for the non-fillable workflow, on the same pages.
+    annotation_fields = generate_form_fields(pages * fields_per_page, fields_per_page=fields_per_page)
+    annotation_fields["pages"] = [
+        {"page_number": n + 1, "image_width": IMAGE_WIDTH, "image_height": IMAGE_HEIGHT}
+        for n in range(pages)
+    ]
+    fields_json_path = os.path.join(work_dir, "fields.json")
+    with open(fields_json_path, "w") as f:
+        json.dump(annotation_fields, f)
+
+    return pdf_path, field_values_path, fields_json_path
+
+
+def operation_callables(work_dir, pdf_path, field_values_path, fields_json_path):
+    def run_get_field_info():
+        get_field_info(PdfReader(pdf_path))
+
+    def run_fill_pdf_fields(incremental=False):
+        # Remove the field info cache so every run measures a cold fill.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(f"{pdf_path}.field_info_cache.json")
+        fill_pdf_fields(pdf_path, field_values_path, os.path.join(work_dir, "filled.pdf"), incremental=incremental)
+
+    def run_fill_pdf_form():
+        fill_pdf_form(pdf_path, fields_json_path, os.path.join(work_dir, "annotated.pdf"))
+
+    def run_get_bounding_box_messages():
+        with open(fields_json_path) as f:
+            get_bounding_box_messages(f)
+
+    return {
+        "get_field_info": run_get_field_info,
+        "fill_pdf_fields": run_fill_pdf_fields,
+        "fill_pdf_fields_incremental": lambda: run_fill_pdf_fields(incremental=True),
+        "fill_pdf_form": run_fill_pdf_form,
+        "get_bounding_box_messages": run_get_bounding_box_messages,
+    }
+
+
+# Runs `fn` once untraced for timing (best of `repeat`), once under tracemalloc for the
+# peak, and once under cProfile if `profile_path` is given.
+def measure(fn, repeat=1, profile_path=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if profile_path:
+            profiler = cProfile.Profile()
+            profiler.runcall(fn)
+            profiler.dump_stats(profile_path)
+
+    return {"seconds": min(times), "peak_memory_mb": peak / 1e6}
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {
+            (r["operation"], r["pages"], r["fields_per_page"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["operation"], result["pages"], result["fields_per_page"]))
+        if not previous:
+            continue
+        for metric in ("seconds", "peak_memory_mb"):
+            if previous[metric] and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"REGRESSION: {result['operation']} at {result['pages']}x{result['fields_per_page']}: "
+                    f"{metric} {previous[metric]:.3f} -> {result[metric]:.3f}"
+                )
+    return regressions
+
+
+def parse_size(size):
+    pages, fields_per_page = size.lower().split("x")
+    return int(pages), int(fields_per_page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pdf-official form scripts on synthetic PDFs")
+    parser.add_argument("--sizes", nargs="+", default=["1x50", "10x50", "50x100"], help="PAGESxFIELDS_PER_PAGE sizes to run (default: 1x50 10x50 50x100)")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS, help="Operations to benchmark (default: all)")
+    parser.add_argument("--nesting-depth", type=int, default=3, help="Field hierarchy depth of the generated forms (default: 3)")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per operation; the fastest is reported (default: 1)")
+    parser.add_argument("--profile-dir", help="Write cProfile stats for each operation and size to this directory")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth vs the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    monkeypatch_pydpf_method()
+    # pypdf logs a warning per field for fonts missing from the synthetic forms.
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+
+    results = []
+    for size in args.sizes:
+        pages, fields_per_page = parse_size(size)
+        with tempfile.TemporaryDirectory() as work_dir:
+            inputs = prepare_inputs(work_dir, pages, fields_per_page, args.nesting_depth)
+            operations = operation_callables(work_dir, *inputs)
+            for name in args.operations:
+                profile_path = os.path.join(args.profile_dir, f"{name}_{pages}x{fields_per_page}.prof") if args.profile_dir else None
+                result = {
+                    "operation": name,
+                    "pages": pages,
+                    "fields_per_page": fields_per_page,
+                    **measure(operations[name], args.repeat, profile_path),
+                }
+                results.append(result)
+                print(f"{name} {pages}x{fields_per_page}: {result['seconds']:.3f}s, peak {result['peak_memory_mb']:.1f} MB", file=sys.stderr)
+                if profile_path:
+                    pstats.Stats(profile_path, stream=sys.stderr).sort_stats("cumulative").print_stats(5)
+
+    report = {
+        "python": platform.python_version(),
+        "pypdf": pypdf.__version__,
+        "page_size": [PAGE_WIDTH, PAGE_HEIGHT],
+        "nesting_depth": args.nesting_depth,
+        "results": results,
+    }
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report_json)
+        print(f"Wrote report to {args.output}", file=sys.stderr)
+    else:
+        print(report_json)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import json
+import statistics
 import sys
 
 
@@ -14,36 +15,100 @@ class RectAndField:
     field: dict
 
 
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
+
+# Uniform grid over the rects of each page, so finding the rects that can intersect
+# a given one only looks at its neighbours instead of every rect in the form.
+# Cells are sized from the page's median rect so each rect covers only a few of them;
+# the few rects that would cover more than MAX_CELLS_PER_RECT cells (e.g. one spanning
+# the page) are kept out of the grid and compared with every rect on their page.
+class RectGridIndex:
+    MAX_CELLS_PER_RECT = 64
+
+    def __init__(self, rects_and_fields: list[RectAndField]):
+        self.rects_and_fields = rects_and_fields
+        indices_by_page = {}
+        for i, rf in enumerate(rects_and_fields):
+            indices_by_page.setdefault(rf.field["page_number"], []).append(i)
+
+        self.indices_by_page = indices_by_page
+        self.grids = {}
+        for page, indices in indices_by_page.items():
+            widths = [abs(rects_and_fields[i].rect[2] - rects_and_fields[i].rect[0]) for i in indices]
+            heights = [abs(rects_and_fields[i].rect[3] - rects_and_fields[i].rect[1]) for i in indices]
+            cell_w = statistics.median(widths) or 1
+            cell_h = statistics.median(heights) or 1
+            cells = {}
+            oversized = []
+            for i in indices:
+                if self._cell_count(rects_and_fields[i].rect, cell_w, cell_h) > self.MAX_CELLS_PER_RECT:
+                    oversized.append(i)
+                    continue
+                for cell in self._cells_for(rects_and_fields[i].rect, cell_w, cell_h):
+                    cells.setdefault(cell, []).append(i)
+            self.grids[page] = (cell_w, cell_h, cells, oversized)
+
+    @staticmethod
+    def _cell_ranges(rect, cell_w, cell_h):
+        x0, x1 = sorted((rect[0], rect[2]))
+        y0, y1 = sorted((rect[1], rect[3]))
+        return range(int(x0 // cell_w), int(x1 // cell_w) + 1), range(int(y0 // cell_h), int(y1 // cell_h) + 1)
+
+    @classmethod
+    def _cell_count(cls, rect, cell_w, cell_h):
+        xs, ys = cls._cell_ranges(rect, cell_w, cell_h)
+        return len(xs) * len(ys)
+
+    @classmethod
+    def _cells_for(cls, rect, cell_w, cell_h):
+        xs, ys = cls._cell_ranges(rect, cell_w, cell_h)
+        for cx in xs:
+            for cy in ys:
+                yield (cx, cy)
+
+    # Indices greater than `i` of the rects on the same page that intersect rect `i`, in order.
+    def later_intersections(self, i: int) -> list[int]:
+        ri = self.rects_and_fields[i]
+        page = ri.field["page_number"]
+        cell_w, cell_h, cells, oversized = self.grids[page]
+        if self._cell_count(ri.rect, cell_w, cell_h) > self.MAX_CELLS_PER_RECT:
+            candidates = set(j for j in self.indices_by_page[page] if j > i)
+        else:
+            candidates = set(j for j in oversized if j > i)
+            for cell in self._cells_for(ri.rect, cell_w, cell_h):
+                candidates.update(j for j in cells.get(cell, ()) if j > i)
+        return sorted(j for j in candidates if rects_intersect(ri.rect, self.rects_and_fields[j].rect))
+
+
 # Returns a list of messages that are printed to stdout for Claude to read.
 def get_bounding_box_messages(fields_json_stream) -> list[str]:
     messages = []
     fields = json.load(fields_json_stream)
     messages.append(f"Read {len(fields['form_fields'])} fields")
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
-
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    index = RectGridIndex(rects_and_fields)
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in index.later_intersections(i):
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
+            has_error = True
+            if ri.field is rj.field:
+                messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+            else:
+                messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+            if len(messages) >= 20:
+                messages.append("Aborting further checks; fix bounding boxes and try again")
+                return messages
         if ri.rect_type == "entry":
             if "entry_text" in ri.field:
                 font_size = ri.field["entry_text"].get("font_size", 14)
@@ -0,0 +1,92 @@
+import io
+import json
+import random
+import sys
+import time
+
+from check_bounding_boxes import RectAndField, get_bounding_box_messages, rects_intersect
+
+
+# Compares `get_bounding_box_messages` against the original pairwise scan on synthetic
+# `fields.json` data, checking that both produce the same messages.
+
+
+# The original O(N^2) implementation, kept as a reference for correctness and timing.
+def pairwise_bounding_box_messages(fields_json_stream) -> list[str]:
+    messages = []
+    fields = json.load(fields_json_stream)
+    messages.append(f"Read {len(fields['form_fields'])} fields")
+
+    rects_and_fields = []
+    for f in fields["form_fields"]:
+        rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
+        rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+
+    has_error = False
+    for i, ri in enumerate(rects_and_fields):
+        for j in range(i + 1, len(rects_and_fields)):
+            rj = rects_and_fields[j]
+            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
+                has_error = True
+                if ri.field is rj.field:
+                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+                else:
+                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+                if len(messages) >= 20:
+                    messages.append("Aborting further checks; fix bounding boxes and try again")
+                    return messages
+        if ri.rect_type == "entry":
+            if "entry_text" in ri.field:
+                font_size = ri.field["entry_text"].get("font_size", 14)
+                entry_height = ri.rect[3] - ri.rect[1]
+                if entry_height < font_size:
+                    has_error = True
+                    messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
+                    if len(messages) >= 20:
+                        messages.append("Aborting further checks; fix bounding boxes and try again")
+                        return messages
+
+    if not has_error:
+        messages.append("SUCCESS: All bounding boxes are valid")
+    return messages
+
+
+# Generates a form laid out as a grid of non-overlapping label/entry rows on letter-size
+# page images, spread over as many pages as needed. `num_overlaps` fields get a label
+# shifted onto their neighbour so the checks have something to report.
+def generate_form_fields(num_fields: int, fields_per_page: int = 100, num_overlaps: int = 0, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    form_fields = []
+    for n in range(num_fields):
+        page = n // fields_per_page + 1
+        row, col = divmod(n % fields_per_page, 4)
+        x, y = 20 + col * 150, 20 + row * 40
+        form_fields.append({
+            "description": f"Field {n}",
+            "page_number": page,
+            "label_bounding_box": [x, y, x + 50, y + 20],
+            "entry_bounding_box": [x + 55, y, x + 140, y + 20],
+            "entry_text": {"text": "value", "font_size": 12},
+        })
+    for n in rng.sample(range(num_fields), min(num_overlaps, num_fields)):
+        label = form_fields[n]["label_bounding_box"]
+        form_fields[n]["label_bounding_box"] = [label[0] + 30, label[1] + 5, label[2] + 30, label[3] + 5]
+    return {"form_fields": form_fields}
+
+
+def time_call(fn, data) -> tuple[float, list[str]]:
+    text = json.dumps(data)
+    start = time.perf_counter()
+    messages = fn(io.StringIO(text))
+    return time.perf_counter() - start, messages
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000]
+    for size in sizes:
+        data = generate_form_fields(size, num_overlaps=5)
+        indexed_time, indexed_messages = time_call(get_bounding_box_messages, data)
+        pairwise_time, pairwise_messages = time_call(pairwise_bounding_box_messages, data)
+        status = "same messages" if indexed_messages == pairwise_messages else "MESSAGES DIFFER"
+        print(f"{size} fields: indexed {indexed_time:.3f}s, pairwise {pairwise_time:.3f}s "
+              f"({pairwise_time / indexed_time:.0f}x), {status}")
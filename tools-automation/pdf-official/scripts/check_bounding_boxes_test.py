@@ -1,7 +1,9 @@
 import unittest
 import json
 import io
+import random
 from check_bounding_boxes import get_bounding_box_messages
+from check_bounding_boxes_benchmark import generate_form_fields, pairwise_bounding_box_messages
 
 
 # Currently this is not run automatically in CI; it's just for documentation and manual checking.
@@ -220,7 +222,49 @@ class TestGetBoundingBoxMessages(unittest.TestCase):
         messages = get_bounding_box_messages(stream)
         self.assertTrue(any("SUCCESS" in msg for msg in messages))
         self.assertFalse(any("FAILURE" in msg for msg in messages))
-    
+
+    def test_matches_pairwise_scan_on_random_boxes(self):
+        """Test that the indexed check reports the same messages, in order, as the pairwise scan"""
+        for seed in range(50):
+            rng = random.Random(seed)
+            fields = []
+            for i in range(rng.randint(1, 12)):
+                def random_box():
+                    x, y = rng.uniform(0, 200), rng.uniform(0, 200)
+                    return [x, y, x + rng.uniform(0, 80), y + rng.uniform(0, 30)]
+                fields.append({
+                    "description": f"Field{i}",
+                    "page_number": rng.randint(1, 2),
+                    "label_bounding_box": random_box(),
+                    "entry_bounding_box": random_box(),
+                    "entry_text": {"font_size": rng.choice([8, 14, 20])},
+                })
+            data = {"form_fields": fields}
+            self.assertEqual(
+                get_bounding_box_messages(self.create_json_stream(data)),
+                pairwise_bounding_box_messages(self.create_json_stream(data)),
+            )
+
+    def test_matches_pairwise_scan_on_generated_form(self):
+        """Test equivalence on a larger multi-page form with a few overlaps"""
+        data = generate_form_fields(500, num_overlaps=5)
+        messages = get_bounding_box_messages(self.create_json_stream(data))
+        self.assertEqual(messages, pairwise_bounding_box_messages(self.create_json_stream(data)))
+        self.assertTrue(any("FAILURE" in msg for msg in messages))
+
+    def test_page_sized_box_among_small_boxes(self):
+        """Test that one huge box doesn't blow up the grid and is still checked against every box"""
+        data = generate_form_fields(400, fields_per_page=400)
+        # Tiny boxes make the grid cells tiny; the page-sized entry covers all of them
+        for n, field in enumerate(data["form_fields"]):
+            field["label_bounding_box"] = [n, 1000 + n, n + 0.5, 1000.5 + n]
+            field["entry_bounding_box"] = [n, 2000 + n, n + 0.5, 2000.5 + n]
+            field.pop("entry_text")
+        data["form_fields"][7]["entry_bounding_box"] = [0, 0, 5000, 5000]
+        messages = get_bounding_box_messages(self.create_json_stream(data))
+        self.assertEqual(messages, pairwise_bounding_box_messages(self.create_json_stream(data)))
+        self.assertTrue(any("`Field 7` ([0, 0, 5000, 5000])" in msg for msg in messages))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,12 +1,14 @@
 import sys
-from pypdf import PdfReader
+
+from extract_form_field_info import get_cached_field_info_entry
 
 
 # Script for Claude to run to determine whether a PDF has fillable form fields. See forms.md.
+# This also warms the field info cache that extract_form_field_info.py and
+# fill_fillable_fields.py read from.
 
 
-reader = PdfReader(sys.argv[1])
-if (reader.get_fields()):
+if get_cached_field_info_entry(sys.argv[1])["has_fields"]:
     print("This PDF has fillable form fields")
 else:
     print("This PDF does not have fillable form fields; you will need to visually determine where to enter data")
@@ -1,29 +1,87 @@
 import os
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pdf2image import convert_from_path
+from PIL import Image
+from pypdf import PdfReader
 
 
 # Converts each page of a PDF to a PNG image.
+#
+# Pages are rendered in ranges across a process pool. pdftoppm writes each PNG straight
+# to disk at its final size, so no page is ever held in memory in full and large scans
+# don't need to fit in RAM all at once.
 
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+DEFAULT_DPI = 200
 
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
 
-    print(f"Converted {len(images)} pages to PNG images")
+# Returns the `-scale-to` size for each page: `max_dim` if rendering at `dpi` would make
+# the page's longest side exceed `max_dim`, otherwise None (render at `dpi`).
+def page_scale_sizes(pdf_path, max_dim, dpi=DEFAULT_DPI):
+    sizes = []
+    for page in PdfReader(pdf_path).pages:
+        longest_side_px = max(float(page.mediabox.width), float(page.mediabox.height)) * dpi / 72
+        sizes.append(max_dim if longest_side_px > max_dim else None)
+    return sizes
+
+
+# Splits pages into (first_page, last_page, scale_size) ranges of at most `pages_per_task`
+# consecutive pages that share the same scale size.
+def page_ranges(scale_sizes, pages_per_task):
+    ranges = []
+    for page_number, size in enumerate(scale_sizes, start=1):
+        if ranges and ranges[-1][2] == size and page_number - ranges[-1][0] < pages_per_task:
+            ranges[-1][1] = page_number
+        else:
+            ranges.append([page_number, page_number, size])
+    return [tuple(r) for r in ranges]
+
+
+def render_page_range(pdf_path, output_dir, first_page, last_page, scale_size, dpi=DEFAULT_DPI):
+    # Render into a private directory so pdftoppm's file names can't collide with
+    # other workers, then move each page to its final name.
+    work_dir = tempfile.mkdtemp(dir=output_dir, prefix=".render-")
+    try:
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            size=scale_size,
+            first_page=first_page,
+            last_page=last_page,
+            fmt="png",
+            output_folder=work_dir,
+            paths_only=True,
+        )
+        saved = []
+        for page_number, path in zip(range(first_page, last_page + 1), paths):
+            image_path = os.path.join(output_dir, f"page_{page_number}.png")
+            os.replace(path, image_path)
+            with Image.open(image_path) as image:
+                saved.append((page_number, image_path, image.size))
+        return saved
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def convert(pdf_path, output_dir, max_dim=1000, max_workers=None, pages_per_task=8):
+    ranges = page_ranges(page_scale_sizes(pdf_path, max_dim), pages_per_task)
+
+    num_pages = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(render_page_range, pdf_path, output_dir, first, last, size)
+            for first, last, size in ranges
+        ]
+        for future in as_completed(futures):
+            for page_number, image_path, size in future.result():
+                print(f"Saved page {page_number} as {image_path} (size: {size})")
+                num_pages += 1
+
+    print(f"Converted {num_pages} pages to PNG images")
 
 
 if __name__ == "__main__":
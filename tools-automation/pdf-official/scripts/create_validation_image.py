@@ -1,11 +1,45 @@
 import json
+import math
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from PIL import Image, ImageDraw
 
 
 # Creates "validation" images with rectangles for the bounding box information that
 # Claude creates when determining where to add text annotations in PDFs. See forms.md.
+#
+# In all-pages mode, `fields.json` is read once and every page image produced by
+# convert_pdf_to_images.py is drawn in a worker pool, optionally followed by a single
+# contact sheet showing all pages side by side.
+
+
+CONTACT_SHEET_THUMBNAIL_SIZE = 400
+
+
+def fields_by_page(data):
+    pages = {}
+    for field in data["form_fields"]:
+        pages.setdefault(field["page_number"], []).append(field)
+    return pages
+
+
+# Draws a red rectangle over each entry bounding box and a blue rectangle over each label,
+# saves the image and returns the number of boxes drawn.
+def draw_validation_image(page_fields, input_path, output_path, thumbnail_size=None):
+    with Image.open(input_path) as img:
+        img = img.convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for field in page_fields:
+        draw.rectangle(field['entry_bounding_box'], outline='red', width=2)
+        draw.rectangle(field['label_bounding_box'], outline='blue', width=2)
+    img.save(output_path)
+    if thumbnail_size:
+        img.thumbnail((thumbnail_size, thumbnail_size))
+        return len(page_fields) * 2, img
+    return len(page_fields) * 2, None
 
 
 def create_validation_image(page_number, fields_json_path, input_path, output_path):
@@ -13,26 +47,68 @@ def create_validation_image(page_number, fields_json_path, input_path, output_pa
     with open(fields_json_path, 'r') as f:
         data = json.load(f)
 
-        img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        num_boxes = 0
-        
-        for field in data["form_fields"]:
-            if field["page_number"] == page_number:
-                entry_box = field['entry_bounding_box']
-                label_box = field['label_bounding_box']
-                # Draw red rectangle over entry bounding box and blue rectangle over the label.
-                draw.rectangle(entry_box, outline='red', width=2)
-                draw.rectangle(label_box, outline='blue', width=2)
-                num_boxes += 2
-        
-        img.save(output_path)
-        print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+    num_boxes, _ = draw_validation_image(fields_by_page(data).get(page_number, []), input_path, output_path)
+    print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+
+
+def _draw_page(args):
+    return draw_validation_image(*args)
+
+
+# Creates `page_N_validation.png` in `output_dir` for every `page_N.png` in `images_dir`.
+def create_all_validation_images(fields_json_path, images_dir, output_dir, contact_sheet_path=None, max_workers=None):
+    with open(fields_json_path, 'r') as f:
+        page_fields = fields_by_page(json.load(f))
+
+    pages = sorted(
+        (int(m.group(1)), os.path.join(images_dir, name))
+        for name in os.listdir(images_dir)
+        if (m := re.fullmatch(r"page_(\d+)\.png", name))
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    thumbnail_size = CONTACT_SHEET_THUMBNAIL_SIZE if contact_sheet_path else None
+    jobs = [
+        (page_fields.get(page_number, []), input_path, os.path.join(output_dir, f"page_{page_number}_validation.png"), thumbnail_size)
+        for page_number, input_path in pages
+    ]
+
+    thumbnails = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for (page_number, _), job, (num_boxes, thumbnail) in zip(pages, jobs, executor.map(_draw_page, jobs)):
+            print(f"Created validation image at {job[2]} with {num_boxes} bounding boxes")
+            thumbnails.append((page_number, thumbnail))
+
+    missing = sorted(set(page_fields) - {page_number for page_number, _ in pages})
+    if missing:
+        print(f"WARNING: fields.json has boxes for pages with no image in {images_dir}: {missing}")
+
+    if contact_sheet_path and thumbnails:
+        write_contact_sheet(thumbnails, contact_sheet_path)
+        print(f"Created contact sheet at {contact_sheet_path} with {len(thumbnails)} pages")
+
+
+def write_contact_sheet(thumbnails, output_path, label_height=16):
+    columns = math.ceil(math.sqrt(len(thumbnails)))
+    rows = math.ceil(len(thumbnails) / columns)
+    cell_width = max(t.width for _, t in thumbnails)
+    cell_height = max(t.height for _, t in thumbnails) + label_height
+    sheet = Image.new("RGB", (columns * cell_width, rows * cell_height), "white")
+    draw = ImageDraw.Draw(sheet)
+    for i, (page_number, thumbnail) in enumerate(thumbnails):
+        x, y = (i % columns) * cell_width, (i // columns) * cell_height
+        draw.text((x + 4, y + 2), f"Page {page_number}", fill="black")
+        sheet.paste(thumbnail, (x, y + label_height))
+    sheet.save(output_path)
 
 
 if __name__ == "__main__":
+    if len(sys.argv) in (5, 6) and sys.argv[1] == "--all":
+        contact_sheet = sys.argv[5] if len(sys.argv) == 6 else None
+        create_all_validation_images(sys.argv[2], sys.argv[3], sys.argv[4], contact_sheet)
+        sys.exit(0)
     if len(sys.argv) != 5:
         print("Usage: create_validation_image.py [page number] [fields.json file] [input image path] [output image path]")
+        print("       create_validation_image.py --all [fields.json file] [images directory] [output directory] [contact sheet path (optional)]")
         sys.exit(1)
     page_number = int(sys.argv[1])
     fields_json_path = sys.argv[2]
@@ -1,32 +1,134 @@
+import hashlib
 import json
+import os
 import sys
 
 from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
 
 
 # Extracts data for the fillable form fields in a PDF and outputs JSON that
 # Claude uses to fill the fields. See forms.md.
 
 
+# Identifies a PDF object by its object number when it has one, so the same object
+# reached through different references maps to the same key.
+def object_key(obj):
+    ref = obj if isinstance(obj, IndirectObject) else getattr(obj, "indirect_reference", None)
+    return (ref.idnum, ref.generation) if ref is not None else id(obj)
+
+
 # This matches the format used by PdfReader `get_fields` and `update_page_form_field_values` methods.
-def get_full_annotation_field_id(annotation):
-    components = []
+# If `prefix_cache` is given, the IDs of every object on the /Parent chain are memoized in it,
+# so annotations sharing ancestors only walk the part of the chain not seen before.
+def get_full_annotation_field_id(annotation, prefix_cache=None):
+    if prefix_cache is None:
+        prefix_cache = {}
+    chain = []
+    field_id = None
+    seen = set()
     while annotation:
-        field_name = annotation.get('/T')
-        if field_name:
-            components.append(field_name)
+        key = object_key(annotation)
+        if key in prefix_cache:
+            field_id = prefix_cache[key]
+            break
+        if key in seen:
+            break
+        seen.add(key)
+        chain.append((key, annotation.get('/T')))
         annotation = annotation.get('/Parent')
-    return ".".join(reversed(components)) if components else None
+    for key, field_name in reversed(chain):
+        if field_name:
+            field_id = f"{field_id}.{field_name}" if field_id else str(field_name)
+        prefix_cache[key] = field_id
+    return field_id
+
+
+# Walks the AcroForm field tree once and returns {field name: field dictionary}, with the
+# same names and order as PdfReader `get_fields`. That method checks each field against a
+# list of every field seen so far, which makes it quadratic on large forms.
+# Returns None if the PDF has no form.
+def get_form_fields(reader: PdfReader):
+    acro_form = reader.root_object.get("/AcroForm")
+    acro_form = acro_form.get_object() if acro_form is not None else None
+    if not isinstance(acro_form, DictionaryObject):
+        return None
+    top_level = acro_form.get("/Fields")
+    top_level = top_level.get_object() if top_level is not None else None
+    if not isinstance(top_level, ArrayObject):
+        return {}
+
+    qualified_names = {}
+
+    # Like PdfReader's naming: the /TM mapping name if present, otherwise the parent's
+    # name and this field's /T joined with a dot.
+    def qualified_name(field):
+        chain = []
+        name = None
+        node = field
+        while True:
+            key = object_key(node)
+            if key in qualified_names:
+                name = qualified_names[key]
+                break
+            if "/TM" in node:
+                name = str(node["/TM"])
+                qualified_names[key] = name
+                break
+            chain.append((key, node))
+            if "/Parent" not in node or len(chain) > 1000:
+                break
+            node = node["/Parent"]
+        for key, node in reversed(chain):
+            field_name = str(node.get("/T", ""))
+            name = field_name if name is None else f"{name}.{field_name}"
+            qualified_names[key] = name
+        return name
+
+    fields = {}
+    visited = set()
+    stack = [f.get_object() for f in reversed(top_level)]
+    while stack:
+        field = stack.pop()
+        if not isinstance(field, DictionaryObject) or ("/T" not in field and "/TM" not in field):
+            continue
+        fields[qualified_name(field)] = field
+        key = object_key(field)
+        if key in visited:
+            continue
+        visited.add(key)
+        kids = field.get("/Kids")
+        if kids is not None:
+            stack.extend(kid.get_object() for kid in reversed(kids.get_object()))
+    return fields
+
+
+# The values a button or choice field can take, as PdfReader `get_fields` reports them
+# in "/_States_".
+def field_states(field):
+    ft = field.get_inherited('/FT')
+    if ft == "/Ch":
+        return field.get("/Opt") or []
+    if ft == "/Btn":
+        try:
+            states = list(field["/AP"]["/N"].keys())
+        except (KeyError, AttributeError, TypeError):
+            return []
+        if "/Off" not in states:
+            states.append("/Off")
+        return states
+    return []
 
 
 def make_field_dict(field, field_id):
     field_dict = {"field_id": field_id}
-    ft = field.get('/FT')
+    # A terminal field may inherit its type from a parent
+    ft = field.get_inherited('/FT')
     if ft == "/Tx":
         field_dict["type"] = "text"
     elif ft == "/Btn":
         field_dict["type"] = "checkbox"  # radio groups handled separately
-        states = field.get("/_States_", [])
+        states = field_states(field)
         if len(states) == 2:
             # "/Off" seems to always be the unchecked value, as suggested by
             # https://opensource.adobe.com/dc-acrobat-sdk-docs/standards/pdfstandards/pdf/PDF32000_2008.pdf#page=448
@@ -40,7 +142,7 @@ def make_field_dict(field, field_id):
                 field_dict["unchecked_value"] = states[1]
     elif ft == "/Ch":
         field_dict["type"] = "choice"
-        states = field.get("/_States_", [])
+        states = field_states(field)
         field_dict["choice_options"] = [{
             "value": state[0],
             "text": state[1],
@@ -60,7 +162,7 @@ def make_field_dict(field, field_id):
 #   },
 # ]
 def get_field_info(reader: PdfReader):
-    fields = reader.get_fields()
+    fields = get_form_fields(reader) or {}
 
     field_info_by_id = {}
     possible_radio_names = set()
@@ -80,11 +182,12 @@ def get_field_info(reader: PdfReader):
     # all choices have the same field name.
     # See https://westhealth.github.io/exploring-fillable-forms-with-pdfrw.html
     radio_fields_by_id = {}
+    prefix_cache = {}
 
     for page_index, page in enumerate(reader.pages):
         annotations = page.get('/Annots', [])
         for ann in annotations:
-            field_id = get_full_annotation_field_id(ann)
+            field_id = get_full_annotation_field_id(ann, prefix_cache)
             if field_id in field_info_by_id:
                 field_info_by_id[field_id]["page"] = page_index + 1
                 field_info_by_id[field_id]["rect"] = ann.get('/Rect')
@@ -137,9 +240,66 @@ def get_field_info(reader: PdfReader):
     return sorted_fields
 
 
+# Field info is cached on disk next to the PDF, keyed by a hash of its contents, so that
+# the scripts that need it (extract_form_field_info, fill_fillable_fields,
+# check_fillable_fields) only walk the form's annotations once per template.
+# Bump the version whenever get_field_info's output can change (new extraction logic,
+# not just new formats), so caches written by older code are recomputed.
+#   2: fields are walked with get_form_fields instead of PdfReader.get_fields
+#   3: field types inherited from a parent field are used
+FIELD_INFO_CACHE_VERSION = 3
+
+
+def field_info_cache_path(pdf_path: str) -> str:
+    return f"{pdf_path}.field_info_cache.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Returns {"has_fields": bool, "field_info": [...]} for the PDF, from the cache if it is
+# up to date, otherwise by parsing the PDF (with `reader` if given) and refreshing the cache.
+def get_cached_field_info_entry(pdf_path: str, reader: PdfReader = None) -> dict:
+    cache_path = field_info_cache_path(pdf_path)
+    content_hash = file_sha256(pdf_path)
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("version") == FIELD_INFO_CACHE_VERSION and cached.get("sha256") == content_hash:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    reader = reader or PdfReader(pdf_path)
+    has_fields = bool(get_form_fields(reader))
+    entry = {
+        "version": FIELD_INFO_CACHE_VERSION,
+        "sha256": content_hash,
+        "has_fields": has_fields,
+        "field_info": get_field_info(reader) if has_fields else [],
+    }
+    # The cache is only an optimization; a read-only directory shouldn't be an error.
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return entry
+
+
+def get_cached_field_info(pdf_path: str, reader: PdfReader = None):
+    return get_cached_field_info_entry(pdf_path, reader)["field_info"]
+
+
 def write_field_info(pdf_path: str, json_output_path: str):
-    reader = PdfReader(pdf_path)
-    field_info = get_field_info(reader)
+    field_info = get_cached_field_info(pdf_path)
     with open(json_output_path, "w") as f:
         json.dump(field_info, f, indent=2)
     print(f"Wrote {len(field_info)} fields to {json_output_path}")
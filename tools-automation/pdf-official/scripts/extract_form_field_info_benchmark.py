@@ -0,0 +1,43 @@
+import io
+import sys
+import time
+
+from pypdf import PdfReader
+
+from extract_form_field_info import get_field_info, get_form_fields
+from synthetic_forms import build_fillable_pdf
+
+
+# Times `get_field_info` on generated forms of increasing size to check that it scales
+# linearly with the number of widgets, and compares the field tree walk in `get_form_fields`
+# against PdfReader `get_fields`, which it replaces.
+
+
+def generated_reader(pages: int, fields_per_page: int, nesting_depth: int) -> PdfReader:
+    buffer = io.BytesIO()
+    build_fillable_pdf(pages, fields_per_page, nesting_depth=nesting_depth).write(buffer)
+    buffer.seek(0)
+    return PdfReader(buffer)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    # Usage: extract_form_field_info_benchmark.py [fields per page] [nesting depth] [page counts...]
+    fields_per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    nesting_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    page_counts = [int(arg) for arg in sys.argv[3:]] or [10, 20, 50, 100]
+
+    for pages in page_counts:
+        field_info_time, field_info = timed(get_field_info, generated_reader(pages, fields_per_page, nesting_depth))
+        walk_time, walked = timed(get_form_fields, generated_reader(pages, fields_per_page, nesting_depth))
+        pypdf_time, pypdf_fields = timed(generated_reader(pages, fields_per_page, nesting_depth).get_fields)
+        same = "same fields" if list(walked) == list(pypdf_fields) else "FIELDS DIFFER"
+        widgets = pages * fields_per_page
+        print(f"{pages} pages x {fields_per_page} fields: get_field_info {field_info_time:.2f}s "
+              f"({field_info_time / widgets * 1e6:.0f}us/field, {len(field_info)} fields); "
+              f"field tree walk {walk_time:.2f}s vs PdfReader.get_fields {pypdf_time:.2f}s, {same}")
@@ -0,0 +1,62 @@
+import unittest
+import io
+from pypdf import PdfReader, PdfWriter
+from extract_form_field_info import get_field_info, get_form_fields, get_full_annotation_field_id
+from synthetic_forms import build_fillable_pdf
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestGetFieldInfo(unittest.TestCase):
+
+    def create_reader(self, pages, fields_per_page, nesting_depth):
+        """Helper to create a PdfReader for a generated form"""
+        buffer = io.BytesIO()
+        build_fillable_pdf(pages, fields_per_page, nesting_depth=nesting_depth).write(buffer)
+        buffer.seek(0)
+        return PdfReader(buffer)
+
+    def test_form_fields_match_pypdf(self):
+        """Test that the field tree walk finds the same fields, in order, as PdfReader.get_fields"""
+        for nesting_depth in (1, 3):
+            reader = self.create_reader(3, 25, nesting_depth)
+            self.assertEqual(list(get_form_fields(reader)), list(reader.get_fields()))
+
+    def test_no_form(self):
+        """Test that a PDF without a form has no fields"""
+        buffer = io.BytesIO()
+        writer = PdfWriter()
+        writer.add_blank_page(100, 100)
+        writer.write(buffer)
+        buffer.seek(0)
+        reader = PdfReader(buffer)
+        self.assertIsNone(get_form_fields(reader))
+        self.assertEqual(get_field_info(reader), [])
+
+    def test_memoized_annotation_ids_match_uncached(self):
+        """Test that annotation IDs are the same with and without the prefix cache"""
+        reader = self.create_reader(2, 30, 4)
+        prefix_cache = {}
+        for page in reader.pages:
+            for ann in page["/Annots"]:
+                self.assertEqual(
+                    get_full_annotation_field_id(ann, prefix_cache),
+                    get_full_annotation_field_id(ann),
+                )
+
+    def test_field_types(self):
+        """Test that text, checkbox, choice and radio fields are all located"""
+        reader = self.create_reader(2, 22, 2)
+        fields = get_field_info(reader)
+        self.assertEqual(len(fields), 44)
+        types = {f["type"] for f in fields}
+        self.assertEqual(types, {"text", "checkbox", "choice", "radio_group"})
+        radio = next(f for f in fields if f["type"] == "radio_group")
+        self.assertEqual(radio["field_id"], "page1.group1.level1.field10")
+        self.assertEqual([o["value"] for o in radio["radio_options"]], ["/option0", "/option1", "/option2"])
+        checkbox = next(f for f in fields if f["type"] == "checkbox")
+        self.assertEqual((checkbox["checked_value"], checkbox["unchecked_value"]), ("/Yes", "/Off"))
+        self.assertTrue(all("page" in f for f in fields))
+
+
+if __name__ == '__main__':
+    unittest.main()
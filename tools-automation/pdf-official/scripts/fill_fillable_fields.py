@@ -1,18 +1,49 @@
+import csv
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import BooleanObject, NameObject, TextStringObject
 
-from extract_form_field_info import get_field_info
+from extract_form_field_info import get_cached_field_info, get_full_annotation_field_id
+from incremental_writer import IncrementalUpdate
 
 
 # Fills fillable form fields in a PDF. See forms.md.
+#
+# Batch mode fills the same template once per record of a JSON-lines or CSV file,
+# parsing the template and its field metadata only once.
+#
+# With --incremental, the filled values are appended to the original file as an incremental
+# update instead of rewriting the whole document, so the time and bytes written depend on
+# the number of fields set rather than on the size of the PDF. Appearance streams for text
+# and choice fields are left for the viewer to regenerate (see `write_filled_pdf_incremental`).
 
 
-def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
+def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str, incremental=False):
     with open(fields_json_path) as f:
         fields = json.load(f)
-    # Group by page number.
+
+    reader = PdfReader(input_pdf_path)
+
+    field_info = get_cached_field_info(input_pdf_path, reader)
+    fields_by_ids = {f["field_id"]: f for f in field_info}
+    errors = validation_errors_for_fields(fields, fields_by_ids)
+    for err in errors:
+        print(err)
+    if errors:
+        sys.exit(1)
+
+    if incremental and IncrementalUpdate.supported(reader):
+        write_filled_pdf_incremental(reader, input_pdf_path, field_values_by_page(fields), output_pdf_path)
+    else:
+        write_filled_pdf(reader, field_values_by_page(fields), output_pdf_path)
+
+
+# Group values by page number.
+def field_values_by_page(fields):
     fields_by_page = {}
     for field in fields:
         if "value" in field:
@@ -21,31 +52,42 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
             if page not in fields_by_page:
                 fields_by_page[page] = {}
             fields_by_page[page][field_id] = field["value"]
-    
-    reader = PdfReader(input_pdf_path)
+    return fields_by_page
 
-    has_error = False
-    field_info = get_field_info(reader)
-    fields_by_ids = {f["field_id"]: f for f in field_info}
+
+def validation_errors_for_fields(fields, fields_by_ids) -> list[str]:
+    errors = []
     for field in fields:
         existing_field = fields_by_ids.get(field["field_id"])
         if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
+            errors.append(f"ERROR: `{field['field_id']}` is not a valid field ID")
         elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
+            errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
         else:
             if "value" in field:
                 err = validation_error_for_field_value(existing_field, field["value"])
                 if err:
-                    print(err)
-                    has_error = True
-    if has_error:
-        sys.exit(1)
+                    errors.append(err)
+    return errors
+
 
+# The field a widget sets: the widget itself if it has its own name (/T), even when its
+# field type is inherited from a parent, otherwise its parent.
+def widget_field(annotation):
+    return annotation if "/T" in annotation else annotation.get("/Parent", annotation).get_object()
+
+
+def write_filled_pdf(reader: PdfReader, fields_by_page, output_pdf_path: str):
     writer = PdfWriter(clone_from=reader)
     for page, field_values in fields_by_page.items():
+        # pypdf only treats a named widget as the field if it has its own /FT; an
+        # explicit copy of the inherited type means the same and makes it match.
+        for annotation in writer.pages[page - 1].get("/Annots", []):
+            annotation = annotation.get_object()
+            if annotation.get("/Subtype") == "/Widget" and "/T" in annotation and "/FT" not in annotation:
+                field_type = annotation.get_inherited("/FT")
+                if field_type is not None:
+                    annotation[NameObject("/FT")] = field_type
         writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
 
     # This seems to be necessary for many PDF viewers to format the form values correctly.
@@ -56,6 +98,173 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
         writer.write(f)
 
 
+# Marks `obj` for rewriting, or `owner` (the object it is stored inline in) if `obj` is
+# a direct object.
+def _mark_modified(update: IncrementalUpdate, obj, owner):
+    update.mark_modified(obj if getattr(obj, "indirect_reference", None) is not None else owner)
+
+
+# Sets the same values as `write_filled_pdf`, but appends only the changed field and widget
+# dictionaries to the original file. Checkbox and radio widgets switch to their existing
+# appearance state; text and choice widgets have their stale appearance removed, and the
+# /NeedAppearances flag that `write_filled_pdf` also sets makes viewers draw the new values.
+def write_filled_pdf_incremental(reader: PdfReader, input_pdf_path: str, fields_by_page, output_pdf_path: str):
+    update = IncrementalUpdate(reader, input_pdf_path)
+    prefix_cache = {}
+    for page_number, field_values in fields_by_page.items():
+        page = reader.pages[page_number - 1]
+        for annotation in page.get("/Annots", []):
+            annotation = annotation.get_object()
+            if annotation.get("/Subtype") != "/Widget":
+                continue
+            field_id = get_full_annotation_field_id(annotation, prefix_cache)
+            if field_id not in field_values:
+                continue
+            value = field_values[field_id]
+            field = widget_field(annotation)
+            field_type = annotation.get_inherited("/FT")
+
+            if field_type == "/Btn":
+                state = NameObject(value)
+                field[NameObject("/V")] = state
+                normal_appearances = annotation.get("/AP", {}).get("/N", {})
+                annotation[NameObject("/AS")] = state if state in normal_appearances else NameObject("/Off")
+            else:
+                field[NameObject("/V")] = TextStringObject(value)
+                if field_type == "/Ch" and "/I" in field:
+                    del field["/I"]
+                if "/AP" in annotation:
+                    del annotation["/AP"]
+            _mark_modified(update, field, page)
+            if field is not annotation:
+                _mark_modified(update, annotation, page)
+
+    acro_form = reader.root_object["/AcroForm"].get_object()
+    acro_form[NameObject("/NeedAppearances")] = BooleanObject(True)
+    _mark_modified(update, acro_form, reader.root_object)
+    update.write(output_pdf_path)
+
+
+# Yields (record, error) pairs from a JSON-lines or CSV file. A JSON line is either an
+# object mapping field IDs to values or a list in the `field_values.json` format; a CSV
+# row maps column names (field IDs) to values, with empty cells left unset. The optional
+# `_output` key or column names the record's output file. A line that isn't valid JSON
+# yields (None, error message), so one bad line doesn't stop the batch.
+def read_records(records_path: str):
+    if records_path.lower().endswith(".csv"):
+        with open(records_path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v not in (None, "")}, None
+    else:
+        with open(records_path) as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line), None
+                    except json.JSONDecodeError as e:
+                        yield None, f"ERROR: Invalid JSON: {e}"
+
+
+# Returns errors for records that are neither a field ID -> value object nor a list
+# of {"field_id", "page", ...} objects.
+def record_shape_errors(record) -> list[str]:
+    if isinstance(record, dict):
+        output_name = record.get("_output")
+        if output_name is not None and not isinstance(output_name, str):
+            return [f"ERROR: `_output` must be a file name, got {output_name!r}"]
+        return []
+    if not isinstance(record, list):
+        return [f"ERROR: Expected an object or a list of fields, got {type(record).__name__}"]
+    errors = []
+    for i, field in enumerate(record):
+        if not isinstance(field, dict) or "field_id" not in field or "page" not in field:
+            errors.append(f"ERROR: Field {i + 1} must be an object with `field_id` and `page`, got {field!r}")
+    return errors
+
+
+# Converts a record into the `field_values.json` list format, taking page numbers
+# from the template's field info when the record doesn't specify them.
+def record_to_fields(record, fields_by_ids):
+    if isinstance(record, list):
+        return record
+    fields = []
+    for field_id, value in record.items():
+        if field_id == "_output" or value is None:
+            continue
+        page = fields_by_ids[field_id]["page"] if field_id in fields_by_ids else None
+        fields.append({"field_id": field_id, "page": page, "value": value})
+    return fields
+
+
+_worker_reader = None
+_worker_input_pdf_path = None
+_worker_incremental = False
+
+
+def _init_batch_worker(input_pdf_path: str, incremental: bool):
+    global _worker_reader, _worker_input_pdf_path, _worker_incremental
+    monkeypatch_pydpf_method()
+    _worker_reader = PdfReader(input_pdf_path)
+    _worker_input_pdf_path = input_pdf_path
+    _worker_incremental = incremental and IncrementalUpdate.supported(_worker_reader)
+
+
+def _fill_batch_record(fields_by_page, output_pdf_path: str):
+    if _worker_incremental:
+        # Values set for one record must not leak into the next, so each record
+        # gets a fresh reader; parsing is lazy, so only the touched objects are read.
+        reader = PdfReader(_worker_input_pdf_path)
+        write_filled_pdf_incremental(reader, _worker_input_pdf_path, fields_by_page, output_pdf_path)
+    else:
+        write_filled_pdf(_worker_reader, fields_by_page, output_pdf_path)
+    return output_pdf_path
+
+
+# Fills `input_pdf_path` once per record, writing one PDF per valid record to
+# `output_dir`. Invalid records, and records whose output file another record already
+# writes, are skipped and their errors reported at the end.
+# Returns a dict mapping record numbers (1-based) to their error messages.
+def fill_pdf_fields_batch(input_pdf_path: str, records_path: str, output_dir: str, max_workers=None, incremental=False):
+    os.makedirs(output_dir, exist_ok=True)
+    fields_by_ids = {f["field_id"]: f for f in get_cached_field_info(input_pdf_path)}
+
+    errors_by_record = {}
+    num_filled = 0
+    record_numbers_by_output = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker, initargs=(input_pdf_path, incremental)) as executor:
+        futures = {}
+        for record_number, (record, error) in enumerate(read_records(records_path), start=1):
+            errors = [error] if error else record_shape_errors(record)
+            if not errors:
+                fields = record_to_fields(record, fields_by_ids)
+                errors = validation_errors_for_fields(fields, fields_by_ids)
+            if errors:
+                errors_by_record[record_number] = errors
+                continue
+            output_name = record.get("_output") if isinstance(record, dict) else None
+            output_pdf_path = os.path.join(output_dir, os.path.basename(output_name or f"record_{record_number:05d}.pdf"))
+            # Two records writing one file would overwrite each other, possibly concurrently
+            output_key = os.path.normcase(os.path.abspath(output_pdf_path))
+            if output_key in record_numbers_by_output:
+                errors_by_record[record_number] = [f"ERROR: Output file `{os.path.basename(output_pdf_path)}` is already written by record {record_numbers_by_output[output_key]}"]
+                continue
+            record_numbers_by_output[output_key] = record_number
+            futures[record_number] = executor.submit(_fill_batch_record, field_values_by_page(fields), output_pdf_path)
+
+        for record_number, future in futures.items():
+            try:
+                future.result()
+                num_filled += 1
+            except Exception as e:
+                errors_by_record[record_number] = [f"ERROR: Failed to write PDF: {e}"]
+
+    for record_number in sorted(errors_by_record):
+        for err in errors_by_record[record_number]:
+            print(f"Record {record_number}: {err}")
+    print(f"Filled {num_filled} PDFs in {output_dir}; {len(errors_by_record)} records had errors")
+    return errors_by_record
+
+
 def validation_error_for_field_value(field_info, field_value):
     field_type = field_info["type"]
     field_id = field_info["field_id"]
@@ -104,11 +313,20 @@ def monkeypatch_pydpf_method():
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
+    args = sys.argv[1:]
+    incremental = "--incremental" in args
+    if incremental:
+        args.remove("--incremental")
+    if len(args) == 4 and args[0] == "--batch":
+        monkeypatch_pydpf_method()
+        errors_by_record = fill_pdf_fields_batch(args[1], args[2], args[3], incremental=incremental)
+        sys.exit(1 if errors_by_record else 0)
+    if len(args) != 3:
+        print("Usage: fill_fillable_fields.py [--incremental] [input pdf] [field_values.json] [output pdf]")
+        print("       fill_fillable_fields.py [--incremental] --batch [input pdf] [records.jsonl or records.csv] [output directory]")
         sys.exit(1)
     monkeypatch_pydpf_method()
-    input_pdf = sys.argv[1]
-    fields_json = sys.argv[2]
-    output_pdf = sys.argv[3]
-    fill_pdf_fields(input_pdf, fields_json, output_pdf)
+    input_pdf = args[0]
+    fields_json = args[1]
+    output_pdf = args[2]
+    fill_pdf_fields(input_pdf, fields_json, output_pdf, incremental=incremental)
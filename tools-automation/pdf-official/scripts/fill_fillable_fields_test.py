@@ -0,0 +1,118 @@
+import unittest
+import json
+import os
+import tempfile
+from pypdf import PdfReader
+from pypdf.generic import NameObject
+from extract_form_field_info import get_field_info
+from fill_fillable_fields import fill_pdf_fields, fill_pdf_fields_batch, monkeypatch_pydpf_method
+from synthetic_forms import build_fillable_pdf, write_fillable_pdf
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestIncrementalFill(unittest.TestCase):
+
+    def setUp(self):
+        monkeypatch_pydpf_method()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "form.pdf")
+        write_fillable_pdf(self.input_path, 2, 22)
+        self.values = {
+            "page1.group0.level1.field0": "Homer",
+            "page1.group0.level1.field4": "/Yes",
+            "page1.group0.level1.field6": "value2",
+            "page1.group1.level1.field10": "/option1",
+        }
+        fields = [{"field_id": field_id, "page": 1, "value": value} for field_id, value in self.values.items()]
+        self.values_path = os.path.join(self.temp_dir.name, "field_values.json")
+        with open(self.values_path, "w") as f:
+            json.dump(fields, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fill(self, incremental):
+        output_path = os.path.join(self.temp_dir.name, f"filled_{incremental}.pdf")
+        fill_pdf_fields(self.input_path, self.values_path, output_path, incremental=incremental)
+        return output_path
+
+    def test_incremental_fill_appends_to_original(self):
+        """Test that the original file is an unchanged prefix of the incrementally filled PDF"""
+        output_path = self.fill(incremental=True)
+        with open(self.input_path, "rb") as original, open(output_path, "rb") as filled:
+            original_bytes = original.read()
+            self.assertEqual(filled.read(len(original_bytes)), original_bytes)
+
+    def test_incremental_fill_sets_same_values(self):
+        """Test that incremental and full fills set the same field values and widget states"""
+        full = PdfReader(self.fill(incremental=False)).get_fields()
+        incremental_reader = PdfReader(self.fill(incremental=True))
+        incremental = incremental_reader.get_fields()
+        self.assertEqual(list(full), list(incremental))
+        for field_id in full:
+            self.assertEqual(str(full[field_id].get("/V")), str(incremental[field_id].get("/V")), field_id)
+
+        radio = incremental_reader.get_fields()["page1.group1.level1.field10"].indirect_reference.get_object()
+        self.assertEqual([kid.get_object()["/AS"] for kid in radio["/Kids"]], ["/Off", "/option1", "/Off"])
+        self.assertTrue(incremental_reader.trailer["/Root"]["/AcroForm"]["/NeedAppearances"])
+
+    def test_incremental_fill_with_inherited_field_type(self):
+        """Test that a widget with its own /T is filled as the field even when /FT is inherited"""
+        writer = build_fillable_pdf(1, 4, checkbox_every=0, choice_every=0, radio_every=0)
+        widget = writer.pages[0]["/Annots"][0].get_object()
+        parent = widget["/Parent"].get_object()
+        parent[NameObject("/FT")] = widget.pop("/FT")
+        with open(self.input_path, "wb") as f:
+            writer.write(f)
+        field_id = "page1.group0.level1.field0"
+        with open(self.values_path, "w") as f:
+            json.dump([{"field_id": field_id, "page": 1, "value": "Homer"}], f)
+
+        full = PdfReader(self.fill(incremental=False)).get_fields()
+        incremental = PdfReader(self.fill(incremental=True)).get_fields()
+        self.assertEqual(full[field_id].get("/V"), "Homer")
+        self.assertEqual(incremental[field_id].get("/V"), "Homer")
+        self.assertIsNone(incremental["page1.group0.level1"].get("/V"))
+        field_types = {f["field_id"]: f["type"] for f in get_field_info(PdfReader(self.input_path))}
+        self.assertEqual(field_types[field_id], "text")
+
+
+class TestBatchFill(unittest.TestCase):
+
+    def setUp(self):
+        monkeypatch_pydpf_method()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "form.pdf")
+        write_fillable_pdf(self.input_path, 1, 22)
+        self.output_dir = os.path.join(self.temp_dir.name, "out")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_bad_records_are_reported_without_stopping_the_batch(self):
+        """Test that malformed lines, bad record shapes and duplicate outputs become record errors"""
+        lines = [
+            json.dumps({"page1.group0.level1.field0": "Homer", "_output": "homer.pdf"}),
+            "{not json",
+            json.dumps("just a string"),
+            json.dumps([{"page": 1, "value": "no field id"}]),
+            json.dumps({"page1.group0.level1.field0": "Marge", "_output": "homer.pdf"}),
+            json.dumps({"page1.group0.level1.field0": "Bart", "_output": "sub/../homer.pdf"}),
+            json.dumps([{"field_id": "page1.group0.level1.field0", "page": 1, "value": "Lisa"}]),
+        ]
+        records_path = os.path.join(self.temp_dir.name, "records.jsonl")
+        with open(records_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        errors_by_record = fill_pdf_fields_batch(self.input_path, records_path, self.output_dir, max_workers=2)
+
+        self.assertEqual(sorted(errors_by_record), [2, 3, 4, 5, 6])
+        self.assertIn("Invalid JSON", errors_by_record[2][0])
+        self.assertIn("already written by record 1", errors_by_record[5][0])
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["homer.pdf", "record_00007.pdf"])
+        homer = PdfReader(os.path.join(self.output_dir, "homer.pdf")).get_fields()
+        self.assertEqual(homer["page1.group0.level1.field0"].get("/V"), "Homer")
+
+
+if __name__ == '__main__':
+    unittest.main()
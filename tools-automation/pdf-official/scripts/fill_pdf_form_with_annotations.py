@@ -4,8 +4,14 @@ import sys
 from pypdf import PdfReader, PdfWriter
 from pypdf.annotations import FreeText
 
+from incremental_writer import IncrementalUpdate
+
 
 # Fills a PDF by adding text annotations defined in `fields.json`. See forms.md.
+#
+# Annotations are grouped by page and appended to the source file as an incremental
+# update, so the cost is proportional to the number of annotations rather than the
+# size of the document.
 
 
 def transform_coordinates(bbox, image_width, image_height, pdf_width, pdf_height):
@@ -34,26 +40,32 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
     
     # Open the PDF
     reader = PdfReader(input_pdf_path)
-    writer = PdfWriter()
-    
-    # Copy all pages to writer
-    writer.append(reader)
     
-    # Get PDF dimensions for each page
+    # Index image dimensions by page, and look up PDF dimensions only for pages we annotate
+    page_infos = {p["page_number"]: p for p in fields_data["pages"]}
     pdf_dimensions = {}
-    for i, page in enumerate(reader.pages):
-        mediabox = page.mediabox
-        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
     
-    # Process each form field
-    annotations = []
+    # Process each form field, grouping annotations by page
+    annotations_by_page = {}
+    num_annotations = 0
     for field in fields_data["form_fields"]:
+        # Skip empty fields
+        if "entry_text" not in field or "text" not in field["entry_text"]:
+            continue
+        entry_text = field["entry_text"]
+        text = entry_text["text"]
+        if not text:
+            continue
+
         page_num = field["page_number"]
         
         # Get page dimensions and transform coordinates.
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
+        page_info = page_infos[page_num]
         image_width = page_info["image_width"]
         image_height = page_info["image_height"]
+        if page_num not in pdf_dimensions:
+            mediabox = reader.pages[page_num - 1].mediabox
+            pdf_dimensions[page_num] = [mediabox.width, mediabox.height]
         pdf_width, pdf_height = pdf_dimensions[page_num]
         
         transformed_entry_box = transform_coordinates(
@@ -62,14 +74,6 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
             pdf_width, pdf_height
         )
         
-        # Skip empty fields
-        if "entry_text" not in field or "text" not in field["entry_text"]:
-            continue
-        entry_text = field["entry_text"]
-        text = entry_text["text"]
-        if not text:
-            continue
-        
         font_name = entry_text.get("font", "Arial")
         font_size = str(entry_text.get("font_size", 14)) + "pt"
         font_color = entry_text.get("font_color", "000000")
@@ -85,16 +89,27 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
             border_color=None,
             background_color=None,
         )
-        annotations.append(annotation)
-        # page_number is 0-based for pypdf
-        writer.add_annotation(page_number=page_num - 1, annotation=annotation)
+        annotations_by_page.setdefault(page_num, []).append(annotation)
+        num_annotations += 1
         
     # Save the filled PDF
-    with open(output_pdf_path, "wb") as output:
-        writer.write(output)
+    if IncrementalUpdate.supported(reader):
+        update = IncrementalUpdate(reader, input_pdf_path)
+        for page_num, annotations in annotations_by_page.items():
+            # page_number is 0-based for pypdf
+            update.add_annotations(page_num - 1, annotations)
+        update.write(output_pdf_path)
+    else:
+        # Encrypted PDFs can't be updated incrementally; rewrite the whole document.
+        writer = PdfWriter(clone_from=reader)
+        for page_num, annotations in annotations_by_page.items():
+            for annotation in annotations:
+                writer.add_annotation(page_number=page_num - 1, annotation=annotation)
+        with open(output_pdf_path, "wb") as output:
+            writer.write(output)
     
     print(f"Successfully filled PDF form and saved to {output_pdf_path}")
-    print(f"Added {len(annotations)} text annotations")
+    print(f"Added {num_annotations} text annotations")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+import os
+import re
+import shutil
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject
+
+
+# Saves changes to a PDF as an incremental update: the original file's bytes are copied
+# unchanged and only new or modified objects, a new cross-reference section and a trailer
+# are appended after them (PDF 32000-1:2008, section 7.5.6). Writing is proportional to the
+# size of the change instead of the size of the document, and nothing but the reader's
+# own copy of the source is held in memory.
+#
+# Encrypted PDFs aren't supported, since new objects would have to be encrypted too;
+# check `IncrementalUpdate.supported(reader)` and fall back to PdfWriter for those.
+
+
+class IncrementalUpdate:
+    def __init__(self, reader: PdfReader, pdf_path: str):
+        self.reader = reader
+        self.pdf_path = pdf_path
+        self.next_object_number = int(reader.trailer["/Size"])
+        # (object number, generation) -> object to write, in insertion order.
+        self.objects = {}
+
+    @staticmethod
+    def supported(reader: PdfReader) -> bool:
+        return not reader.is_encrypted
+
+    # Adds a new object to the document and returns a reference to it.
+    def add_object(self, obj) -> IndirectObject:
+        ref = IndirectObject(self.next_object_number, 0, self.reader)
+        self.next_object_number += 1
+        self.objects[(ref.idnum, ref.generation)] = obj
+        return ref
+
+    # Records that an object read from the source PDF was changed and must be rewritten.
+    def mark_modified(self, obj):
+        ref = obj.indirect_reference
+        self.objects[(ref.idnum, ref.generation)] = obj
+
+    # Adds annotations to a page (0-based index) with a single update of its /Annots array.
+    def add_annotations(self, page_index: int, annotations: list[DictionaryObject]):
+        page = self.reader.pages[page_index]
+        refs = []
+        for annotation in annotations:
+            annotation[NameObject("/P")] = page.indirect_reference
+            refs.append(self.add_object(annotation))
+
+        existing = page.raw_get("/Annots") if "/Annots" in page else None
+        if isinstance(existing, IndirectObject):
+            # The array is its own object; rewrite it rather than the page.
+            annots = existing.get_object()
+            annots.extend(refs)
+            self.mark_modified(annots)
+        else:
+            page[NameObject("/Annots")] = ArrayObject(list(existing or []) + refs)
+            self.mark_modified(page)
+
+    def write(self, output_path: str):
+        with open(self.pdf_path, "rb") as src, open(output_path, "wb") as out:
+            shutil.copyfileobj(src, out)
+            out.seek(0, os.SEEK_END)
+            if out.tell() and not self._ends_with_newline(src):
+                out.write(b"\n")
+
+            offsets = {}
+            for (number, generation), obj in self.objects.items():
+                offsets[(number, generation)] = out.tell()
+                out.write(f"{number} {generation} obj\n".encode())
+                obj.write_to_stream(out)
+                out.write(b"\nendobj\n")
+
+            prev_xref = self._previous_startxref(src)
+            if self._uses_xref_stream(src, prev_xref):
+                self._write_xref_stream(out, offsets, prev_xref)
+            else:
+                self._write_xref_table(out, offsets, prev_xref)
+
+    @staticmethod
+    def _ends_with_newline(src) -> bool:
+        src.seek(-1, os.SEEK_END)
+        return src.read(1) in (b"\n", b"\r")
+
+    @staticmethod
+    def _previous_startxref(src) -> int:
+        src.seek(0, os.SEEK_END)
+        size = src.tell()
+        src.seek(max(size - 4096, 0))
+        matches = re.findall(rb"startxref\s+(\d+)", src.read())
+        if not matches:
+            raise ValueError("Could not find startxref in source PDF")
+        return int(matches[-1])
+
+    @staticmethod
+    def _uses_xref_stream(src, xref_offset: int) -> bool:
+        src.seek(xref_offset)
+        return not src.read(16).lstrip().startswith(b"xref")
+
+    def _trailer_entries(self, prev_xref: int, size: int) -> DictionaryObject:
+        trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(size),
+            NameObject("/Prev"): NumberObject(prev_xref),
+        })
+        for key in ("/Root", "/Info", "/ID"):
+            if key in self.reader.trailer:
+                trailer[NameObject(key)] = self.reader.trailer.raw_get(key)
+        return trailer
+
+    # Groups object numbers into (first, count) runs of consecutive numbers.
+    @staticmethod
+    def _subsections(numbers: list[int]) -> list[tuple[int, int]]:
+        runs = []
+        for number in sorted(numbers):
+            if runs and runs[-1][0] + runs[-1][1] == number:
+                runs[-1][1] += 1
+            else:
+                runs.append([number, 1])
+        return [tuple(run) for run in runs]
+
+    def _write_xref_table(self, out, offsets, prev_xref: int):
+        entries = {number: (offset, generation) for (number, generation), offset in offsets.items()}
+        xref_offset = out.tell()
+        # Repeat the head of the free list; some readers expect every section to start at 0.
+        out.write(b"xref\n0 1\n0000000000 65535 f\r\n")
+        for first, count in self._subsections(list(entries)):
+            out.write(f"{first} {count}\n".encode())
+            for number in range(first, first + count):
+                offset, generation = entries[number]
+                out.write(f"{offset:010d} {generation:05d} n\r\n".encode())
+        out.write(b"trailer\n")
+        self._trailer_entries(prev_xref, self.next_object_number).write_to_stream(out)
+        out.write(f"\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+
+    def _write_xref_stream(self, out, offsets, prev_xref: int):
+        xref_number = self.next_object_number
+        xref_offset = out.tell()
+        entries = {number: (offset, generation) for (number, generation), offset in offsets.items()}
+        entries[xref_number] = (xref_offset, 0)
+
+        offset_width = max((max(offset for offset, _ in entries.values()).bit_length() + 7) // 8, 4)
+        data = bytearray()
+        index = ArrayObject()
+        for first, count in self._subsections(list(entries)):
+            index.extend([NumberObject(first), NumberObject(count)])
+            for number in range(first, first + count):
+                offset, generation = entries[number]
+                data += b"\x01" + offset.to_bytes(offset_width, "big") + generation.to_bytes(2, "big")
+
+        xref = StreamObject()
+        xref.set_data(bytes(data))
+        xref.update(self._trailer_entries(prev_xref, xref_number + 1))
+        xref.update({
+            NameObject("/Type"): NameObject("/XRef"),
+            NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(offset_width), NumberObject(2)]),
+            NameObject("/Index"): index,
+        })
+        out.write(f"{xref_number} 0 obj\n".encode())
+        xref.write_to_stream(out)
+        out.write(f"\nendobj\nstartxref\n{xref_offset}\n%%EOF\n".encode())
@@ -0,0 +1,164 @@
+import sys
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+    TextStringObject,
+)
+
+
+# Generates synthetic fillable PDFs for benchmarking the form scripts: N pages x M
+# widgets, nested under a field hierarchy of configurable depth, mixing text fields,
+# checkboxes, choice lists and radio groups. Only pypdf is needed.
+
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+RADIO_FLAG = 1 << 15
+
+
+def _name(value):
+    return NameObject(value)
+
+
+def _rect(x, y, width, height):
+    return ArrayObject([FloatObject(x), FloatObject(y), FloatObject(x + width), FloatObject(y + height)])
+
+
+class _FormBuilder:
+    def __init__(self, writer: PdfWriter):
+        self.writer = writer
+        # One shared empty appearance stream keeps files small while still giving
+        # checkboxes and radio buttons the /AP /N states the scripts look for.
+        self.empty_appearance = writer._add_object(StreamObject())
+
+    def add(self, fields: dict, parent_ref=None):
+        obj = DictionaryObject({_name(k): v for k, v in fields.items()})
+        if parent_ref is not None:
+            obj[_name("/Parent")] = parent_ref
+        ref = self.writer._add_object(obj)
+        if parent_ref is not None:
+            parent = parent_ref.get_object()
+            parent.setdefault(_name("/Kids"), ArrayObject()).append(ref)
+        return ref
+
+    def add_widget(self, fields: dict, page, rect, parent_ref=None):
+        ref = self.add({
+            "/Type": _name("/Annot"),
+            "/Subtype": _name("/Widget"),
+            "/Rect": rect,
+            "/P": page.indirect_reference,
+            **fields,
+        }, parent_ref)
+        page.setdefault(_name("/Annots"), ArrayObject()).append(ref)
+        return ref
+
+    def appearance(self, *states):
+        return DictionaryObject({
+            _name("/N"): DictionaryObject({_name(state): self.empty_appearance for state in states}),
+        })
+
+
+# Returns a PdfWriter holding the generated form. Every `group_size` widgets on a page
+# share a chain of `nesting_depth` named ancestors (page -> group -> level...), so field IDs
+# look like "page1.group0.level1.field3". Radio groups have `radio_options` widgets each.
+def build_fillable_pdf(
+    pages: int,
+    fields_per_page: int,
+    nesting_depth: int = 2,
+    group_size: int = 10,
+    checkbox_every: int = 5,
+    choice_every: int = 7,
+    radio_every: int = 11,
+    radio_options: int = 3,
+) -> PdfWriter:
+    writer = PdfWriter()
+    builder = _FormBuilder(writer)
+    top_level_fields = ArrayObject()
+
+    columns = 4
+    cell_width = (PAGE_WIDTH - 40) / columns
+    rows = max((fields_per_page + columns - 1) // columns, 1)
+    cell_height = (PAGE_HEIGHT - 40) / rows
+
+    for page_index in range(pages):
+        page = writer.add_blank_page(PAGE_WIDTH, PAGE_HEIGHT)
+        page_ref = builder.add({"/T": TextStringObject(f"page{page_index + 1}")})
+        top_level_fields.append(page_ref)
+
+        parent_ref = None
+        for n in range(fields_per_page):
+            if n % group_size == 0:
+                parent_ref = builder.add({"/T": TextStringObject(f"group{n // group_size}")}, page_ref)
+                for level in range(1, nesting_depth):
+                    parent_ref = builder.add({"/T": TextStringObject(f"level{level}")}, parent_ref)
+
+            row, col = divmod(n, columns)
+            x = 20 + col * cell_width
+            y = PAGE_HEIGHT - 20 - (row + 1) * cell_height
+            width, height = cell_width * 0.8, min(cell_height * 0.8, 20)
+            name = TextStringObject(f"field{n}")
+
+            if radio_every and n % radio_every == radio_every - 1:
+                group_ref = builder.add({
+                    "/T": name,
+                    "/FT": _name("/Btn"),
+                    "/Ff": NumberObject(RADIO_FLAG),
+                    "/V": _name("/Off"),
+                }, parent_ref)
+                option_width = width / radio_options
+                for option in range(radio_options):
+                    builder.add_widget({
+                        "/AP": builder.appearance(f"/option{option}", "/Off"),
+                        "/AS": _name("/Off"),
+                    }, page, _rect(x + option * option_width, y, option_width * 0.8, height), group_ref)
+            elif checkbox_every and n % checkbox_every == checkbox_every - 1:
+                builder.add_widget({
+                    "/T": name,
+                    "/FT": _name("/Btn"),
+                    "/V": _name("/Off"),
+                    "/AS": _name("/Off"),
+                    "/AP": builder.appearance("/Yes", "/Off"),
+                }, page, _rect(x, y, height, height), parent_ref)
+            elif choice_every and n % choice_every == choice_every - 1:
+                builder.add_widget({
+                    "/T": name,
+                    "/FT": _name("/Ch"),
+                    "/Opt": ArrayObject([
+                        ArrayObject([TextStringObject(f"value{i}"), TextStringObject(f"Option {i}")])
+                        for i in range(3)
+                    ]),
+                    "/DA": TextStringObject("/Helv 10 Tf 0 g"),
+                }, page, _rect(x, y, width, height), parent_ref)
+            else:
+                builder.add_widget({
+                    "/T": name,
+                    "/FT": _name("/Tx"),
+                    "/DA": TextStringObject("/Helv 10 Tf 0 g"),
+                }, page, _rect(x, y, width, height), parent_ref)
+
+    writer._root_object[_name("/AcroForm")] = DictionaryObject({
+        _name("/Fields"): top_level_fields,
+        _name("/DA"): TextStringObject("/Helv 0 Tf 0 g"),
+    })
+    return writer
+
+
+def write_fillable_pdf(path: str, pages: int, fields_per_page: int, **kwargs):
+    writer = build_fillable_pdf(pages, fields_per_page, **kwargs)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("Usage: synthetic_forms.py [output pdf] [pages] [fields per page] [nesting depth]")
+        sys.exit(1)
+    depth = int(sys.argv[4]) if len(sys.argv) == 5 else 2
+    write_fillable_pdf(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), nesting_depth=depth)
+    print(f"Wrote {sys.argv[1]}")